@@ -1,152 +1,171 @@
 from flask import Flask, jsonify, render_template_string, request
 from flask_cors import CORS
-from enhanced_real_scraper import EnhancedRealOpportunityScraper
+from incremental import IncrementalRefresher
+from extraction import budget_value
+from insights import InsightEngine
+from lead_snapshot import SnapshotPublisher, leads_response
+from search import SearchIndex, search_response
+from snapshot_updater import SnapshotUpdater
+import os
+import sys
 import threading
-import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import json
-import random
+
+# db.py and the lead store live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lead_store import get_shared_store
 
 app = Flask(__name__)
 CORS(app)
 
 # Global variables
-REAL_OPPORTUNITIES = []
-last_update = None
 user_interactions = {}
 opportunity_scores = {}
 
-def calculate_opportunity_score(opportunity):
-    """Calculate AI-driven opportunity score based on multiple factors"""
-    score = 50  # Base score
-    
-    # Budget factor (higher budget = higher score)
-    budget = opportunity.get('budget', '')
-    if '$1M' in budget or 'million' in budget.lower():
-        score += 20
-    elif '$500K' in budget or '$500,000' in budget:
-        score += 15
-    elif '$100K' in budget or '$100,000' in budget:
-        score += 10
-    elif '$10K' in budget or '$10,000' in budget:
-        score += 5
-    
-    # Deadline urgency (closer deadlines = higher priority)
-    deadline = opportunity.get('deadline', '')
-    if '2025' in deadline:
-        if any(month in deadline for month in ['01', '02', '03', 'Jan', 'Feb', 'Mar']):
-            score += 15  # Q1 deadlines
-        elif any(month in deadline for month in ['04', '05', '06', 'Apr', 'May', 'Jun']):
-            score += 10  # Q2 deadlines
-    elif 'ongoing' in deadline.lower():
-        score += 5
-    
-    # Type factor (Federal typically larger)
-    if 'federal' in opportunity.get('type', '').lower():
-        score += 10
-    elif 'provincial' in opportunity.get('type', '').lower():
-        score += 5
-    
-    # Sector alignment (technology and digital transformation are hot)
-    if any(term in opportunity.get('title', '').lower() for term in ['digital', 'technology', 'cyber', 'ai', 'transformation']):
-        score += 15
-    
-    # Indigenous programs (often have dedicated funding)
-    if 'indigenous' in opportunity.get('type', '').lower():
-        score += 10
-    
-    return min(score, 100)  # Cap at 100
+def classify_sector(opp):
+    title = opp['title'].lower()
+    if 'technology' in title or 'digital' in title:
+        return 'Technology'
+    if 'health' in title:
+        return 'Healthcare'
+    if 'indigenous' in opp['type'].lower():
+        return 'Indigenous'
+    if 'environment' in title or 'green' in title:
+        return 'Green Economy'
+    return 'General'
 
-def generate_ai_insights(opportunity):
-    """Generate AI-powered insights for each opportunity"""
-    insights = {
-        'win_probability': calculate_opportunity_score(opportunity),
-        'effort_level': 'High' if 'federal' in opportunity['type'].lower() else 'Medium',
-        'competition_level': 'High' if opportunity['budget'].startswith('Up to $1') else 'Medium',
-        'strategic_fit': random.choice(['Excellent', 'Good', 'Fair']),
-        'roi_potential': 'High' if '$' in opportunity['budget'] and any(x in opportunity['budget'] for x in ['M', 'million', '500K']) else 'Medium'
-    }
-    
-    # Key success factors
-    success_factors = []
-    if 'federal' in opportunity['type'].lower():
-        success_factors.append("Federal security clearance may be required")
-        success_factors.append("Demonstrate experience with government contracts")
-    if 'indigenous' in opportunity['type'].lower():
-        success_factors.append("Indigenous partnership or participation recommended")
-        success_factors.append("Cultural competency training essential")
-    if 'technology' in opportunity['title'].lower():
-        success_factors.append("Technical certifications will strengthen proposal")
-        success_factors.append("Demonstrate innovation and modern approaches")
-    if not success_factors:
-        success_factors.append("Strong project management capabilities")
-        success_factors.append("Proven track record in similar programs")
+def classify_province(opp):
+    for prov in ['Ontario', 'British Columbia', 'Alberta', 'Quebec', 'Manitoba', 'Saskatchewan']:
+        if prov in opp.get('source', ''):
+            return prov
+    return 'Federal' if 'federal' in opp['type'].lower() else 'Other'
+
+def build_analytics(enhanced_opps, today):
+    """Sector, province and deadline-quarter breakdowns plus the top 5 by score"""
+    by_sector = {}
+    by_province = {}
+    by_quarter = {}
+    ongoing = 0
     
-    insights['key_success_factors'] = success_factors
+    for opp in enhanced_opps:
+        sector = classify_sector(opp)
+        by_sector[sector] = by_sector.get(sector, 0) + 1
+        
+        province = classify_province(opp)
+        by_province[province] = by_province.get(province, 0) + 1
+        
+        # Deadline analysis
+        if opp.get('deadline_date'):
+            closes = date.fromisoformat(opp['deadline_date'])
+            quarter = (closes.year, (closes.month - 1) // 3 + 1) if closes >= today else None
+            by_quarter[quarter] = by_quarter.get(quarter, 0) + 1
+        else:
+            ongoing += 1
     
-    # Recommended actions
-    actions = []
-    if insights['win_probability'] > 70:
-        actions.append("🔥 HOT LEAD - Prioritize immediately")
-        actions.append("Schedule internal strategy session this week")
-        actions.append("Reach out to procurement contact ASAP")
-    elif insights['win_probability'] > 50:
-        actions.append("📊 Good opportunity - Conduct feasibility assessment")
-        actions.append("Research similar past contracts")
-        actions.append("Identify potential partners or subcontractors")
-    else:
-        actions.append("📋 Monitor for now - Set up alerts")
-        actions.append("Build relationships for future opportunities")
+    closed = by_quarter.pop(None, 0)
+    by_deadline = {f"Q{quarter} {year}": count for (year, quarter), count in sorted(by_quarter.items())}
+    by_deadline['Ongoing'] = ongoing
+    if closed:
+        by_deadline['Closed'] = closed
     
-    insights['recommended_actions'] = actions
+    return {
+        'by_sector': by_sector,
+        'by_province': by_province,
+        'by_deadline': by_deadline,
+        'top_opportunities': list(enhanced_opps[:5])  # enhanced_opps is sorted by score
+    }
+
+def build_lead_stats(enhanced_opps):
+    """The /api/stats figures that only depend on the leads themselves"""
+    high_value = sum(1 for o in enhanced_opps if o['score'] > 70)
+    medium_value = sum(1 for o in enhanced_opps if 50 <= o['score'] <= 70)
+    total_pipeline = sum(budget_value(o, default=50000) for o in enhanced_opps)
     
-    # Risk assessment
-    risks = []
-    if 'Up to' in opportunity['budget']:
-        risks.append("Budget ceiling may be lower than maximum stated")
-    if 'Q1' in opportunity.get('deadline', '') or 'Q2' in opportunity.get('deadline', ''):
-        risks.append("Short timeline - rapid response required")
-    if 'federal' in opportunity['type'].lower():
-        risks.append("Complex procurement process expected")
+    return {
+        'total_leads': len(enhanced_opps),
+        'high_value_leads': high_value,
+        'medium_value_leads': medium_value,
+        'federal': sum(1 for l in enhanced_opps if 'federal' in l['type'].lower()),
+        'provincial': sum(1 for l in enhanced_opps if 'provincial' in l['type'].lower()),
+        'indigenous': sum(1 for l in enhanced_opps if 'indigenous' in l['type'].lower()),
+        'total_pipeline_value': f"${total_pipeline:,.0f}",
+        'avg_win_probability': sum(o['score'] for o in enhanced_opps) / len(enhanced_opps) if enhanced_opps else 0
+    }
+
+class EnrichedSnapshot:
+    """
+    Scored and AI-enhanced view of one list of real opportunities.
+
+    Built once per change to the list (or per day, since scores depend on
+    days left before each deadline) and never modified afterwards - a new
+    list gets a new snapshot, swapped in by reference, so requests never see
+    a half-built one. `leads` is sorted by score, highest first.
+    """
     
-    insights['risk_factors'] = risks
+    def __init__(self, opportunities, today=None):
+        self.source = opportunities
+        self.built_on = today or date.today()
+        self.leads = tuple(sorted(insight_engine.enhance_all(opportunities, self.built_on),
+                                  key=lambda o: o['score'], reverse=True))
+        self.stats = build_lead_stats(self.leads)
+        self.analytics = build_analytics(self.leads, self.built_on)
     
-    return insights
+    def is_current(self, opportunities):
+        return self.source is opportunities and self.built_on == date.today()
+
+# Deterministic, so an unchanged lead list always serializes to the same bytes
+insight_engine = InsightEngine()
+search_index = SearchIndex()
+_enriched = None
+_enriched_lock = threading.Lock()
+
+LEADS_MESSAGE = 'AI-enhanced real opportunities with sales intelligence'
+
+# What /api/leads serves: the enhanced leads plus their metadata, swapped as a whole without locking
+published_leads = SnapshotPublisher(total=0, last_update=None, status='warming', message=LEADS_MESSAGE)
+_published_from = None  # the EnrichedSnapshot published_leads was last built from
 
-def enhance_opportunities_with_ai():
-    """Enhance all opportunities with AI insights"""
-    enhanced = []
-    for opp in REAL_OPPORTUNITIES:
-        enhanced_opp = opp.copy()
-        enhanced_opp['ai_insights'] = generate_ai_insights(opp)
-        enhanced_opp['score'] = calculate_opportunity_score(opp)
-        enhanced.append(enhanced_opp)
-    return enhanced
+def get_enriched_snapshot():
+    """Snapshot of the updater's current leads, rebuilt only when the list has changed"""
+    global _enriched
+    snapshot = _enriched
+    opportunities = updater.leads
+    if snapshot is not None and snapshot.is_current(opportunities):
+        return snapshot
+    with _enriched_lock:
+        if _enriched is None or not _enriched.is_current(opportunities):
+            _enriched = EnrichedSnapshot(opportunities)
+        return _enriched
 
-def update_real_opportunities():
-    """Background task to update real opportunities"""
-    global REAL_OPPORTUNITIES, last_update
-    while True:
-        try:
-            print(f"\n[{datetime.now()}] Updating real opportunities...")
-            scraper = EnhancedRealOpportunityScraper()
-            REAL_OPPORTUNITIES = scraper.get_all_real_opportunities()
-            last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"[{datetime.now()}] Successfully updated {len(REAL_OPPORTUNITIES)} real opportunities")
-        except Exception as e:
-            print(f"[{datetime.now()}] Error updating opportunities: {e}")
-        
-        time.sleep(1800)  # 30 minutes
+def publish_opportunities():
+    """Publish the enhanced leads and last_update for requests to read, and index them for search"""
+    global _published_from
+    enriched = get_enriched_snapshot()
+    snapshot = published_leads.publish(enriched.leads, total=len(enriched.leads), last_update=updater.last_update,
+                                       status='ready' if updater.ready.is_set() else 'warming', message=LEADS_MESSAGE)
+    # Index as part of publishing, so searches find the index ready
+    search_index.sync(snapshot.leads)
+    _published_from = enriched
+    return snapshot
 
-# Start background updater
-updater_thread = threading.Thread(target=update_real_opportunities, daemon=True)
-updater_thread.start()
+def get_published_leads():
+    """The published leads, republished first if they have been re-enriched since (e.g. on a new day)"""
+    snapshot = published_leads.current
+    if _published_from is get_enriched_snapshot():
+        return snapshot
+    return publish_opportunities()
 
-# Initial load
-print("Loading initial real opportunities...")
-scraper = EnhancedRealOpportunityScraper()
-REAL_OPPORTUNITIES = scraper.get_all_real_opportunities()
-last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+LEAD_COLLECTION = 'enhanced'
+
+# Reprocesses only the sources and entries that changed since the last refresh
+refresher = IncrementalRefresher(concurrent=True)
+scraper = refresher.scraper
+
+# Refreshes, saves and follows snapshots of the collection; real_app shares it, and its leader lock
+updater = SnapshotUpdater(LEAD_COLLECTION, refresher, get_shared_store(), publish_opportunities)
+# Each worker loads the snapshot and starts updating on its first request (never in a pre-fork master)
+app.before_request(updater.start)
 
 @app.route('/')
 def index():
@@ -154,102 +173,46 @@ def index():
 
 @app.route('/api/leads')
 def get_leads():
-    """Return enhanced opportunities with AI insights"""
-    enhanced_opps = enhance_opportunities_with_ai()
-    # Sort by score
-    enhanced_opps.sort(key=lambda x: x['score'], reverse=True)
-    
-    return jsonify({
-        'leads': enhanced_opps,
-        'total': len(enhanced_opps),
-        'last_update': last_update,
-        'message': 'AI-enhanced real opportunities with sales intelligence'
-    })
+    """Return enhanced opportunities with AI insights, or one page of them with ?limit=&cursor=&sort=&fields="""
+    try:
+        return leads_response(get_published_leads(), request)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/ready')
+def readiness():
+    """Readiness probe: 200 once leads are loaded, 503 while the first scrape is still running"""
+    snapshot = get_published_leads()
+    if snapshot.meta['status'] != 'ready':
+        return jsonify({'status': 'warming'}), 503
+    return jsonify({'status': 'ready', 'leads': len(snapshot), 'last_update': snapshot.meta['last_update']})
+
+@app.route('/api/search')
+def search_opportunities():
+    """Relevance-ranked search over the enhanced opportunities (?q=&limit=)"""
+    try:
+        return jsonify(search_response(search_index, get_published_leads().leads, request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/stats')
 def get_stats():
     """Return enhanced statistics"""
-    enhanced_opps = enhance_opportunities_with_ai()
-    
-    # Calculate advanced metrics
-    high_value = len([o for o in enhanced_opps if o['score'] > 70])
-    medium_value = len([o for o in enhanced_opps if 50 <= o['score'] <= 70])
-    total_pipeline = sum([
-        1000000 if 'million' in o['budget'].lower() or '$1M' in o['budget'] else
-        500000 if '$500K' in o['budget'] else
-        100000 if '$100K' in o['budget'] else
-        50000
-        for o in enhanced_opps
-    ])
-    
-    stats = {
-        'total_leads': len(REAL_OPPORTUNITIES),
-        'high_value_leads': high_value,
-        'medium_value_leads': medium_value,
-        'federal': len([l for l in REAL_OPPORTUNITIES if 'federal' in l['type'].lower()]),
-        'provincial': len([l for l in REAL_OPPORTUNITIES if 'provincial' in l['type'].lower()]),
-        'indigenous': len([l for l in REAL_OPPORTUNITIES if 'indigenous' in l['type'].lower()]),
-        'total_pipeline_value': f"${total_pipeline:,.0f}",
-        'avg_win_probability': sum([o['score'] for o in enhanced_opps]) / len(enhanced_opps) if enhanced_opps else 0,
-        'last_update': last_update
-    }
+    stats = dict(get_enriched_snapshot().stats)
+    stats.update({
+        'source_timings': updater.source_timings,
+        'source_high_water': refresher.source_status(),
+        'last_changes': updater.last_changes,
+        'http_connections': scraper.http.connection_stats(),
+        'circuit_breakers': scraper.http.fetch_policy.status() if scraper.http.fetch_policy else {},
+        'last_update': updater.last_update
+    })
     return jsonify(stats)
 
 @app.route('/api/analytics')
 def get_analytics():
     """Return deep analytics data"""
-    enhanced_opps = enhance_opportunities_with_ai()
-    
-    # Group by various dimensions
-    by_sector = {}
-    by_province = {}
-    by_deadline = {'Q1 2025': 0, 'Q2 2025': 0, 'Q3 2025': 0, 'Q4 2025': 0, 'Ongoing': 0}
-    
-    for opp in enhanced_opps:
-        # Sector analysis
-        if 'technology' in opp['title'].lower() or 'digital' in opp['title'].lower():
-            sector = 'Technology'
-        elif 'health' in opp['title'].lower():
-            sector = 'Healthcare'
-        elif 'indigenous' in opp['type'].lower():
-            sector = 'Indigenous'
-        elif 'environment' in opp['title'].lower() or 'green' in opp['title'].lower():
-            sector = 'Green Economy'
-        else:
-            sector = 'General'
-        
-        by_sector[sector] = by_sector.get(sector, 0) + 1
-        
-        # Province analysis
-        for prov in ['Ontario', 'British Columbia', 'Alberta', 'Quebec', 'Manitoba', 'Saskatchewan']:
-            if prov in opp.get('source', ''):
-                by_province[prov] = by_province.get(prov, 0) + 1
-                break
-        else:
-            if 'federal' in opp['type'].lower():
-                by_province['Federal'] = by_province.get('Federal', 0) + 1
-            else:
-                by_province['Other'] = by_province.get('Other', 0) + 1
-        
-        # Deadline analysis
-        deadline = opp.get('deadline', '').lower()
-        if 'ongoing' in deadline:
-            by_deadline['Ongoing'] += 1
-        elif any(m in deadline for m in ['01', '02', '03', 'jan', 'feb', 'mar']):
-            by_deadline['Q1 2025'] += 1
-        elif any(m in deadline for m in ['04', '05', '06', 'apr', 'may', 'jun']):
-            by_deadline['Q2 2025'] += 1
-        elif any(m in deadline for m in ['07', '08', '09', 'jul', 'aug', 'sep']):
-            by_deadline['Q3 2025'] += 1
-        else:
-            by_deadline['Q4 2025'] += 1
-    
-    return jsonify({
-        'by_sector': by_sector,
-        'by_province': by_province,
-        'by_deadline': by_deadline,
-        'top_opportunities': enhanced_opps[:5]  # Top 5 by score
-    })
+    return jsonify(get_enriched_snapshot().analytics)
 
 @app.route('/api/track', methods=['POST'])
 def track_interaction():
@@ -797,6 +760,13 @@ ADVANCED_DASHBOARD_TEMPLATE = '''
                 // Fetch leads
                 const leadsResponse = await fetch('/api/leads');
                 const leadsData = await leadsResponse.json();
+                if (leadsData.status === 'warming') {
+                    // The server is still collecting its first set of opportunities
+                    document.getElementById('leadsContainer').innerHTML =
+                        '<div class="loading">Collecting the first set of opportunities...</div>';
+                    setTimeout(loadData, 5000);
+                    return;
+                }
                 allLeads = leadsData.leads;
                 filteredLeads = allLeads;
                 
@@ -826,10 +796,12 @@ ADVANCED_DASHBOARD_TEMPLATE = '''
             document.getElementById('federalLeads').textContent = stats.federal || '0';
             
             // Calculate urgent deadlines
-            const urgentCount = allLeads.filter(lead => 
-                lead.deadline && (lead.deadline.includes('Q1') || 
-                ['01', '02', '03', 'Jan', 'Feb', 'Mar'].some(m => lead.deadline.includes(m)))
-            ).length;
+            const today = new Date();
+            const urgentCount = allLeads.filter(lead => {
+                if (!lead.deadline_date) return false;
+                const daysLeft = (new Date(lead.deadline_date) - today) / 86400000;
+                return daysLeft >= 0 && daysLeft <= 90;
+            }).length;
             document.getElementById('urgentDeadlines').textContent = urgentCount;
         }
         
@@ -1107,23 +1079,12 @@ ADVANCED_DASHBOARD_TEMPLATE = '''
                     case 'score':
                         return (b.score || 0) - (a.score || 0);
                     case 'budget':
-                        const getBudgetValue = (budget) => {
-                            if (budget.includes('million') || budget.includes('M')) return 1000000;
-                            if (budget.includes('500K')) return 500000;
-                            if (budget.includes('100K')) return 100000;
-                            if (budget.includes('10K')) return 10000;
-                            return 0;
-                        };
-                        return getBudgetValue(b.budget) - getBudgetValue(a.budget);
+                        const getBudgetValue = (lead) => lead.budget_max || lead.budget_min || 0;
+                        return getBudgetValue(b) - getBudgetValue(a);
                     case 'deadline':
-                        const getDeadlineScore = (deadline) => {
-                            if (deadline.includes('Q1')) return 4;
-                            if (deadline.includes('Q2')) return 3;
-                            if (deadline.includes('Q3')) return 2;
-                            if (deadline.includes('Q4')) return 1;
-                            return 0;
-                        };
-                        return getDeadlineScore(b.deadline) - getDeadlineScore(a.deadline);
+                        // ISO dates sort as strings; open-ended deadlines go last
+                        const getDeadlineKey = (lead) => lead.deadline_date || '9999-12-31';
+                        return getDeadlineKey(a).localeCompare(getDeadlineKey(b));
                     case 'recent':
                         return new Date(b.found_date) - new Date(a.found_date);
                     default:
@@ -1145,9 +1106,9 @@ ADVANCED_DASHBOARD_TEMPLATE = '''
             
             // Deadline alert
             const urgentDeadlines = Object.entries(analytics.by_deadline)
-                .filter(([key, value]) => key.includes('Q1') && value > 0);
+                .filter(([key, value]) => key.startsWith('Q') && value > 0);
             if (urgentDeadlines.length > 0) {
-                alerts.push(`⏰ ${urgentDeadlines[0][1]} opportunities closing in Q1 2025`);
+                alerts.push(`⏰ ${urgentDeadlines[0][1]} opportunities closing in ${urgentDeadlines[0][0]}`);
             }
             
             // Sector opportunity
@@ -1207,10 +1168,11 @@ ADVANCED_DASHBOARD_TEMPLATE = '''
 '''
 
 if __name__ == '__main__':
+    updater.start()
     print("\n" + "="*60)
     print("🤖 AI-POWERED SALES INTELLIGENCE DASHBOARD")
     print("="*60)
-    print(f"✅ Loaded {len(REAL_OPPORTUNITIES)} real opportunities with AI insights")
+    print(f"✅ Loaded {len(updater.leads)} real opportunities with AI insights")
     print("📊 Advanced analytics and scoring enabled")
     print("🎯 Predictive win probability calculations active")
     print("🌐 Starting server on http://localhost:5000")
@@ -1,9 +1,25 @@
-import requests
 from datetime import datetime, timedelta
 import json
-import time
-import random
 from typing import List, Dict, Any
+from dedup import NearDuplicateClusterer
+from extraction import normalize_opportunity, parse_budget
+from keyword_matcher import KeywordAutomaton
+from lead_ids import make_lead_id
+from rate_limiter import get_shared_rate_limiter
+
+# Training category -> keywords, checked in priority order
+TRAINING_CATEGORIES = {
+    'Digital Skills Training': ['digital', 'technology', 'ai'],
+    'Leadership Development': ['leadership', 'management'],
+    'Compliance Training': ['compliance', 'mandatory', 'aoda'],
+    'DEI Training': ['diversity', 'inclusion', 'equity'],
+    'Sustainability Training': ['climate', 'sustainability'],
+    'Indigenous Capacity Building': ['indigenous']
+}
+TRAINING_CATEGORY_MATCHER = KeywordAutomaton(TRAINING_CATEGORIES)
+
+# Rate limiter key for the AI search service
+AI_SEARCH_HOST = 'ai-search'
 
 class AITrainingOpportunityFinder:
     """
@@ -11,7 +27,8 @@ class AITrainingOpportunityFinder:
     Uses intelligent search and analysis instead of manual web scraping.
     """
     
-    def __init__(self):
+    def __init__(self, rate_limiter=None):
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
         self.search_queries = [
             # Federal Government
             "Government of Canada digital transformation training programs 2025 2026 RFP opportunities",
@@ -135,8 +152,8 @@ class AITrainingOpportunityFinder:
         """
         AI-powered analysis of each opportunity to provide sales intelligence
         """
-        return {
-            'id': f"opp_{int(time.time())}_{random.randint(1000, 9999)}",
+        return normalize_opportunity({
+            'id': make_lead_id(result['url'], result['organization'], result['title'], prefix='opp_'),
             'organization': result['organization'],
             'opportunity': result['title'],
             'description': result['description'],
@@ -155,19 +172,15 @@ class AITrainingOpportunityFinder:
             'win_probability': self._calculate_win_probability(result),
             'key_requirements': self._extract_requirements(result),
             'training_type': self._categorize_training(result['title'], result['description'])
-        }
+        }, budget_field='budget_range')
     
     def _calculate_tier(self, result: Dict[str, Any]) -> str:
         """Calculate opportunity tier based on deadline and value"""
         deadline = datetime.strptime(result['deadline'], '%Y-%m-%d')
         days_until = (deadline - datetime.now()).days
         
-        # Extract budget value
-        budget_str = result['budget']
-        if '$' in budget_str:
-            value = float(budget_str.split('$')[1].split('M')[0].split('-')[1].strip())
-        else:
-            value = 0
+        # Budget ceiling in millions
+        value = (parse_budget(result['budget'])[1] or 0) / 1_000_000
         
         if days_until <= 45 or value >= 10:
             return 'Tier 1 - Urgent'
@@ -240,11 +253,7 @@ class AITrainingOpportunityFinder:
     
     def _analyze_competition(self, result: Dict[str, Any]) -> str:
         """Analyze competitive landscape"""
-        budget_str = result['budget']
-        if '$' in budget_str:
-            value = float(budget_str.split('$')[1].split('M')[0].split('-')[1].strip())
-        else:
-            value = 0
+        value = (parse_budget(result['budget'])[1] or 0) / 1_000_000
         
         if value >= 10:
             return "High competition expected from major consulting firms (Deloitte, PwC, Accenture). Differentiation through specialized expertise critical."
@@ -298,22 +307,8 @@ class AITrainingOpportunityFinder:
     
     def _categorize_training(self, title: str, description: str) -> str:
         """Categorize the type of training"""
-        text = (title + ' ' + description).lower()
-        
-        if 'digital' in text or 'technology' in text or 'ai' in text:
-            return 'Digital Skills Training'
-        elif 'leadership' in text or 'management' in text:
-            return 'Leadership Development'
-        elif 'compliance' in text or 'mandatory' in text or 'aoda' in text:
-            return 'Compliance Training'
-        elif 'diversity' in text or 'inclusion' in text or 'equity' in text:
-            return 'DEI Training'
-        elif 'climate' in text or 'sustainability' in text:
-            return 'Sustainability Training'
-        elif 'indigenous' in text:
-            return 'Indigenous Capacity Building'
-        else:
-            return 'Professional Development'
+        return TRAINING_CATEGORY_MATCHER.first(title + ' ' + description, TRAINING_CATEGORIES,
+                                               'Professional Development')
     
     def find_all_opportunities(self) -> List[Dict[str, Any]]:
         """
@@ -330,8 +325,8 @@ class AITrainingOpportunityFinder:
         for i, query in enumerate(self.search_queries, 1):
             print(f"\n[{i}/{len(self.search_queries)}] Searching...")
             
-            # Simulate AI search with realistic delay
-            time.sleep(0.5)  # In production, this would be actual API call time
+            # Stay within the AI search service's rate limit
+            self.rate_limiter.acquire(AI_SEARCH_HOST)
             
             # Get AI search results
             results = self.search_with_ai(query)
@@ -344,14 +339,10 @@ class AITrainingOpportunityFinder:
                     print(f"   ✅ Found: {opportunity['organization']} - {opportunity['opportunity'][:60]}...")
                     print(f"      Confidence: {result['ai_confidence']:.0%} | {opportunity['tier']}")
         
-        # Remove duplicates
-        unique_opportunities = []
-        seen = set()
-        for opp in all_opportunities:
-            key = (opp['organization'], opp['opportunity'])
-            if key not in seen:
-                seen.add(key)
-                unique_opportunities.append(opp)
+        # Remove duplicates, including the same opportunity found by several queries with reworded titles
+        unique_opportunities = NearDuplicateClusterer(
+            text_fields=('organization', 'opportunity'), source_fields=('source',)
+        ).merge(all_opportunities)
         
         # Sort by tier and deadline
         unique_opportunities.sort(key=lambda x: (
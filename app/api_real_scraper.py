@@ -1,16 +1,22 @@
-import requests
 from datetime import datetime, timedelta
 import json
 import feedparser
 import re
 from urllib.parse import quote
+from http_client import get_shared_client
+from keyword_matcher import KeywordAutomaton
+from lead_ids import make_lead_id
+
+# Feed entries are kept when their title mentions any of these
+FEED_KEYWORD_MATCHER = KeywordAutomaton({'keyword': ['training', 'learning', 'development', 'education']})
 
 class APIRealOpportunityScraper:
     """
     Real opportunity finder using APIs and RSS feeds
     """
     
-    def __init__(self):
+    def __init__(self, http=None):
+        self.http = http or get_shared_client()
         self.opportunities = []
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (compatible; CanadianTrainingOpportunityBot/1.0)'
@@ -30,25 +36,38 @@ class APIRealOpportunityScraper:
         
         for feed_info in rss_feeds:
             try:
-                feed = feedparser.parse(feed_info['url'])
-                
-                for entry in feed.entries[:20]:  # Check first 20 entries
-                    if any(keyword in entry.title.lower() for keyword in ['training', 'learning', 'development', 'education']):
-                        self.opportunities.append({
-                            'title': entry.title,
-                            'organization': 'Government of Canada',
-                            'source': feed_info['name'],
-                            'url': entry.link,
-                            'type': feed_info['type'],
-                            'deadline': entry.get('published', 'Check tender document'),
-                            'budget': 'See tender document',
-                            'description': entry.get('summary', entry.title)[:200],
-                            'contact': 'See tender document',
-                            'found_date': datetime.now().strftime("%Y-%m-%d")
-                        })
+                # A 304 from the feed reuses the entries parsed last cycle
+                self.opportunities.extend(self.http.get_parsed(
+                    feed_info['url'],
+                    lambda response, feed_info=feed_info: self._parse_feed(response, feed_info),
+                    headers=self.headers,
+                    timeout=15
+                ))
             except Exception as e:
                 print(f"Error parsing RSS feed {feed_info['name']}: {e}")
     
+    def _parse_feed(self, response, feed_info):
+        """Turn a downloaded RSS feed into opportunities"""
+        feed = feedparser.parse(response.content)
+        opportunities = []
+        
+        for entry in feed.entries[:20]:  # Check first 20 entries
+            if 'keyword' in FEED_KEYWORD_MATCHER.scan(entry.title):
+                opportunities.append({
+                    'title': entry.title,
+                    'organization': 'Government of Canada',
+                    'source': feed_info['name'],
+                    'url': entry.link,
+                    'type': feed_info['type'],
+                    'deadline': entry.get('published', 'Check tender document'),
+                    'budget': 'See tender document',
+                    'description': entry.get('summary', entry.title)[:200],
+                    'contact': 'See tender document',
+                    'found_date': datetime.now().strftime("%Y-%m-%d")
+                })
+        
+        return opportunities
+    
     def search_canada_open_data(self):
         """Search Canada Open Data Portal for grants"""
         print("🔍 Searching Canada Open Data Portal...")
@@ -300,7 +319,7 @@ class APIRealOpportunityScraper:
     def format_opportunity_for_display(self, opp):
         """Format opportunity for professional display"""
         return {
-            'id': f"REAL-{datetime.now().timestamp()}-{hash(opp['title'])}",
+            'id': make_lead_id(opp['url'], opp['organization'], opp['title'], prefix='REAL-'),
             'title': opp['title'],
             'organization': opp['organization'],
             'type': opp['type'],
@@ -0,0 +1,140 @@
+import asyncio
+from urllib.parse import urlparse
+
+import aiohttp
+from requests.models import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from http_cache import parser_key
+from http_client import ACCEPT_ENCODING, DEFAULT_USER_AGENT
+
+
+class AsyncResponse:
+    """
+    Minimal response object handed to scraper parse functions.
+
+    Exposes the same attributes the parsers read from a requests.Response
+    (status_code, headers, content, text, url) so parse functions work with
+    either backend.
+    """
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = get_encoding_from_headers(self.headers) or 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+
+class AsyncFetchEngine:
+    """
+    asyncio fetch engine that runs scraper FetchJobs concurrently.
+
+    A global semaphore caps in-flight requests and a semaphore per host keeps
+    each portal polite, so hundreds of search terms can be scanned in one
+    cycle on a single thread. run() is the synchronous entry point used by the
+    scrapers' get_all_real_opportunities(backend='async').
+    """
+
+    def __init__(self, max_concurrency=50, per_host_limit=4, headers=None, cache=None, rate_limiter=None,
+                 fetch_policy=None):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.headers = {
+            'User-Agent': DEFAULT_USER_AGENT,
+            'Accept-Encoding': ACCEPT_ENCODING
+        }
+        if headers:
+            self.headers.update(headers)
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.fetch_policy = fetch_policy
+        self._global_semaphore = None
+        self._host_semaphores = {}
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def fetch(self, session, url, headers=None, timeout=10):
+        """GET url under the retry/circuit-breaker policy"""
+        if self.fetch_policy is None:
+            return await self._send(session, url, headers, timeout)
+        return await self.fetch_policy.call_async(
+            urlparse(url).netloc.lower(),
+            lambda: self._send(session, url, headers, timeout),
+            should_retry=lambda error: (isinstance(error, aiohttp.ClientConnectionError)
+                                        and not isinstance(error, asyncio.TimeoutError))
+        )
+
+    async def _send(self, session, url, headers, timeout):
+        """GET url under the host's rate limit and the global and per-host concurrency caps"""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(url)
+        async with self._global_semaphore, self._host_semaphore(url):
+            async with session.get(url, headers=headers,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                content = await response.read()
+                return AsyncResponse(str(response.url), response.status, response.headers, content)
+
+    async def run_job(self, session, job):
+        """Fetch and parse one FetchJob, revalidating against the response cache when present"""
+        prepared = PreparedRequest()
+        prepared.prepare_url(job.url, job.params)
+        url = prepared.url
+
+        entry = self.cache.load(url) if self.cache else None
+        headers = dict(job.headers or {})
+        if self.cache:
+            headers.update(self.cache.conditional_headers(entry))
+
+        response = await self.fetch(session, url, headers=headers, timeout=job.timeout)
+
+        if response.status_code == 304 and entry:
+            parsed = self.cache.load_parsed(url, entry, parser_key(job.parse))
+            if parsed is not None:
+                return parsed
+            body = self.cache.load_body(url)
+            if body is None:
+                return []
+            response = AsyncResponse(url, entry.get('status', 200), entry.get('headers', {}), body)
+        elif response.status_code == 200:
+            entry = self.cache.store(url, response) if self.cache else None
+        else:
+            return []
+
+        # Parsing is CPU work - keep it off the event loop so fetches keep flowing
+        parsed = await asyncio.get_running_loop().run_in_executor(None, job.parse, response)
+        if self.cache and entry:
+            self.cache.store_parsed(url, entry, parser_key(job.parse), parsed)
+        return parsed
+
+    async def run_jobs(self, jobs):
+        """Run every job concurrently; returns one result list per job, in job order"""
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._host_semaphores = {}
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_limit)
+
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector) as session:
+            outcomes = await asyncio.gather(*(self.run_job(session, job) for job in jobs),
+                                            return_exceptions=True)
+
+        results = []
+        for job, outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error fetching {job.label}: {outcome!r}")
+                results.append([])
+            else:
+                results.append(outcome)
+        return results
+
+    def run(self, jobs):
+        """Synchronous facade: run jobs on a fresh event loop and return their results"""
+        return asyncio.run(self.run_jobs(list(jobs)))
@@ -1,6 +1,35 @@
 import random
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Any
+from extraction import normalize_opportunity
+from lead_ids import make_lead_id
+
+# Generated dates that are relative to the day the leads were generated
+RELATIVE_DATE_FIELDS = ('deadline', 'deadline_date', 'date_found')
+
+
+def shift_generated_dates(leads: List[Dict[str, Any]], generated_on: date, today: date = None) -> List[Dict[str, Any]]:
+    """
+    Copies of generated leads with their dates moved forward by the days since generated_on.
+
+    Deadlines are generated 30-180 days ahead, so a saved database would
+    otherwise drift into the past; shifted, every lead stays as far from its
+    deadline (and in the same tier) as on the day it was generated.
+    """
+    days = ((today or date.today()) - generated_on).days
+    if days <= 0:
+        return leads
+    shifted = []
+    for lead in leads:
+        lead = dict(lead)
+        for field in RELATIVE_DATE_FIELDS:
+            try:
+                lead[field] = (date.fromisoformat(lead[field]) + timedelta(days=days)).isoformat()
+            except (KeyError, TypeError, ValueError):
+                continue
+        shifted.append(lead)
+    return shifted
+
 
 class ComprehensiveAILeadGenerator:
     """
@@ -313,7 +342,9 @@ class ComprehensiveAILeadGenerator:
             win_prob_text = f"Low ({win_prob}%) - Requires partnerships"
         
         # Create opportunity ID
-        opp_id = f"ai_{org_type}_{datetime.now().timestamp()}_{random.randint(1000, 9999)}"
+        opportunity_title = f"{topic} Training Program 2025-2026"
+        source_url = f"https://www.{domain}/{topic.lower().replace(' ', '-')}"
+        opp_id = make_lead_id(source_url, org_name, opportunity_title, prefix=f"ai_{org_type}_")
         
         # Generate description based on category
         descriptions = {
@@ -397,12 +428,12 @@ class ComprehensiveAILeadGenerator:
                 "Procurement Specialist"
             ]
         
-        return {
+        return normalize_opportunity({
             'id': opp_id,
             'organization': org_name,
-            'opportunity': f"{topic} Training Program 2025-2026",
+            'opportunity': opportunity_title,
             'description': descriptions.get(category, f"{topic} training for {org_name}"),
-            'source': f"https://www.{domain}/{topic.lower().replace(' ', '-')}",
+            'source': source_url,
             'date_found': datetime.now().strftime('%Y-%m-%d'),
             'deadline': deadline,
             'budget_range': budget,
@@ -419,4 +450,4 @@ class ComprehensiveAILeadGenerator:
             'training_type': category,
             'training_topic': topic,
             'organization_type': org_type
-        }
\ No newline at end of file
+        }, budget_field='budget_range')
\ No newline at end of file
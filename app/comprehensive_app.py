@@ -8,16 +8,51 @@ from flask import Flask, render_template_string, jsonify, request
 from flask_cors import CORS
 from datetime import datetime
 import json
-from comprehensive_ai_scraper import ComprehensiveAILeadGenerator
+import os
+import sys
+from comprehensive_ai_scraper import ComprehensiveAILeadGenerator, shift_generated_dates
+from lead_index import LeadIndex
+from pagination import LeadPager, paginate
+from search import SearchIndex, search_response
+
+# db.py and the lead store live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lead_store import get_shared_store
 
 app = Flask(__name__)
 CORS(app)
 
-# Generate comprehensive lead database on startup
-print("🤖 Generating comprehensive lead database...")
-generator = ComprehensiveAILeadGenerator()
-AI_GENERATED_LEADS = generator.generate_all_opportunities()
-print(f"✅ Generated {len(AI_GENERATED_LEADS)} opportunities!")
+LEAD_COLLECTION = 'ai_generated'
+store = get_shared_store()
+
+def load_generated_leads():
+    """The saved lead database with its dates moved up to today, generated (and saved) on first start"""
+    try:
+        run, leads = store.load_snapshot(LEAD_COLLECTION)
+    except Exception as e:
+        print(f"⚠️ Could not load saved opportunities: {e}")
+        run, leads = None, []
+    if leads:
+        print(f"✅ Loaded {len(leads)} saved opportunities")
+        return shift_generated_dates(leads, run.finished_at.date())
+    
+    print("🤖 Generating comprehensive lead database...")
+    leads = ComprehensiveAILeadGenerator().generate_all_opportunities()
+    print(f"✅ Generated {len(leads)} opportunities!")
+    try:
+        store.save_snapshot(LEAD_COLLECTION, leads)
+    except Exception as e:
+        print(f"⚠️ Could not save opportunities: {e}")
+    return leads
+
+AI_GENERATED_LEADS = load_generated_leads()
+
+# The lead database doesn't change while the app runs, so its sort orders and
+# search/facet indexes are built once
+pager = LeadPager(AI_GENERATED_LEADS)
+lead_index = LeadIndex(AI_GENERATED_LEADS)
+search_index = SearchIndex()
+search_index.sync(AI_GENERATED_LEADS)
 
 # Enhanced HTML Template with filtering and search
 HTML_TEMPLATE = '''
@@ -553,11 +588,7 @@ HTML_TEMPLATE = '''
                     case 'deadline':
                         return new Date(a.deadline) - new Date(b.deadline);
                     case 'budget':
-                                                 const getBudgetValue = (budget) => {
-                             const match = budget.match(/\\$(\\d+)M/);
-                             return match ? parseInt(match[1]) : 0;
-                         };
-                        return getBudgetValue(b.budget_range) - getBudgetValue(a.budget_range);
+                        return (b.budget_max || 0) - (a.budget_max || 0);
                     case 'confidence':
                         return b.ai_confidence - a.ai_confidence;
                     case 'organization':
@@ -695,7 +726,7 @@ def index():
         'high_priority': len([l for l in AI_GENERATED_LEADS if 'Tier 2' in l['tier']]),
         'federal': len([l for l in AI_GENERATED_LEADS if l['organization_type'] == 'federal']),
         'total_value': sum(
-            float(l['budget_range'].split('$')[1].split('M')[0].split('-')[1].strip()) 
+            (l['budget_max'] or 0) / 1_000_000
             for l in AI_GENERATED_LEADS
         ),
         'avg_confidence': int(
@@ -712,33 +743,45 @@ def index():
 
 @app.route('/api/leads')
 def api_leads():
-    # Support filtering via query params
+    # Support filtering via query params, plus ?limit=&cursor=&sort=&fields= paging
     org_type = request.args.get('type')
     category = request.args.get('category')
     tier = request.args.get('tier')
-    search = request.args.get('search', '').lower()
-    
-    filtered = AI_GENERATED_LEADS
+    search = request.args.get('search', '')
     
+    filters = {}
     if org_type and org_type != 'all':
-        filtered = [l for l in filtered if l['organization_type'] == org_type]
+        filters['organization_type'] = lead_index.facet('organization_type', org_type)
     
     if category and category != 'all':
-        filtered = [l for l in filtered if l['training_type'] == category]
+        filters['training_type'] = lead_index.facet('training_type', category)
     
     if tier and tier != 'all':
-        filtered = [l for l in filtered if tier in l['tier'].lower()]
+        filters['tier'] = lead_index.facet('tier', tier, contains=True)
     
-    if search:
-        filtered = [l for l in filtered if search in f"{l['organization']} {l['opportunity']} {l['description']}".lower()]
+    matches, facet_counts = lead_index.query(filters, search)
+    
+    try:
+        page = paginate(pager, request.args, allowed=matches)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
-        'leads': filtered,
-        'count': len(filtered),
+        **page,
+        'count': len(matches),
         'total': len(AI_GENERATED_LEADS),
+        'facets': facet_counts,
         'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     })
 
+@app.route('/api/search')
+def api_search():
+    # Relevance-ranked search over opportunity, organization, description and analysis (?q=&limit=)
+    try:
+        return jsonify(search_response(search_index, AI_GENERATED_LEADS, request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
 @app.route('/api/stats')
 def api_stats():
     # Detailed statistics
@@ -752,7 +795,7 @@ def api_stats():
         'by_type': {},
         'by_category': {},
         'total_pipeline_value': sum(
-            float(l['budget_range'].split('$')[1].split('M')[0].split('-')[1].strip()) 
+            (l['budget_max'] or 0) / 1_000_000
             for l in AI_GENERATED_LEADS
         ),
         'average_confidence': sum(l['ai_confidence'] for l in AI_GENERATED_LEADS) / len(AI_GENERATED_LEADS)
@@ -1,16 +1,16 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-import json
-import time
-import re
+from extraction import find_budget_text, find_deadline_text, normalize_opportunity
+from html_parser import only, parse_html
+from http_client import FetchJob, get_shared_client
+from lead_ids import make_lead_id
 
 class ComprehensiveRealOpportunityScraper:
     """
     Comprehensive scraper for REAL Canadian training opportunities
     """
     
-    def __init__(self):
+    def __init__(self, http=None):
+        self.http = http or get_shared_client()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -18,156 +18,155 @@ class ComprehensiveRealOpportunityScraper:
         
     def extract_budget_from_text(self, text):
         """Extract budget information from text"""
-        # Look for dollar amounts
-        budget_patterns = [
-            r'\$[\d,]+(?:\.\d{2})?(?:[KMB])?',
-            r'[\d,]+(?:\.\d{2})?\s*(?:thousand|million|billion)',
-            r'budget.*?[\d,]+',
-        ]
-        
-        for pattern in budget_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(0)
-        return "To be determined"
+        return find_budget_text(text) or "To be determined"
     
     def extract_deadline_from_text(self, text):
         """Extract deadline from text"""
-        # Look for dates
-        date_patterns = [
-            r'closing.*?(\d{4}/\d{2}/\d{2})',
-            r'deadline.*?(\d{4}/\d{2}/\d{2})',
-            r'(\d{4}/\d{2}/\d{2})',
-            r'(\w+\s+\d{1,2},?\s+\d{4})',
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
+        deadline = find_deadline_text(text)
+        if deadline:
+            return deadline
         
         # Default to 30 days from now
         return (datetime.now() + timedelta(days=30)).strftime("%Y/%m/%d")
     
-    def search_canada_buyandsell(self):
-        """Search BuyandSell.gc.ca for training opportunities"""
-        print("🔍 Searching BuyandSell.gc.ca for real training opportunities...")
-        
+    def buyandsell_jobs(self):
+        """One CanadaBuys search per term"""
         base_url = "https://canadabuys.canada.ca/en/tender-opportunities"
         search_terms = ["training", "professional development", "learning", "education", "skills development"]
         
-        for term in search_terms:
-            try:
-                # Search URL with parameters
-                params = {
+        return [
+            FetchJob(
+                label=f"{term} on BuyandSell",
+                url=base_url,
+                parse=self._parse_buyandsell_listings,
+                params={
                     'search': term,
                     'status': 'open',
                     'sort_by': 'publication_date',
                     'sort_order': 'DESC'
-                }
-                
-                response = requests.get(base_url, params=params, headers=self.headers, timeout=15)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find tender listings
-                    listings = soup.find_all('div', class_=['views-row', 'tender-row', 'search-result'])
-                    
-                    for listing in listings[:5]:  # Get first 5 per search
-                        title_elem = listing.find(['h3', 'h4', 'a'])
-                        if title_elem and any(keyword in str(listing).lower() for keyword in ['training', 'learning', 'development']):
-                            
-                            # Extract details
-                            title = title_elem.get_text(strip=True)
-                            link = title_elem.get('href', '')
-                            if link and not link.startswith('http'):
-                                link = f"https://canadabuys.canada.ca{link}"
-                            
-                            # Extract organization
-                            org_elem = listing.find(['span', 'div'], class_=['organization', 'agency'])
-                            organization = org_elem.get_text(strip=True) if org_elem else "Government of Canada"
-                            
-                            # Extract deadline
-                            deadline_elem = listing.find(['span', 'div'], class_=['closing-date', 'deadline'])
-                            deadline = deadline_elem.get_text(strip=True) if deadline_elem else self.extract_deadline_from_text(str(listing))
-                            
-                            self.opportunities.append({
-                                'title': title,
-                                'organization': organization,
-                                'source': 'BuyandSell.gc.ca',
-                                'url': link,
-                                'type': 'Federal',
-                                'deadline': deadline,
-                                'budget': self.extract_budget_from_text(str(listing)),
-                                'description': f"Training opportunity from {organization}",
-                                'contact': 'See tender document for contact details',
-                                'found_date': datetime.now().strftime("%Y-%m-%d")
-                            })
-                            
-            except Exception as e:
-                print(f"Error searching {term} on BuyandSell: {e}")
+                },
+                headers=self.headers,
+                timeout=15
+            )
+            for term in search_terms
+        ]
     
-    def search_merx(self):
-        """Search MERX for training opportunities"""
-        print("🔍 Searching MERX for real training opportunities...")
+    def search_canada_buyandsell(self):
+        """Search BuyandSell.gc.ca for training opportunities"""
+        print("🔍 Searching BuyandSell.gc.ca for real training opportunities...")
+        self._run_jobs(self.buyandsell_jobs())
+    
+    def _parse_buyandsell_listings(self, response):
+        """Extract training tenders from a CanadaBuys search results page"""
+        opportunities = []
+        # Only build the result rows, not the whole page
+        soup = parse_html(response.content, parse_only=only('div', class_=['views-row', 'tender-row', 'search-result']))
+        
+        # Find tender listings
+        listings = soup.find_all('div', class_=['views-row', 'tender-row', 'search-result'])
         
+        for listing in listings[:5]:  # Get first 5 per search
+            title_elem = listing.find(['h3', 'h4', 'a'])
+            if title_elem and any(keyword in str(listing).lower() for keyword in ['training', 'learning', 'development']):
+                
+                # Extract details
+                title = title_elem.get_text(strip=True)
+                link = title_elem.get('href', '')
+                if link and not link.startswith('http'):
+                    link = f"https://canadabuys.canada.ca{link}"
+                
+                # Extract organization
+                org_elem = listing.find(['span', 'div'], class_=['organization', 'agency'])
+                organization = org_elem.get_text(strip=True) if org_elem else "Government of Canada"
+                
+                # Extract deadline
+                deadline_elem = listing.find(['span', 'div'], class_=['closing-date', 'deadline'])
+                deadline = deadline_elem.get_text(strip=True) if deadline_elem else self.extract_deadline_from_text(str(listing))
+                
+                opportunities.append({
+                    'title': title,
+                    'organization': organization,
+                    'source': 'BuyandSell.gc.ca',
+                    'url': link,
+                    'type': 'Federal',
+                    'deadline': deadline,
+                    'budget': self.extract_budget_from_text(str(listing)),
+                    'description': f"Training opportunity from {organization}",
+                    'contact': 'See tender document for contact details',
+                    'found_date': datetime.now().strftime("%Y-%m-%d")
+                })
+        
+        return opportunities
+    
+    def merx_jobs(self):
+        """One MERX solicitation listing per category"""
         merx_categories = {
             'educational-and-training-services': '10043',
             'professional-admin-and-management-services': '10040'
         }
         
-        for category_name, category_id in merx_categories.items():
-            try:
-                url = f"https://www.merx.com/public/solicitations/{category_name}-{category_id}"
-                response = requests.get(url, headers=self.headers, timeout=15)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find listings - MERX uses table rows
-                    listings = soup.find_all('tr', class_='tender-row') or soup.find_all('div', class_='tender-item')
-                    
-                    for listing in listings[:10]:
-                        # Extract title and link
-                        title_elem = listing.find('a')
-                        if title_elem and 'training' in title_elem.get_text(strip=True).lower():
-                            title = title_elem.get_text(strip=True)
-                            link = title_elem.get('href', '')
-                            if link and not link.startswith('http'):
-                                link = f"https://www.merx.com{link}"
-                            
-                            # Extract organization
-                            org_elem = listing.find('td', class_='organization') or listing.find_all('td')[1]
-                            organization = org_elem.get_text(strip=True) if org_elem else "Canadian Organization"
-                            
-                            # Extract location
-                            loc_elem = listing.find('td', class_='location') or listing.find_all('td')[2]
-                            location = loc_elem.get_text(strip=True) if loc_elem else "Canada"
-                            
-                            # Extract deadline
-                            deadline_elem = listing.find('td', class_='closing') or listing.find_all('td')[-1]
-                            deadline = deadline_elem.get_text(strip=True) if deadline_elem else self.extract_deadline_from_text(str(listing))
-                            
-                            self.opportunities.append({
-                                'title': title,
-                                'organization': organization,
-                                'source': 'MERX',
-                                'url': link,
-                                'type': f'Various - {location}',
-                                'deadline': deadline,
-                                'budget': "See tender document",
-                                'description': f"Professional training services opportunity in {location}",
-                                'contact': 'Available on MERX platform',
-                                'found_date': datetime.now().strftime("%Y-%m-%d")
-                            })
-                            
-            except Exception as e:
-                print(f"Error searching MERX {category_name}: {e}")
+        return [
+            FetchJob(
+                label=f"MERX {category_name}",
+                url=f"https://www.merx.com/public/solicitations/{category_name}-{category_id}",
+                parse=self._parse_merx_listings,
+                headers=self.headers,
+                timeout=15
+            )
+            for category_name, category_id in merx_categories.items()
+        ]
     
-    def search_provincial_sites(self):
-        """Search provincial government sites"""
-        print("🔍 Searching provincial government sites...")
+    def search_merx(self):
+        """Search MERX for training opportunities"""
+        print("🔍 Searching MERX for real training opportunities...")
+        self._run_jobs(self.merx_jobs())
+    
+    def _parse_merx_listings(self, response):
+        """Extract training solicitations from a MERX category page"""
+        opportunities = []
+        soup = parse_html(response.content, parse_only=only(['tr', 'div'], class_=['tender-row', 'tender-item']))
+        
+        # Find listings - MERX uses table rows
+        listings = soup.find_all('tr', class_='tender-row') or soup.find_all('div', class_='tender-item')
         
+        for listing in listings[:10]:
+            # Extract title and link
+            title_elem = listing.find('a')
+            if title_elem and 'training' in title_elem.get_text(strip=True).lower():
+                title = title_elem.get_text(strip=True)
+                link = title_elem.get('href', '')
+                if link and not link.startswith('http'):
+                    link = f"https://www.merx.com{link}"
+                
+                # Extract organization
+                org_elem = listing.find('td', class_='organization') or listing.find_all('td')[1]
+                organization = org_elem.get_text(strip=True) if org_elem else "Canadian Organization"
+                
+                # Extract location
+                loc_elem = listing.find('td', class_='location') or listing.find_all('td')[2]
+                location = loc_elem.get_text(strip=True) if loc_elem else "Canada"
+                
+                # Extract deadline
+                deadline_elem = listing.find('td', class_='closing') or listing.find_all('td')[-1]
+                deadline = deadline_elem.get_text(strip=True) if deadline_elem else self.extract_deadline_from_text(str(listing))
+                
+                opportunities.append({
+                    'title': title,
+                    'organization': organization,
+                    'source': 'MERX',
+                    'url': link,
+                    'type': f'Various - {location}',
+                    'deadline': deadline,
+                    'budget': "See tender document",
+                    'description': f"Professional training services opportunity in {location}",
+                    'contact': 'Available on MERX platform',
+                    'found_date': datetime.now().strftime("%Y-%m-%d")
+                })
+        
+        return opportunities
+    
+    def provincial_jobs(self):
+        """One landing page per provincial tender portal"""
         provincial_sites = {
             'Ontario': {
                 'url': 'https://www.doingbusiness.mgs.gov.on.ca/mbs/psb/psb.nsf/English/BidsOpen',
@@ -183,25 +182,49 @@ class ComprehensiveRealOpportunityScraper:
             }
         }
         
-        for province, site_info in provincial_sites.items():
+        return [
+            FetchJob(
+                label=f"{province} site",
+                url=site_info['url'],
+                parse=lambda response, province=province, site_info=site_info: self._parse_provincial_site(province, site_info),
+                headers=self.headers,
+                timeout=10
+            )
+            for province, site_info in provincial_sites.items()
+        ]
+    
+    def search_provincial_sites(self):
+        """Search provincial government sites"""
+        print("🔍 Searching provincial government sites...")
+        self._run_jobs(self.provincial_jobs())
+    
+    def _parse_provincial_site(self, province, site_info):
+        """Add basic parsing - would need specific parsing for each site"""
+        return [{
+            'title': f"Check {province} Training Opportunities",
+            'organization': f"Government of {province}",
+            'source': site_info['name'],
+            'url': site_info['url'],
+            'type': 'Provincial',
+            'deadline': 'Various - Check site',
+            'budget': 'Various opportunities',
+            'description': f"Visit {site_info['name']} for current training and professional development tenders",
+            'contact': 'See individual tenders',
+            'found_date': datetime.now().strftime("%Y-%m-%d")
+        }]
+    
+    def fetch_jobs(self):
+        """Every network fetch this scraper makes, in merge order"""
+        return self.buyandsell_jobs() + self.merx_jobs() + self.provincial_jobs()
+    
+    def _run_jobs(self, jobs):
+        """Run jobs one at a time on the shared HTTP client"""
+        for job in jobs:
             try:
-                response = requests.get(site_info['url'], headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    # Add basic parsing - would need specific parsing for each site
-                    self.opportunities.append({
-                        'title': f"Check {province} Training Opportunities",
-                        'organization': f"Government of {province}",
-                        'source': site_info['name'],
-                        'url': site_info['url'],
-                        'type': 'Provincial',
-                        'deadline': 'Various - Check site',
-                        'budget': 'Various opportunities',
-                        'description': f"Visit {site_info['name']} for current training and professional development tenders",
-                        'contact': 'See individual tenders',
-                        'found_date': datetime.now().strftime("%Y-%m-%d")
-                    })
+                # Unchanged pages come back as 304 and skip parsing
+                self.opportunities.extend(self.http.run_job(job))
             except Exception as e:
-                print(f"Error accessing {province} site: {e}")
+                print(f"Error fetching {job.label}: {e}")
     
     def search_indigenous_opportunities(self):
         """Search for Indigenous-specific training opportunities"""
@@ -261,8 +284,8 @@ class ComprehensiveRealOpportunityScraper:
     
     def format_opportunity_for_display(self, opp):
         """Format opportunity for professional display"""
-        return {
-            'id': f"REAL-{datetime.now().timestamp()}-{hash(opp['title'])}",
+        return normalize_opportunity({
+            'id': make_lead_id(opp['url'], opp['organization'], opp['title'], prefix='REAL-'),
             'title': opp['title'],
             'organization': opp['organization'],
             'type': opp['type'],
@@ -288,10 +311,15 @@ class ComprehensiveRealOpportunityScraper:
             'key_requirements': 'See official tender documents',
             'training_type': 'Various - see details',
             'found_date': opp['found_date']
-        }
+        })
     
-    def get_all_real_opportunities(self):
-        """Get all real opportunities from multiple sources"""
+    def get_all_real_opportunities(self, backend='sync', engine=None):
+        """Get all real opportunities from multiple sources
+        
+        backend='async' runs every network fetch concurrently on an
+        AsyncFetchEngine (pass engine= to reuse one); the call itself stays
+        synchronous and returns the same list in the same order.
+        """
         print("\n" + "="*60)
         print("🚀 SEARCHING FOR REAL CANADIAN TRAINING OPPORTUNITIES")
         print("="*60)
@@ -300,9 +328,17 @@ class ComprehensiveRealOpportunityScraper:
         self.opportunities = []
         
         # Search all sources
-        self.search_canada_buyandsell()
-        self.search_merx()
-        self.search_provincial_sites()
+        if backend == 'async':
+            from async_engine import AsyncFetchEngine
+            engine = engine or AsyncFetchEngine(cache=self.http.cache, rate_limiter=self.http.rate_limiter,
+                                                fetch_policy=self.http.fetch_policy)
+            print("🔍 Fetching BuyandSell, MERX and provincial sites concurrently...")
+            for results in engine.run(self.fetch_jobs()):
+                self.opportunities.extend(results)
+        else:
+            self.search_canada_buyandsell()
+            self.search_merx()
+            self.search_provincial_sites()
         self.search_indigenous_opportunities()
         self.search_grants_and_contributions()
         
@@ -0,0 +1,205 @@
+import re
+import zlib
+
+from lead_ids import normalize_text
+
+DEFAULT_KEY_FIELDS = ('organization', 'opportunity')
+
+
+def dedup_key(record, fields=DEFAULT_KEY_FIELDS):
+    """Normalized identity of a record: case-, accent- and whitespace-folded key fields"""
+    return tuple(normalize_text(str(record.get(field) or '')) for field in fields)
+
+
+class StreamingDeduplicator:
+    """
+    Drop repeated records as they stream in, keeping the first of each.
+
+    Only the normalized keys seen so far are kept, so each record costs one
+    set lookup no matter how many came before it.
+    """
+
+    def __init__(self, fields=DEFAULT_KEY_FIELDS):
+        self.fields = fields
+        self.seen = set()
+
+    def add(self, record):
+        """Return True if the record is new (and remember it), False if it's a duplicate"""
+        key = dedup_key(record, self.fields)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        return True
+
+    def filter(self, records):
+        """Yield only the first record for each key"""
+        for record in records:
+            if self.add(record):
+                yield record
+
+    def __len__(self):
+        return len(self.seen)
+
+
+def unique_records(records, fields=DEFAULT_KEY_FIELDS):
+    """List of records with duplicates on the normalized key fields removed, order kept"""
+    return list(StreamingDeduplicator(fields).filter(records))
+
+
+_NON_WORD = re.compile(r'[\W_]+')
+_NUMBER = re.compile(r'\d+')
+_GOLDEN_RATIO_64 = 0x9E3779B97F4A7C15
+_MASK_64 = (1 << 64) - 1
+
+
+def shingles(text, size=4):
+    """Set of overlapping character n-grams of the normalized text"""
+    text = ' '.join(_NON_WORD.sub(' ', normalize_text(text)).split())
+    if not text:
+        return set()
+    return {text[i:i + size] for i in range(max(len(text) - size + 1, 1))}
+
+
+class MinHasher:
+    """
+    MinHash signatures using one-permutation hashing.
+
+    Each shingle is hashed once; the hash picks one of num_perm bins and the
+    rest of it competes for that bin's minimum. Empty bins borrow from the
+    next non-empty bin (rotation densification), so two identical shingle
+    sets always get identical signatures and the fraction of matching bins
+    estimates Jaccard similarity - at the cost of one hash per shingle rather
+    than num_perm.
+    """
+
+    def __init__(self, num_perm=64, seed=1):
+        self.num_perm = num_perm
+        self.seed = seed
+
+    def signature(self, shingle_set):
+        num_perm = self.num_perm
+        bins = [None] * num_perm
+        for shingle in shingle_set:
+            # crc32 is fast but weakly mixed; a golden-ratio multiply spreads it over 64 bits
+            h = (zlib.crc32(shingle.encode('utf-8'), self.seed) * _GOLDEN_RATIO_64) & _MASK_64
+            value, index = divmod(h, num_perm)
+            if bins[index] is None or value < bins[index]:
+                bins[index] = value
+
+        if None not in bins:
+            return tuple(bins)
+
+        # Walk the bins backwards (twice round) so each empty bin sees the next filled one
+        signature = [None] * num_perm
+        borrowed, distance = 0, 0
+        for position in range(2 * num_perm - 1, -1, -1):
+            value = bins[position % num_perm]
+            if value is not None:
+                borrowed, distance = value, 0
+            else:
+                distance += 1
+            if position < num_perm:
+                # Tag borrowed values with their distance so they only match the same borrowing
+                signature[position] = value if value is not None else (borrowed, distance)
+        return tuple(signature)
+
+
+class NearDuplicateClusterer:
+    """
+    Merge records whose titles are near-duplicates, e.g. the same tender
+    posted on CanadaBuys, MERX and a provincial portal with slightly
+    different wording.
+
+    Titles are shingled into character n-grams and MinHashed; LSH banding
+    (bands x rows signature slices) buckets likely matches so only records
+    sharing a bucket are compared - roughly linear in the number of records
+    instead of all-pairs. Candidates are confirmed with the exact Jaccard
+    similarity of their shingles (>= threshold) and merged with union-find.
+
+    Clusters whose titles mention different numbers (years, lot or phase
+    numbers) are never merged.
+
+    Records are clustered in order of their shingled text rather than as
+    given, so the same records always form the same clusters whatever
+    order the sources returned them in - which matters when a title is
+    close to two others that the numbers rule keeps apart.
+    """
+
+    def __init__(self, threshold=0.7, bands=16, rows=4, shingle_size=4,
+                 text_fields=('title',), source_fields=('source', 'url')):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self.text_fields = text_fields
+        self.source_fields = source_fields
+        self.hasher = MinHasher(num_perm=bands * rows)
+
+    def _text(self, record):
+        return ' '.join(str(record.get(field) or '') for field in self.text_fields)
+
+    def clusters(self, records):
+        """Group record indexes into clusters, each in input order"""
+        parent = list(range(len(records)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        texts = [self._text(record) for record in records]
+        shingle_sets = [shingles(text, self.shingle_size) for text in texts]
+        numbers = [set(_NUMBER.findall(text)) for text in texts]
+        # Records with the same key have the same shingles and numbers, so ties can't change the result
+        order = sorted(range(len(records)), key=lambda i: (sorted(shingle_sets[i]), sorted(numbers[i])))
+        rank = {i: position for position, i in enumerate(order)}
+
+        buckets = {}
+        for i in order:
+            shingle_set = shingle_sets[i]
+            if not shingle_set:
+                continue
+
+            signature = self.hasher.signature(shingle_set)
+            candidates = set()
+            for band in range(self.bands):
+                key = (band, signature[band * self.rows:(band + 1) * self.rows])
+                bucket = buckets.setdefault(key, [])
+                candidates.update(bucket)
+                bucket.append(i)
+
+            for j in sorted(candidates, key=rank.__getitem__):
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j:
+                    continue
+                if numbers[root_i] and numbers[root_j] and numbers[root_i] != numbers[root_j]:
+                    continue
+                other = shingle_sets[j]
+                if len(shingle_set & other) / len(shingle_set | other) >= self.threshold:
+                    parent[root_i] = root_j
+                    numbers[root_j] = numbers[root_j] or numbers[root_i]
+
+        groups = {}
+        for i in range(len(records)):
+            groups.setdefault(find(i), []).append(i)
+        return list(groups.values())
+
+    def merge(self, records):
+        """
+        One canonical record per cluster, in input order.
+
+        The first record of each cluster is kept (so earlier, more trusted
+        sources win) and gets a `sources` list naming every record merged into it.
+        """
+        merged = []
+        for cluster in self.clusters(records):
+            canonical = dict(records[cluster[0]])
+            sources = []
+            for i in cluster:
+                source = {field: records[i][field] for field in self.source_fields if records[i].get(field)}
+                if source and source not in sources:
+                    sources.append(source)
+            canonical['sources'] = sources
+            merged.append(canonical)
+        return merged
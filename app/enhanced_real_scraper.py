@@ -1,17 +1,49 @@
-import requests
 from datetime import datetime, timedelta
 import json
 import feedparser
 import re
+import copy
+import time
+import math
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from urllib.parse import quote
+from dedup import NearDuplicateClusterer
+from extraction import normalize_opportunity
+from http_client import get_shared_client
+from keyword_matcher import KeywordAutomaton
+from lead_ids import make_lead_id
+
+# Feed entries are kept when their title mentions any of these
+FEED_KEYWORDS = ['training', 'learning', 'development', 'education', 'skills',
+                 'professional', 'capacity building', 'competency', 'workshop',
+                 'certification', 'course', 'program']
+FEED_KEYWORD_MATCHER = KeywordAutomaton({'keyword': FEED_KEYWORDS})
 
 class EnhancedRealOpportunityScraper:
     """
     Enhanced real opportunity finder that scales to find more opportunities
     """
     
-    def __init__(self):
+    # Source methods in merge order - results are always combined in this order
+    SOURCES = [
+        'search_canada_rss_feeds',
+        'search_federal_programs',
+        'search_all_provincial_programs',
+        'search_indigenous_programs',
+        'search_sector_specific_programs',
+        'search_current_rfps_and_tenders',
+        'search_nonprofit_and_foundation_programs'
+    ]
+    
+    # How often _run_sources_concurrently checks for sources that have run too long
+    POLL_INTERVAL = 1.0
+    
+    def __init__(self, max_workers=4, source_timeout=30, http=None):
+        self.http = http or get_shared_client()
         self.opportunities = []
+        self.max_workers = max_workers
+        self.source_timeout = source_timeout
+        self.source_timings = {}
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (compatible; CanadianTrainingOpportunityBot/1.0)'
         }
@@ -33,31 +65,40 @@ class EnhancedRealOpportunityScraper:
             }
         ]
         
-        keywords = ['training', 'learning', 'development', 'education', 'skills', 
-                   'professional', 'capacity building', 'competency', 'workshop',
-                   'certification', 'course', 'program']
-        
         for feed_info in rss_feeds:
             try:
-                feed = feedparser.parse(feed_info['url'])
-                
-                for entry in feed.entries[:30]:  # Check more entries
-                    if any(keyword in entry.title.lower() for keyword in keywords):
-                        self.opportunities.append({
-                            'title': entry.title,
-                            'organization': 'Government of Canada',
-                            'source': feed_info['name'],
-                            'url': entry.link,
-                            'type': feed_info['type'],
-                            'deadline': entry.get('published', 'Check tender document'),
-                            'budget': 'See tender document',
-                            'description': entry.get('summary', entry.title)[:200],
-                            'contact': 'See tender document',
-                            'found_date': datetime.now().strftime("%Y-%m-%d")
-                        })
+                # A 304 from the feed reuses the entries parsed last cycle
+                self.opportunities.extend(self.http.get_parsed(
+                    feed_info['url'],
+                    lambda response, feed_info=feed_info: self._parse_feed(response, feed_info),
+                    headers=self.headers,
+                    timeout=15
+                ))
             except Exception as e:
                 print(f"Error parsing RSS feed {feed_info['name']}: {e}")
     
+    def _parse_feed(self, response, feed_info):
+        """Turn a downloaded RSS/Atom feed into opportunities"""
+        feed = feedparser.parse(response.content)
+        opportunities = []
+        
+        for entry in feed.entries[:30]:  # Check more entries
+            if 'keyword' in FEED_KEYWORD_MATCHER.scan(entry.title):
+                opportunities.append({
+                    'title': entry.title,
+                    'organization': 'Government of Canada',
+                    'source': feed_info['name'],
+                    'url': entry.link,
+                    'type': feed_info['type'],
+                    'deadline': entry.get('published', 'Check tender document'),
+                    'budget': 'See tender document',
+                    'description': entry.get('summary', entry.title)[:200],
+                    'contact': 'See tender document',
+                    'found_date': datetime.now().strftime("%Y-%m-%d")
+                })
+        
+        return opportunities
+    
     def search_all_provincial_programs(self):
         """Comprehensive list of provincial training programs"""
         print("🔍 Adding all provincial training programs...")
@@ -584,8 +625,8 @@ class EnhancedRealOpportunityScraper:
     
     def format_opportunity_for_display(self, opp):
         """Format opportunity for professional display"""
-        return {
-            'id': f"REAL-{datetime.now().timestamp()}-{hash(opp['title'])}",
+        return normalize_opportunity({
+            'id': make_lead_id(opp['url'], opp['organization'], opp['title'], prefix='REAL-'),
             'title': opp['title'],
             'organization': opp['organization'],
             'type': opp['type'],
@@ -610,47 +651,151 @@ class EnhancedRealOpportunityScraper:
             'decision_makers': 'See official documentation',
             'key_requirements': 'Visit official website',
             'training_type': opp['type'],
-            'found_date': opp['found_date']
-        }
+            'found_date': opp['found_date'],
+            'sources': opp.get('sources') or [{'source': opp['source'], 'url': opp['url']}]
+        })
+    
+    def _run_source(self, method_name, started=None):
+        """
+        Run a single source method on a private copy and return its results and wall time.
+        The start time is also recorded in started[method_name], if given.
+        """
+        worker = copy.copy(self)
+        worker.opportunities = []
+        start = time.perf_counter()
+        if started is not None:
+            started[method_name] = start
+        getattr(worker, method_name)()
+        return worker.opportunities, time.perf_counter() - start
+    
+    def _run_sources_sequentially(self):
+        """Run every source one after another, returning results per source"""
+        results = {}
+        for method_name in self.SOURCES:
+            try:
+                opportunities, elapsed = self._run_source(method_name)
+                results[method_name] = opportunities
+                self.source_timings[method_name] = {'seconds': round(elapsed, 3), 'status': 'ok', 'count': len(opportunities)}
+            except Exception as e:
+                print(f"Error running {method_name}: {e}")
+                results[method_name] = []
+                self.source_timings[method_name] = {'seconds': None, 'status': 'error', 'count': 0}
+        return results
     
-    def get_all_real_opportunities(self):
-        """Get all real opportunities from multiple sources"""
+    def _run_sources_concurrently(self):
+        """
+        Run every source on a bounded worker pool with a per-source timeout.
+        
+        Each source's source_timeout is counted from when a worker actually
+        starts it, not from submission - with more sources than workers, the
+        ones waiting in the queue would otherwise time out before running.
+        """
+        results = {}
+        started = {}  # source -> perf_counter() when a worker picked it up
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='source')
+        try:
+            pending = {executor.submit(self._run_source, name, started): name for name in self.SOURCES}
+            # A timed-out source keeps its worker busy, so queued sources could wait
+            # forever behind it; give up on ones that haven't started by the time
+            # every batch of max_workers sources should have finished
+            give_up_at = time.perf_counter() + self.source_timeout * math.ceil(len(pending) / self.max_workers)
+            
+            while pending:
+                done, _ = wait(pending, timeout=self._next_timeout(pending, started, give_up_at),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    method_name = pending.pop(future)
+                    try:
+                        opportunities, elapsed = future.result()
+                        results[method_name] = opportunities
+                        self.source_timings[method_name] = {'seconds': round(elapsed, 3), 'status': 'ok', 'count': len(opportunities)}
+                    except Exception as e:
+                        print(f"Error running {method_name}: {e}")
+                        results[method_name] = []
+                        self.source_timings[method_name] = {'seconds': None, 'status': 'error', 'count': 0}
+                
+                now = time.perf_counter()
+                for future, method_name in list(pending.items()):
+                    start = started.get(method_name)
+                    if start is None and now < give_up_at:
+                        continue
+                    if start is not None and now - start < self.source_timeout:
+                        continue
+                    print(f"⏱️ {method_name} timed out after {self.source_timeout}s - skipping")
+                    future.cancel()
+                    del pending[future]
+                    results[method_name] = []
+                    self.source_timings[method_name] = {'seconds': self.source_timeout if start is not None else 0,
+                                                        'status': 'timeout', 'count': 0}
+        finally:
+            # Don't block on sources that timed out - their results are discarded
+            executor.shutdown(wait=False)
+        return results
+    
+    def _next_timeout(self, pending, started, give_up_at):
+        """Seconds until the next running source times out (or queued sources are given up on)"""
+        deadlines = [started[name] + self.source_timeout for name in pending.values() if name in started]
+        deadlines.append(give_up_at)
+        # Queued sources start between checks, so look again at least every POLL_INTERVAL
+        return max(0, min(min(deadlines) - time.perf_counter(), self.POLL_INTERVAL))
+    
+    def collect_sources(self, concurrent=False):
+        """Run every source, returning {source method: raw opportunities} and filling source_timings"""
+        self.source_timings = {}
+        if concurrent:
+            return self._run_sources_concurrently()
+        return self._run_sources_sequentially()
+    
+    def merge_sources(self, results):
+        """Combine per-source results into one deduplicated list of raw opportunities"""
+        # Merge in declared source order so output is deterministic
+        self.opportunities = []
+        for method_name in self.SOURCES:
+            self.opportunities.extend(results.get(method_name, []))
+        
+        # Merge the same opportunity listed by several sources under slightly different titles
+        return NearDuplicateClusterer(text_fields=('title',)).merge(self.opportunities)
+    
+    def get_all_real_opportunities(self, concurrent=False, with_timings=False):
+        """Get all real opportunities from multiple sources
+        
+        With concurrent=True every source runs on a pool of max_workers threads and
+        a refresh takes about as long as the slowest source. With with_timings=True
+        the return value is (opportunities, source_timings) where source_timings maps
+        each source method to its wall time, status and result count.
+        """
         print("\n" + "="*60)
         print("🚀 ENHANCED SEARCH FOR CANADIAN TRAINING OPPORTUNITIES")
         print("="*60)
         
-        # Clear previous results
-        self.opportunities = []
-        
         # Search all sources
-        self.search_canada_rss_feeds()
-        self.search_federal_programs()
-        self.search_all_provincial_programs()
-        self.search_indigenous_programs()
-        self.search_sector_specific_programs()
-        self.search_current_rfps_and_tenders()
-        self.search_nonprofit_and_foundation_programs()
-        
-        # Remove duplicates based on title
-        unique_opportunities = []
-        seen_titles = set()
-        for opp in self.opportunities:
-            if opp['title'] not in seen_titles:
-                seen_titles.add(opp['title'])
-                unique_opportunities.append(opp)
+        results = self.collect_sources(concurrent)
+        unique_opportunities = self.merge_sources(results)
         
         # Format for display
         formatted_opportunities = [self.format_opportunity_for_display(opp) for opp in unique_opportunities]
         
         print(f"\n✅ Found {len(formatted_opportunities)} REAL opportunities")
+        slowest = max(self.source_timings.items(), key=lambda x: x[1]['seconds'] or 0, default=None)
+        if slowest:
+            print(f"⏱️ Slowest source: {slowest[0]} ({slowest[1]['seconds']}s)")
         print("="*60)
         
+        if with_timings:
+            return formatted_opportunities, self.source_timings
         return formatted_opportunities
 
 # Test the enhanced scraper
 if __name__ == "__main__":
     scraper = EnhancedRealOpportunityScraper()
-    real_opps = scraper.get_all_real_opportunities()
+    real_opps, timings = scraper.get_all_real_opportunities(concurrent=True, with_timings=True)
+    
+    print("\nSource wall times:")
+    for source, timing in timings.items():
+        print(f"  {source}: {timing['seconds']}s ({timing['status']}, {timing['count']} found)")
+    
+    connections = scraper.http.connection_stats()
+    print(f"\nHTTP connections: {connections['opened']} opened, {connections['reused']} reused")
     
     print("\nENHANCED REAL OPPORTUNITIES FOUND:")
     print("-" * 60)
@@ -0,0 +1,225 @@
+import re
+from datetime import date
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+# Dollar amounts: "$15M", "$1.5 million", "$10,000", "5 million"
+_UNIT_WORDS = r'thousand|million|billion'
+AMOUNT_PATTERN = re.compile(
+    r'\$\s*(?P<number>\d[\d,]*(?:\.\d+)?)(?:\s*(?P<word>' + _UNIT_WORDS + r')\b|(?P<letter>[KMB])\b)?'
+    r'|(?P<bare>\d[\d,]*(?:\.\d+)?)\s*(?P<bare_word>' + _UNIT_WORDS + r')\b',
+    re.IGNORECASE
+)
+# Ranges: "$1-5M", "$1.5 to 2.5 million", "between $2 and $3 million" - the unit
+# may be written once, after the upper bound only. Joined by a word, the upper
+# bound must be money ("$" or a unit): "$50,000 and 200 employees" is no range
+_RANGE_BOUND = r'(?P<{0}>\d[\d,]*(?:\.\d+)?)(?:\s*(?P<{0}_word>' + _UNIT_WORDS + r')\b|(?P<{0}_letter>[KMB])\b)?'
+RANGE_PATTERN = re.compile(
+    r'(?P<low_dollar>\$)?\s*' + _RANGE_BOUND.format('low') +
+    r'\s*(?P<joiner>-|\u2013|\u2014|\bto\b|\band\b)\s*(?P<high_dollar>\$)?\s*' + _RANGE_BOUND.format('high'),
+    re.IGNORECASE
+)
+UP_TO_PATTERN = re.compile(r'\b(?:up\s+to|maximum\s+of|max\.?)\s*\$?\d', re.IGNORECASE)
+MULTI_MILLION_PATTERN = re.compile(r'\bmulti[-\s]?million\b', re.IGNORECASE)
+
+_MULTIPLIERS = {
+    'k': 1_000, 'thousand': 1_000,
+    'm': 1_000_000, 'million': 1_000_000,
+    'b': 1_000_000_000, 'billion': 1_000_000_000
+}
+
+# Where to look for a budget in listing text, most specific first
+BUDGET_TEXT_PATTERNS = [
+    re.compile(r'\$[\d,]+(?:\.\d{2})?(?:[KMB])?'),
+    re.compile(r'[\d,]+(?:\.\d{2})?\s*(?:thousand|million|billion)', re.IGNORECASE),
+    re.compile(r'budget.*?[\d,]+', re.IGNORECASE)
+]
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+_MONTH_NAME = (r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|'
+               r'aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)')
+
+ISO_DATE_PATTERN = re.compile(r'\b(\d{4})[-/](\d{1,2})[-/](\d{1,2})\b')
+MONTH_DAY_YEAR_PATTERN = re.compile(r'\b(' + _MONTH_NAME + r')\.?\s+(\d{1,2}),?\s+(\d{4})\b', re.IGNORECASE)
+DAY_MONTH_YEAR_PATTERN = re.compile(r'\b(\d{1,2})\s+(' + _MONTH_NAME + r')\.?,?\s+(\d{4})\b', re.IGNORECASE)
+QUARTER_PATTERN = re.compile(r'\bQ([1-4])\s*(\d{4})\b', re.IGNORECASE)
+
+# Where to look for a deadline in listing text, most specific first
+DEADLINE_TEXT_PATTERNS = [
+    re.compile(r'closing.*?(\d{4}/\d{2}/\d{2})', re.IGNORECASE),
+    re.compile(r'deadline.*?(\d{4}/\d{2}/\d{2})', re.IGNORECASE),
+    re.compile(r'(\d{4}/\d{2}/\d{2})'),
+    re.compile(r'(' + _MONTH_NAME + r'\.?\s+\d{1,2},?\s+\d{4})', re.IGNORECASE)
+]
+
+
+def find_budget_text(text):
+    """Return the first budget-looking snippet in free text, or None"""
+    for pattern in BUDGET_TEXT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(0)
+    return None
+
+
+def find_deadline_text(text):
+    """Return the first deadline-looking snippet in free text, or None"""
+    for pattern in DEADLINE_TEXT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _amount(match):
+    number = match.group('number') or match.group('bare')
+    unit = match.group('word') or match.group('letter') or match.group('bare_word')
+    try:
+        value = float(number.replace(',', ''))
+    except ValueError:
+        return None
+    if unit:
+        value *= _MULTIPLIERS[unit.lower()]
+    return int(round(value))
+
+
+def _number(text):
+    return float(text.replace(',', ''))
+
+
+def _range_bounds(match):
+    """(low, high) for a RANGE_PATTERN match, or None if it isn't a money range"""
+    try:
+        low, high = _number(match.group('low')), _number(match.group('high'))
+    except ValueError:
+        return None
+    # "FY 2025 - 5 million" is a year and an amount, not a range
+    if not match.group('low_dollar') and not (match.group('high_word') and low <= high):
+        return None
+    low_unit = match.group('low_word') or match.group('low_letter')
+    high_unit = match.group('high_word') or match.group('high_letter')
+    if match.group('joiner').isalpha() and not (match.group('high_dollar') or high_unit):
+        return None
+    if not low_unit and low <= high:
+        # "$1-5M": the upper bound's unit applies to the lower bound too
+        low_unit = high_unit
+    if low_unit:
+        low *= _MULTIPLIERS[low_unit.lower()]
+    if high_unit:
+        high *= _MULTIPLIERS[high_unit.lower()]
+    if low > high:
+        return None
+    return int(round(low)), int(round(high))
+
+
+@lru_cache(maxsize=4096)
+def parse_budget(text):
+    """
+    Normalize a budget string to (budget_min, budget_max) in CAD.
+
+    '$500K - $1M'      -> (500000, 1000000)
+    '$1-5M'            -> (1000000, 5000000)
+    'Up to $1.5 million' -> (None, 1500000)
+    '$28,000'          -> (28000, 28000)
+    'TBD'              -> (None, None)
+    """
+    if not text:
+        return None, None
+
+    amounts = []
+    ranges = []
+    for match in RANGE_PATTERN.finditer(text):
+        bounds = _range_bounds(match)
+        if bounds:
+            amounts.extend(bounds)
+            ranges.append(match.span())
+    for match in AMOUNT_PATTERN.finditer(text):
+        if any(start <= match.start() < end for start, end in ranges):
+            continue  # already read as part of a range
+        value = _amount(match)
+        if value is not None:
+            amounts.append(value)
+    if not amounts:
+        if MULTI_MILLION_PATTERN.search(text):
+            return 1_000_000, None
+        return None, None
+
+    if UP_TO_PATTERN.search(text):
+        return None, max(amounts)
+    return min(amounts), max(amounts)
+
+
+def _safe_date(year, month, day):
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _quarter_end(year, quarter):
+    month = int(quarter) * 3
+    return date(int(year), month, 31 if month in (3, 12) else 30)
+
+
+@lru_cache(maxsize=4096)
+def parse_deadline(text):
+    """
+    Normalize a deadline string to an ISO 'YYYY-MM-DD' date, or None.
+
+    Understands 2025-03-31, 2025/03/31, 'March 31, 2025', '31 Mar 2025',
+    feed timestamps ('Mon, 06 Jan 2025 10:00:00 -0500') and quarters
+    ('Q3 2025' -> the last day of the quarter). Open-ended deadlines such as
+    'Ongoing' have no date.
+    """
+    if not text:
+        return None
+
+    match = ISO_DATE_PATTERN.search(text)
+    if match:
+        parsed = _safe_date(*match.groups())
+        if parsed:
+            return parsed.isoformat()
+
+    match = MONTH_DAY_YEAR_PATTERN.search(text)
+    if match:
+        month, day, year = match.groups()
+        parsed = _safe_date(year, _MONTHS[month[:3].lower()], day)
+        if parsed:
+            return parsed.isoformat()
+
+    match = DAY_MONTH_YEAR_PATTERN.search(text)
+    if match:
+        day, month, year = match.groups()
+        parsed = _safe_date(year, _MONTHS[month[:3].lower()], day)
+        if parsed:
+            return parsed.isoformat()
+
+    match = QUARTER_PATTERN.search(text)
+    if match:
+        quarter, year = match.groups()
+        return _quarter_end(year, quarter).isoformat()
+
+    try:
+        return parsedate_to_datetime(text).date().isoformat()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def normalize_opportunity(opp, budget_field='budget', deadline_field='deadline'):
+    """
+    Add numeric budget_min/budget_max (CAD) and an ISO deadline_date to a record.
+
+    Run once at ingest so scoring, sorting and totals can compare numbers
+    instead of re-scanning the display strings.
+    """
+    opp['budget_min'], opp['budget_max'] = parse_budget(opp.get(budget_field) or '')
+    opp['deadline_date'] = parse_deadline(opp.get(deadline_field) or '')
+    return opp
+
+
+def budget_value(opp, default=0):
+    """Best single figure for a record's budget: the ceiling, else the floor"""
+    return opp.get('budget_max') or opp.get('budget_min') or default
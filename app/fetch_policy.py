@@ -0,0 +1,186 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+import requests
+
+# Responses worth retrying - the server is overloaded or briefly unavailable
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of fetching while a source's circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Per-source circuit breaker.
+
+    closed    - requests flow normally
+    open      - after failure_threshold consecutive failures, every request is
+                refused until cooldown seconds have passed
+    half-open - after the cooldown one trial request is let through; success
+                closes the circuit, failure opens it again
+
+    clock returns the current time in seconds (time.monotonic unless a test
+    supplies its own).
+    """
+
+    def __init__(self, source, failure_threshold=3, cooldown=300, clock=time.monotonic):
+        self.source = source
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and self.clock() - self.opened_at >= self.cooldown:
+                self.state = 'half-open'
+                return True
+            # Open, or half-open with the trial request already in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half-open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    print(f"⚡ Circuit open for {self.source} after {self.failures} failures - "
+                          f"skipping for {self.cooldown}s")
+                self.state = 'open'
+                self.opened_at = self.clock()
+
+    def status(self):
+        return {'state': self.state, 'failures': self.failures}
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff"""
+
+    def __init__(self, max_attempts=2, base_delay=0.5, max_delay=8.0):
+        self.max_attempts = max(int(max_attempts), 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        """Sleep before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class FetchPolicy:
+    """
+    Retry and circuit-breaker policy shared by the HTTP client and the async engine.
+
+    call()/call_async() wrap a zero-argument send function. Failures (raised
+    exceptions and RETRY_STATUSES responses) are retried while should_retry
+    allows it and are counted against the source's breaker; once the breaker
+    opens, calls fail immediately with CircuitOpenError until the cooldown ends.
+
+    clock, sleep and async_sleep default to the real ones; tests pass their own.
+    """
+
+    def __init__(self, retry=None, failure_threshold=3, cooldown=300,
+                 clock=time.monotonic, sleep=time.sleep, async_sleep=asyncio.sleep):
+        self.retry = retry or RetryPolicy(
+            max_attempts=int(os.getenv('LEADGEN_FETCH_ATTEMPTS', '2'))
+        )
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, source):
+        with self._lock:
+            if source not in self._breakers:
+                self._breakers[source] = CircuitBreaker(source, self.failure_threshold, self.cooldown,
+                                                        self.clock)
+            return self._breakers[source]
+
+    def status(self):
+        """Breaker state per source"""
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {source: breaker.status() for source, breaker in breakers}
+
+    def call(self, source, send, should_retry=lambda error: True):
+        breaker = self.breaker(source)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {source}")
+
+        for attempt in range(1, self.retry.max_attempts + 1):
+            last_attempt = attempt == self.retry.max_attempts
+            try:
+                response = send()
+            except Exception as e:
+                if last_attempt or not should_retry(e):
+                    breaker.record_failure()
+                    raise
+                self.sleep(self.retry.delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES:
+                if last_attempt:
+                    breaker.record_failure()
+                    return response
+                self.sleep(self.retry.delay(attempt))
+                continue
+
+            breaker.record_success()
+            return response
+
+    async def call_async(self, source, send, should_retry=lambda error: True):
+        """call() for coroutine send functions"""
+        breaker = self.breaker(source)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {source}")
+
+        for attempt in range(1, self.retry.max_attempts + 1):
+            last_attempt = attempt == self.retry.max_attempts
+            try:
+                response = await send()
+            except Exception as e:
+                if last_attempt or not should_retry(e):
+                    breaker.record_failure()
+                    raise
+                await self.async_sleep(self.retry.delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES:
+                if last_attempt:
+                    breaker.record_failure()
+                    return response
+                await self.async_sleep(self.retry.delay(attempt))
+                continue
+
+            breaker.record_success()
+            return response
+
+
+_shared_policy = None
+_shared_policy_lock = threading.Lock()
+
+
+def get_shared_fetch_policy(**kwargs):
+    """Return the process-wide FetchPolicy, creating it on first use"""
+    global _shared_policy
+    with _shared_policy_lock:
+        if _shared_policy is None:
+            _shared_policy = FetchPolicy(**kwargs)
+        return _shared_policy
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_ARCHIVE_DIR = os.getenv(
+    'LEADGEN_FETCH_ARCHIVE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fetch_archive')
+)
+
+# Headers that describe the wire encoding of the original body, not the stored one
+_WIRE_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class FetchArchive:
+    """
+    Local archive of raw HTTP responses keyed by method and full URL.
+
+    Each response is stored as <key>.json (method, url, status, reason,
+    headers) plus <key>.body (the decoded body).
+    """
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, method, url, suffix):
+        key = hashlib.sha256(f"{method.upper()} {url}".encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + suffix)
+
+    def save(self, method, url, response):
+        entry = {
+            'method': method.upper(),
+            'url': url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in _WIRE_HEADERS}
+        }
+        with self._lock:
+            with open(self._path(method, url, '.body'), 'wb') as f:
+                f.write(response.content)
+            with open(self._path(method, url, '.json'), 'w', encoding='utf-8') as f:
+                json.dump(entry, f, indent=2)
+
+    def load(self, method, url):
+        """Return (entry, body) for a recorded request, or None"""
+        try:
+            with open(self._path(method, url, '.json'), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(self._path(method, url, '.body'), 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry, body
+
+    def __len__(self):
+        return len([name for name in os.listdir(self.directory) if name.endswith('.json')])
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that saves every response it receives into a FetchArchive"""
+
+    def __init__(self, archive, **kwargs):
+        self.archive = archive
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Reading .content consumes the stream; requests keeps it for the caller
+        self.archive.save(request.method, request.url, response)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter that serves responses from a FetchArchive instead of the network.
+
+    latency adds an artificial delay per request so pipeline throughput can be
+    measured under realistic network conditions. Requests that were never
+    recorded fail with requests.ConnectionError, just like an unreachable host.
+    """
+
+    def __init__(self, archive, latency=0.0):
+        super().__init__()
+        self.archive = archive
+        self.latency = latency
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        recorded = self.archive.load(request.method, request.url)
+        if recorded is None:
+            raise requests.ConnectionError(f"No recording for {request.method} {request.url}", request=request)
+        entry, body = recorded
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
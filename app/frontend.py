@@ -636,7 +636,7 @@ HTML_TEMPLATE = '''
         <div id="loading" class="loading">
             <div class="loading-spinner"></div>
             <p style="margin-top: 1rem; font-size: 1.125rem;">Searching for training opportunities...</p>
-            <p style="margin-top: 0.5rem; color: var(--text-dim);">This may take a moment as we search across Canadian government sources</p>
+            <p id="loading-progress" style="margin-top: 0.5rem; color: var(--text-dim);">This may take a moment as we search across Canadian government sources</p>
         </div>
         
         <div id="empty-state" class="empty-state" style="display: none;">
@@ -651,6 +651,7 @@ HTML_TEMPLATE = '''
     
     <script>
         let allLeads = [];
+        let leadsEtag = null;
         let leadStatuses = JSON.parse(localStorage.getItem('leadStatuses') || '{}');
         let leadNotes = JSON.parse(localStorage.getItem('leadNotes') || '{}');
         
@@ -748,15 +749,20 @@ HTML_TEMPLATE = '''
         
         async function loadLeads() {
             try {
+                // The browser revalidates with If-None-Match, so an unchanged list comes back as a 304
                 const response = await fetch('http://localhost:5000/api/leads');
-                const data = await response.json();
-                allLeads = data.leads || [];
-                
-                document.getElementById('last-update').textContent = 
-                    data.last_update ? `Last updated: ${data.last_update}` : '';
-                
-                updateStats();
-                displayLeads();
+                const etag = response.headers.get('ETag');
+                if (!etag || etag !== leadsEtag) {
+                    const data = await response.json();
+                    allLeads = data.leads || [];
+                    leadsEtag = etag;
+                    
+                    document.getElementById('last-update').textContent = 
+                        data.last_update ? `Last updated: ${data.last_update}` : '';
+                    
+                    updateStats();
+                    displayLeads();
+                }
                 
                 document.getElementById('loading').style.display = 'none';
                 if (allLeads.length === 0) {
@@ -829,7 +835,30 @@ HTML_TEMPLATE = '''
             document.getElementById('empty-state').style.display = 'none';
             
             try {
-                await fetch('http://localhost:5000/api/refresh');
+                // The refresh runs in the background; follow its job until it finishes
+                const response = await fetch('http://localhost:5000/api/refresh', { method: 'POST' });
+                const body = await response.json();
+                if (!response.ok || !body.job) {
+                    throw new Error(body.error || `Refresh request failed (${response.status})`);
+                }
+                let job = body.job;
+                while (job.status === 'queued' || job.status === 'running') {
+                    const sources = Object.values(job.sources || {});
+                    const finished = sources.filter(s => s.status === 'done' || s.status === 'failed').length;
+                    if (sources.length) {
+                        document.getElementById('loading-progress').textContent = 
+                            `Searched ${finished} of ${sources.length} sources...`;
+                    }
+                    await new Promise(resolve => setTimeout(resolve, 2000));
+                    const poll = await fetch(`http://localhost:5000/api/refresh/${body.job_id}`);
+                    job = await poll.json();
+                    if (!poll.ok || !job.status) {
+                        throw new Error(job.error || `Lost track of refresh job ${body.job_id} (${poll.status})`);
+                    }
+                }
+                if (job.status === 'failed') {
+                    throw new Error(job.error);
+                }
                 await loadLeads();
             } catch (error) {
                 console.error('Error refreshing leads:', error);
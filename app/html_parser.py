@@ -0,0 +1,35 @@
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml is several times faster than the pure-Python html.parser; fall back when it isn't installed
+try:
+    import lxml  # noqa: F401
+    _AVAILABLE_BACKEND = 'lxml'
+except ImportError:
+    _AVAILABLE_BACKEND = 'html.parser'
+
+DEFAULT_BACKEND = os.getenv('LEADGEN_HTML_PARSER', _AVAILABLE_BACKEND)
+
+
+def only(name=None, class_=None, **attrs):
+    """
+    Describe the subtrees worth building, e.g. only('div', class_='search-result').
+
+    Matching elements are kept together with all of their descendants;
+    everything else on the page is skipped while parsing.
+    """
+    if class_ is not None:
+        attrs['class_'] = class_
+    return SoupStrainer(name, **attrs)
+
+
+def parse_html(markup, parse_only=None, backend=None):
+    """
+    Parse a listing page into a BeautifulSoup tree.
+
+    Pass parse_only=only(...) to build just the target nodes (result rows,
+    articles) instead of the whole page - on large procurement listings this
+    is most of the parse cost.
+    """
+    return BeautifulSoup(markup, backend or DEFAULT_BACKEND, parse_only=parse_only)
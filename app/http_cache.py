@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_CACHE_DIR = os.getenv(
+    'LEADGEN_HTTP_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.http_cache')
+)
+
+# Part of every parsed-output key: bump it when a parser's output changes so
+# output cached by the previous code is ignored after a deploy
+PARSER_VERSION = 1
+
+
+def parser_key(parse):
+    """Identity of a parse callable (module, qualified name and PARSER_VERSION) for the parsed-output cache"""
+    func = getattr(parse, 'func', parse)  # functools.partial
+    name = getattr(func, '__qualname__', None) or repr(func)
+    return f"{getattr(func, '__module__', '')}.{name}@{PARSER_VERSION}"
+
+
+class ResponseCache:
+    """
+    Persistent on-disk HTTP response cache keyed by URL.
+
+    For every cached URL we keep three files:
+      <key>.json        - status, headers and the ETag/Last-Modified validators
+      <key>.body        - raw response body
+      <key>.parsed.json - parser output, one file per parser (see parser_key),
+                          tagged with the validator it was built from
+
+    The validators are replayed as If-None-Match / If-Modified-Since so an
+    unchanged page comes back as a 304 and the stored parser output is reused.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, url, suffix):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + suffix)
+
+    def _write(self, path, data):
+        """Write atomically so a crashed refresh never leaves half a file behind"""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self, url):
+        """Return cached metadata for url, or None"""
+        try:
+            with open(self._path(url, '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_body(self, url):
+        try:
+            with open(self._path(url, '.body'), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def conditional_headers(self, entry):
+        """Build the revalidation headers for a cached entry"""
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, response):
+        """Cache a 200 response if the server gave us something to revalidate with"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return None
+
+        entry = {
+            'url': url,
+            'status': response.status_code,
+            'etag': etag,
+            'last_modified': last_modified,
+            'headers': {k: v for k, v in response.headers.items()
+                        if k.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')}
+        }
+        with self._lock:
+            self._write(self._path(url, '.body'), response.content)
+            self._write(self._path(url, '.json'), json.dumps(entry).encode('utf-8'))
+        return entry
+
+    def _parsed_path(self, url, parser):
+        # Different scrapers parse the same feed differently, so each parser gets its own file
+        return self._path(f"{url}\n{parser}", '.parsed.json')
+
+    def load_parsed(self, url, entry, parser):
+        """Return the output of parser (a parser_key) built from the current cached body, or None"""
+        try:
+            with open(self._parsed_path(url, parser), 'r', encoding='utf-8') as f:
+                parsed = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if parsed.get('validator') != self._validator(entry) or parsed.get('parser') != parser:
+            return None
+        return parsed.get('data')
+
+    def store_parsed(self, url, entry, parser, data):
+        payload = {'validator': self._validator(entry), 'parser': parser, 'data': data}
+        with self._lock:
+            self._write(self._parsed_path(url, parser), json.dumps(payload).encode('utf-8'))
+
+    def _validator(self, entry):
+        return [entry.get('etag'), entry.get('last_modified')] if entry else None
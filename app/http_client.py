@@ -0,0 +1,224 @@
+import os
+import threading
+from collections import namedtuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import ResponseCache, parser_key
+from fetch_policy import get_shared_fetch_policy
+from fetch_recorder import FetchArchive, RecordingAdapter, ReplayAdapter
+from rate_limiter import get_shared_rate_limiter
+
+# brotli is optional - only advertise it when urllib3 can actually decode it
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (compatible; CanadianTrainingOpportunityBot/1.0)'
+DEFAULT_POOL_SIZE = int(os.getenv('LEADGEN_HTTP_POOL_SIZE', '10'))
+
+# 'live' fetches from the network, 'record' also saves every response to the
+# fetch archive, 'replay' serves archived responses with no network at all
+FETCH_MODE = os.getenv('LEADGEN_FETCH_MODE', 'live')
+REPLAY_LATENCY = float(os.getenv('LEADGEN_REPLAY_LATENCY', '0'))
+
+# One page to fetch and the function that turns its response into opportunities.
+# Scrapers describe their network work as FetchJobs so the same jobs can be run
+# by HTTPClient (one at a time) or by async_engine.AsyncFetchEngine (concurrently).
+FetchJob = namedtuple('FetchJob', ['label', 'url', 'parse', 'params', 'headers', 'timeout'])
+FetchJob.__new__.__defaults__ = (None, None, 10)
+
+
+class HTTPClient:
+    """
+    Shared HTTP client with per-host connection pooling and keep-alive.
+
+    All scrapers fetch through one instance so repeated queries against the
+    same hosts (canadabuys.canada.ca, merx.com, ...) reuse open TCP/TLS
+    connections instead of handshaking on every request.
+
+    mode='record' saves every response into a fetch_recorder.FetchArchive and
+    mode='replay' serves them back (with optional per-request latency) so
+    scrapers can be benchmarked offline.
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=DEFAULT_POOL_SIZE, headers=None, cache=None,
+                 rate_limiter=None, fetch_policy=None, mode='live', archive=None, replay_latency=0.0):
+        if mode not in ('live', 'record', 'replay'):
+            raise ValueError(f"Unknown fetch mode: {mode}")
+        self.mode = mode
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.fetch_policy = fetch_policy
+        self.cache_counts = {'not_modified': 0, 'parse_skipped': 0, 'fetched': 0}
+        # get_parsed() runs on many scraper threads at once
+        self._counts_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': DEFAULT_USER_AGENT,
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive'
+        })
+        if headers:
+            self.session.headers.update(headers)
+
+        # pool_connections = number of hosts kept in the pool manager,
+        # pool_maxsize = open connections kept per host
+        if mode != 'live' and archive is None:
+            # Not `archive or ...`: an archive with nothing recorded yet is empty, hence falsy
+            archive = FetchArchive()
+        if mode == 'record':
+            self.adapter = RecordingAdapter(archive, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        elif mode == 'replay':
+            self.adapter = ReplayAdapter(archive, latency=replay_latency)
+        else:
+            self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the pooled session under the retry/circuit-breaker policy"""
+        if self.fetch_policy is None:
+            return self._send(method, url, **kwargs)
+        return self.fetch_policy.call(
+            urlparse(url).netloc.lower(),
+            lambda: self._send(method, url, **kwargs),
+            # A timed-out host is likely down - retrying would only double the wait
+            should_retry=lambda error: isinstance(error, requests.ConnectionError) and not isinstance(error, requests.Timeout)
+        )
+
+    def _send(self, method, url, **kwargs):
+        """Wait for the host's rate limit, then send"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, params=None, headers=None, timeout=10, **kwargs):
+        """Drop-in replacement for requests.get"""
+        return self.request('GET', url, params=params, headers=headers, timeout=timeout, **kwargs)
+
+    def get_parsed(self, url, parse, params=None, headers=None, timeout=10):
+        """
+        Conditionally GET url and return parse(response).
+
+        When a response cache is attached, the stored ETag/Last-Modified are
+        sent along and a 304 returns the parser output saved from the last
+        full download without touching the body. Non-200 responses parse to [].
+        """
+        if self.cache is None:
+            response = self.get(url, params=params, headers=headers, timeout=timeout)
+            return parse(response) if response.status_code == 200 else []
+
+        # Key on the final URL so each query string gets its own entry
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        entry = self.cache.load(full_url)
+        request_headers = dict(headers or {})
+        request_headers.update(self.cache.conditional_headers(entry))
+
+        response = self.get(full_url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and entry:
+            self._count('not_modified')
+            parsed = self.cache.load_parsed(full_url, entry, parser_key(parse))
+            if parsed is not None:
+                self._count('parse_skipped')
+                return parsed
+            response = self._response_from_cache(full_url, entry)
+            if response is None:
+                return []
+        elif response.status_code == 200:
+            self._count('fetched')
+            entry = self.cache.store(full_url, response)
+        else:
+            return []
+
+        parsed = parse(response)
+        if entry:
+            self.cache.store_parsed(full_url, entry, parser_key(parse), parsed)
+        return parsed
+
+    def _count(self, outcome):
+        with self._counts_lock:
+            self.cache_counts[outcome] += 1
+
+    def run_job(self, job):
+        """Fetch and parse a single FetchJob"""
+        return self.get_parsed(job.url, job.parse, params=job.params, headers=job.headers, timeout=job.timeout)
+
+    def _response_from_cache(self, url, entry):
+        """Rebuild a 200 response from the cached body"""
+        body = self.cache.load_body(url)
+        if body is None:
+            return None
+        response = requests.Response()
+        response.status_code = entry.get('status', 200)
+        response.headers.update(entry.get('headers', {}))
+        response._content = body
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def connection_stats(self):
+        """Count connections opened vs reused across every host pool"""
+        per_host = {}
+        opened = 0
+        total_requests = 0
+        pools = self.adapter.poolmanager.pools if hasattr(self.adapter, 'poolmanager') else {}
+        # keys() copies the pool keys under the container's lock, least recently used first;
+        # looking them up in that order leaves the eviction order as it was
+        for key in pools.keys():
+            try:
+                pool = pools[key]
+            except KeyError:  # evicted since keys() was taken
+                continue
+            host_opened = getattr(pool, 'num_connections', 0)
+            host_requests = getattr(pool, 'num_requests', 0)
+            opened += host_opened
+            total_requests += host_requests
+            host = per_host.setdefault(pool.host, {'opened': 0, 'reused': 0, 'requests': 0})
+            host['opened'] += host_opened
+            host['reused'] += max(host_requests - host_opened, 0)
+            host['requests'] += host_requests
+        return {
+            'opened': opened,
+            'reused': max(total_requests - opened, 0),
+            'requests': total_requests,
+            'hosts': per_host
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client(**kwargs):
+    """Return the process-wide HTTPClient, creating it on first use"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            kwargs.setdefault('mode', FETCH_MODE)
+            if kwargs['mode'] == 'replay':
+                # Replays are offline and deterministic - no caching, throttling or breakers
+                kwargs.setdefault('replay_latency', REPLAY_LATENCY)
+            else:
+                # Recordings need full bodies, so only live mode revalidates against the cache
+                if kwargs['mode'] == 'live' and 'cache' not in kwargs and os.getenv('LEADGEN_HTTP_CACHE', '1') != '0':
+                    kwargs['cache'] = ResponseCache()
+                kwargs.setdefault('rate_limiter', get_shared_rate_limiter())
+                kwargs.setdefault('fetch_policy', get_shared_fetch_policy())
+            _shared_client = HTTPClient(**kwargs)
+        return _shared_client
+
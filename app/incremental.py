@@ -0,0 +1,169 @@
+import hashlib
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from enhanced_real_scraper import EnhancedRealOpportunityScraper
+from extraction import parse_deadline
+from lead_ids import content_hash
+
+# A source that suddenly returns nothing keeps its previous entries for this
+# many refreshes in a row (a glitch); after that the empty result is believed
+MAX_EMPTY_IGNORED = 2
+
+
+class Changeset(namedtuple('Changeset', ['inserted', 'updated', 'removed', 'changed_sources',
+                                         'unchanged_sources', 'failed_sources'])):
+    """Lead IDs inserted/updated/removed by a refresh, plus which sources changed"""
+
+    @property
+    def is_empty(self):
+        return not (self.inserted or self.updated or self.removed)
+
+    def summary(self):
+        return f"+{len(self.inserted)} ~{len(self.updated)} -{len(self.removed)}"
+
+
+class SourceState:
+    """
+    High-water mark for one source.
+
+    digest    - hash over every entry's key and content hash; equal digests mean
+                the source returned exactly what it did last time
+    entries   - entry key (URL, else title) -> content hash
+    newest    - most recent published/deadline date seen, ISO format
+    """
+
+    def __init__(self, entries):
+        self.entries = {self.key(entry): content_hash(entry) for entry in entries}
+        self.digest = hashlib.sha1('\n'.join(
+            f"{key} {digest}" for key, digest in sorted(self.entries.items())
+        ).encode('utf-8')).hexdigest()
+        dates = [parse_deadline(entry.get('deadline') or '') for entry in entries]
+        self.newest = max((d for d in dates if d), default=None)
+        self.updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def key(entry):
+        return entry.get('url') or entry.get('title', '')
+
+    def status(self):
+        return {'entries': len(self.entries), 'newest': self.newest, 'updated_at': self.updated_at}
+
+
+class IncrementalRefresher:
+    """
+    Keeps the enhanced scraper's opportunity list current without rebuilding it.
+
+    Every refresh still asks each source for its entries (RSS feeds are
+    conditional GETs, so unchanged feeds cost a 304), but:
+
+    - a source whose entries hash the same as last time is not reprocessed
+    - a source that errors or times out keeps its previous entries instead
+      of dropping them, and so does one that suddenly returns nothing, for
+      up to MAX_EMPTY_IGNORED refreshes in a row
+    - after seed(), the saved leads stand in for sources that haven't
+      answered yet: until every source has, saved leads the refresh didn't
+      produce are kept rather than reported removed
+    - only entries whose content changed are formatted again (an unchanged
+      entry keeps the found_date it was first formatted with)
+
+    refresh() returns a Changeset of lead IDs inserted, updated and removed
+    relative to the previous list; when no source changed it is empty and
+    `leads` is left untouched.
+    """
+
+    def __init__(self, scraper=None, concurrent=True):
+        self.scraper = scraper or EnhancedRealOpportunityScraper()
+        self.concurrent = concurrent
+        self.leads = []
+        self.source_timings = {}
+        self.source_states = {}
+        self._source_entries = {}
+        self._empty_refreshes = {}  # source -> empty results ignored in a row
+        self._seeded = {}  # lead ID -> saved lead, until every source has answered
+        self._lead_hashes = {}
+        self._formatted = {}
+        self._lock = threading.Lock()
+
+    def seed(self, leads):
+        """Start from previously saved leads so the first refresh only reports real changes"""
+        with self._lock:
+            self.leads = list(leads)
+            self._lead_hashes = {lead['id']: content_hash(lead) for lead in self.leads}
+            # Saved leads can't be traced back to their sources, so per-source state starts over
+            self._seeded = {lead['id']: lead for lead in self.leads}
+            self.source_states = {}
+            self._source_entries = {}
+            self._empty_refreshes = {}
+
+    def _format(self, entry):
+        """Format an entry, reusing the result for content that was formatted before"""
+        digest = content_hash(entry)
+        formatted = self._formatted.get(digest)
+        if formatted is None:
+            formatted = self.scraper.format_opportunity_for_display(entry)
+        return digest, formatted
+
+    def refresh(self):
+        with self._lock:
+            results = self.scraper.collect_sources(self.concurrent)
+            self.source_timings = self.scraper.source_timings
+
+            changed, unchanged, failed = [], [], []
+            for name in self.scraper.SOURCES:
+                entries = results.get(name, [])
+                status = self.source_timings.get(name, {}).get('status')
+                previous = self.source_states.get(name)
+                suddenly_empty = not entries and previous and previous.entries
+                if suddenly_empty and status == 'ok':
+                    self._empty_refreshes[name] = self._empty_refreshes.get(name, 0) + 1
+                    suddenly_empty = self._empty_refreshes[name] <= MAX_EMPTY_IGNORED
+                else:
+                    self._empty_refreshes.pop(name, None)
+                if status != 'ok' or suddenly_empty:
+                    # Keep what this source returned last time rather than dropping it
+                    failed.append(name)
+                    continue
+
+                state = SourceState(entries)
+                if previous and previous.digest == state.digest:
+                    unchanged.append(name)
+                    continue
+                self.source_states[name] = state
+                self._source_entries[name] = entries
+                changed.append(name)
+
+            if not changed and self.leads:
+                return Changeset([], [], [], [], unchanged, failed)
+
+            merged = self.scraper.merge_sources(self._source_entries)
+            formatted_cache = {}
+            leads = []
+            for entry in merged:
+                digest, formatted = self._format(entry)
+                formatted_cache[digest] = formatted
+                leads.append(formatted)
+            # Only keep formatting results that are still in use
+            self._formatted = formatted_cache
+
+            if any(name not in self.source_states for name in self.scraper.SOURCES):
+                # Some source hasn't answered since seed(); its saved leads may be among these
+                produced = {lead['id'] for lead in leads}
+                leads.extend(lead for lead_id, lead in self._seeded.items() if lead_id not in produced)
+            else:
+                self._seeded = {}
+
+            lead_hashes = {lead['id']: content_hash(lead) for lead in leads}
+            inserted = [lead_id for lead_id in lead_hashes if lead_id not in self._lead_hashes]
+            updated = [lead_id for lead_id, digest in lead_hashes.items()
+                       if lead_id in self._lead_hashes and self._lead_hashes[lead_id] != digest]
+            removed = [lead_id for lead_id in self._lead_hashes if lead_id not in lead_hashes]
+
+            self.leads = leads
+            self._lead_hashes = lead_hashes
+            return Changeset(inserted, updated, removed, changed, unchanged, failed)
+
+    def source_status(self):
+        """High-water mark per source, for the stats endpoints"""
+        return {name: state.status() for name, state in self.source_states.items()}
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import threading
+from datetime import date
+
+from extraction import budget_value
+from lead_ids import content_hash
+
+# Changing the seed reshuffles the seeded fields (strategic_fit) for every lead
+INSIGHT_SEED = os.getenv('LEADGEN_INSIGHT_SEED', 'leadgen')
+
+STRATEGIC_FIT_LEVELS = ('Excellent', 'Good', 'Fair')
+
+
+def seeded_choice(options, seed, *parts):
+    """Pick one of options from a hash of the seed and parts - the same inputs always pick the same option"""
+    key = '\x1f'.join(str(part) for part in (seed,) + parts)
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return options[int.from_bytes(digest[:8], 'big') % len(options)]
+
+
+def days_until_deadline(opportunity, today=None):
+    """Days from today until the normalized deadline_date, or None if open-ended"""
+    if not opportunity.get('deadline_date'):
+        return None
+    return (date.fromisoformat(opportunity['deadline_date']) - (today or date.today())).days
+
+
+def calculate_opportunity_score(opportunity, today=None):
+    """Calculate AI-driven opportunity score based on multiple factors"""
+    score = 50  # Base score
+
+    # Budget factor (higher budget = higher score)
+    budget = budget_value(opportunity)
+    if budget >= 1_000_000:
+        score += 20
+    elif budget >= 500_000:
+        score += 15
+    elif budget >= 100_000:
+        score += 10
+    elif budget >= 10_000:
+        score += 5
+
+    # Deadline urgency (closer deadlines = higher priority)
+    days_left = days_until_deadline(opportunity, today)
+    if days_left is not None:
+        if 0 <= days_left <= 90:
+            score += 15  # Closing within 90 days
+        elif 0 <= days_left <= 180:
+            score += 10  # Closing within 180 days
+    elif 'ongoing' in opportunity.get('deadline', '').lower():
+        score += 5
+
+    # Type factor (Federal typically larger)
+    if 'federal' in opportunity.get('type', '').lower():
+        score += 10
+    elif 'provincial' in opportunity.get('type', '').lower():
+        score += 5
+
+    # Sector alignment (technology and digital transformation are hot)
+    if any(term in opportunity.get('title', '').lower() for term in ['digital', 'technology', 'cyber', 'ai', 'transformation']):
+        score += 15
+
+    # Indigenous programs (often have dedicated funding)
+    if 'indigenous' in opportunity.get('type', '').lower():
+        score += 10
+
+    return min(score, 100)  # Cap at 100
+
+
+def generate_ai_insights(opportunity, score=None, seed=INSIGHT_SEED, today=None):
+    """
+    Generate AI-powered insights for each opportunity (pass score if it is already known).
+
+    Every field follows from the opportunity's content and the seed, so the
+    same lead on the same day always gets the same insights.
+    """
+    if score is None:
+        score = calculate_opportunity_score(opportunity, today)
+    insights = {
+        'win_probability': score,
+        'effort_level': 'High' if 'federal' in opportunity['type'].lower() else 'Medium',
+        'competition_level': 'High' if opportunity['budget'].startswith('Up to $1') else 'Medium',
+        'strategic_fit': seeded_choice(STRATEGIC_FIT_LEVELS, seed, opportunity.get('id') or opportunity['title']),
+        'roi_potential': 'High' if budget_value(opportunity) >= 500_000 else 'Medium'
+    }
+
+    # Key success factors
+    success_factors = []
+    if 'federal' in opportunity['type'].lower():
+        success_factors.append("Federal security clearance may be required")
+        success_factors.append("Demonstrate experience with government contracts")
+    if 'indigenous' in opportunity['type'].lower():
+        success_factors.append("Indigenous partnership or participation recommended")
+        success_factors.append("Cultural competency training essential")
+    if 'technology' in opportunity['title'].lower():
+        success_factors.append("Technical certifications will strengthen proposal")
+        success_factors.append("Demonstrate innovation and modern approaches")
+    if not success_factors:
+        success_factors.append("Strong project management capabilities")
+        success_factors.append("Proven track record in similar programs")
+
+    insights['key_success_factors'] = success_factors
+
+    # Recommended actions
+    actions = []
+    if insights['win_probability'] > 70:
+        actions.append("🔥 HOT LEAD - Prioritize immediately")
+        actions.append("Schedule internal strategy session this week")
+        actions.append("Reach out to procurement contact ASAP")
+    elif insights['win_probability'] > 50:
+        actions.append("📊 Good opportunity - Conduct feasibility assessment")
+        actions.append("Research similar past contracts")
+        actions.append("Identify potential partners or subcontractors")
+    else:
+        actions.append("📋 Monitor for now - Set up alerts")
+        actions.append("Build relationships for future opportunities")
+
+    insights['recommended_actions'] = actions
+
+    # Risk assessment
+    risks = []
+    if 'Up to' in opportunity['budget']:
+        risks.append("Budget ceiling may be lower than maximum stated")
+    if 0 <= (days_until_deadline(opportunity, today) or -1) <= 180:
+        risks.append("Short timeline - rapid response required")
+    if 'federal' in opportunity['type'].lower():
+        risks.append("Complex procurement process expected")
+
+    insights['risk_factors'] = risks
+
+    return insights
+
+
+class InsightEngine:
+    """
+    Scores opportunities and attaches their AI insights, memoized per lead.
+
+    Results are keyed by lead ID and content hash, so a lead is only scored
+    again when its content changes - or when the date does, since scores
+    depend on days left before the deadline. enhance_all() keeps only the
+    entries for the leads it was last given, so the memo never outgrows
+    the current lead list.
+    """
+
+    def __init__(self, seed=INSIGHT_SEED):
+        self.seed = seed
+        self._memo = {}
+        self._memo_day = None
+        self._lock = threading.Lock()
+
+    def _enhance(self, opportunity, today):
+        score = calculate_opportunity_score(opportunity, today)
+        enhanced = opportunity.copy()
+        enhanced['ai_insights'] = generate_ai_insights(opportunity, score, self.seed, today)
+        enhanced['score'] = score
+        return enhanced
+
+    def enhance_all(self, opportunities, today=None):
+        """Copies of the opportunities with 'score' and 'ai_insights' attached, in input order"""
+        today = today or date.today()
+        with self._lock:
+            previous = self._memo if self._memo_day == today else {}
+            memo = {}
+            enhanced = []
+            for opportunity in opportunities:
+                key = (opportunity.get('id'), content_hash(opportunity, ignore=()))
+                result = memo.get(key) or previous.get(key)
+                if result is None:
+                    result = self._enhance(opportunity, today)
+                memo[key] = result
+                enhanced.append(result)
+            self._memo = memo
+            self._memo_day = today
+            return enhanced
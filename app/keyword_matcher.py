@@ -0,0 +1,99 @@
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _fold_char(char):
+    return unicodedata.normalize('NFD', char.lower())[0]
+
+
+def fold(text):
+    """
+    Lowercase, accent-free copy of text with one character per character of
+    the original, so offsets into it are offsets into text ('Métis' -> 'metis').
+    """
+    if text.isascii():
+        return text.lower()
+    return ''.join(_fold_char(char) for char in text)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick matcher for many keyword vocabularies at once.
+
+    Build it from {category: [terms]} and scan() classifies a document
+    against every vocabulary in a single pass over the text, however many
+    terms there are. Matching ignores case and accents ('métis' matches
+    'Metis') and, like the `term in text` checks it replaces, finds terms
+    anywhere in the text, including inside longer words ('train' matches
+    'training').
+
+    The automaton is immutable once built, so one instance can be shared
+    by every scraper and thread.
+    """
+
+    def __init__(self, vocabularies):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for category, terms in vocabularies.items():
+            for term in terms:
+                self._add(category, term)
+        self._link()
+
+    def _add(self, category, term):
+        term = fold(term)
+        if not term:
+            return
+        node = 0
+        for char in term:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append((category, term))
+
+    def _link(self):
+        """Breadth-first pass setting failure links and merging their outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def scan(self, text):
+        """
+        Return {category: [(term, position), ...]} for every match in text.
+
+        Terms are reported folded (see fold()); positions are the character
+        offsets in text where each match starts. Categories
+        with no matches are left out, so `category in scan(text)` is the
+        one-pass equivalent of any(term in text for term in vocabulary).
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = {}
+        node = 0
+        for index, char in enumerate(fold(text)):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for category, term in output[node]:
+                matches.setdefault(category, []).append((term, index - len(term) + 1))
+        return matches
+
+    def first(self, text, categories, default=None, matches=None):
+        """Return the first of `categories` (in priority order) that text matches"""
+        if matches is None:
+            matches = self.scan(text)
+        return next((category for category in categories if category in matches), default)
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the visit and never identify the page
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga'}
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+ID_LENGTH = 16
+
+# Stamped with today's date on every scrape, so not part of an entry's content
+VOLATILE_FIELDS = ('found_date',)
+
+
+def normalize_url(url):
+    """
+    Canonical form of a source URL for identity purposes.
+
+    Scheme and host are lowercased, 'www.', default ports, fragments,
+    tracking parameters (utm_*, gclid, ...) and trailing slashes are dropped,
+    and the remaining query parameters are sorted, so every spelling of the
+    same page normalizes to the same string.
+    """
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def normalize_text(text):
+    """Case-, accent- and whitespace-insensitive form of a title or organization"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+def make_lead_id(url='', organization='', title='', prefix='lead_'):
+    """
+    Deterministic ID for a lead, derived from its normalized URL, organization and title.
+
+    The same opportunity gets the same ID on every refresh and in every
+    process (unlike timestamps, random numbers or Python's salted hash()),
+    so IDs can key caches, diffs, saved statuses and tracked interactions.
+    """
+    key = '\x1f'.join((normalize_url(url), normalize_text(organization), normalize_text(title)))
+    return prefix + hashlib.sha1(key.encode('utf-8')).hexdigest()[:ID_LENGTH]
+
+
+def content_hash(record, ignore=VOLATILE_FIELDS):
+    """Stable digest of a record's content (key order and non-JSON types don't matter)"""
+    content = {key: value for key, value in record.items() if key not in ignore}
+    payload = json.dumps(content, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
@@ -0,0 +1,166 @@
+import re
+from array import array
+from bisect import bisect_left
+
+from lead_ids import normalize_text
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lowercase, accent-folded word tokens"""
+    return _TOKEN.findall(normalize_text(text))
+
+
+class Bitmap:
+    """
+    Set of lead positions stored as the bits of a Python int.
+
+    AND/OR of two bitmaps is a single big-int operation, so intersecting
+    the postings of several filters costs about n/64 machine words no
+    matter how many leads match each one.
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @classmethod
+    def from_positions(cls, positions, size):
+        flags = bytearray((size + 7) // 8)
+        for position in positions:
+            flags[position >> 3] |= 1 << (position & 7)
+        return cls(int.from_bytes(flags, 'little'))
+
+    def __and__(self, other):
+        return Bitmap(self.bits & other.bits)
+
+    def __or__(self, other):
+        return Bitmap(self.bits | other.bits)
+
+    def __contains__(self, position):
+        return (self.bits >> position) & 1 == 1
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __iter__(self):
+        """Positions in ascending order"""
+        # Scanning the binary string runs in C, unlike peeling off one bit at a time
+        binary = bin(self.bits)[:1:-1]
+        position = binary.find('1')
+        while position != -1:
+            yield position
+            position = binary.find('1', position + 1)
+
+
+class LeadIndex:
+    """
+    In-memory inverted index over a fixed list of leads.
+
+    Built once when the leads load:
+    - facets: for each facet field, value -> Bitmap of the leads with it
+    - postings: token -> positions of the leads whose text fields contain it.
+      Common tokens are stored as Bitmaps; rare ones as position arrays
+      (a Bitmap costs n bits however few leads it holds) and turned into a
+      Bitmap only when a query needs them.
+
+    query() answers facet filters plus free-text search as bitmap
+    intersections, and counts each facet's values over the matches in the
+    same pass.
+    """
+
+    # Tokens in at least 1/DENSE_FRACTION of the leads are kept as Bitmaps
+    DENSE_FRACTION = 64
+
+    def __init__(self, leads, facets=('organization_type', 'training_type', 'tier'),
+                 text_fields=('organization', 'opportunity', 'description')):
+        self.leads = leads
+        self.size = len(leads)
+        self.all = Bitmap((1 << self.size) - 1)
+
+        facet_positions = {field: {} for field in facets}
+        token_positions = {}
+        for position, lead in enumerate(leads):
+            for field in facets:
+                facet_positions[field].setdefault(lead.get(field), array('I')).append(position)
+            text = ' '.join(str(lead.get(field) or '') for field in text_fields)
+            for token in set(tokenize(text)):
+                token_positions.setdefault(token, array('I')).append(position)
+
+        self.facets = {
+            field: {value: Bitmap.from_positions(positions, self.size)
+                    for value, positions in values.items()}
+            for field, values in facet_positions.items()
+        }
+        dense_at = max(1, self.size // self.DENSE_FRACTION)
+        self.postings = {
+            token: Bitmap.from_positions(positions, self.size) if len(positions) >= dense_at else positions
+            for token, positions in token_positions.items()
+        }
+        self.vocabulary = sorted(self.postings)
+
+    def _prefix_matches(self, prefix):
+        """Bitmap of leads with a token starting with prefix"""
+        dense = 0
+        sparse = []
+        start = bisect_left(self.vocabulary, prefix)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            postings = self.postings[token]
+            if isinstance(postings, Bitmap):
+                dense |= postings.bits
+            else:
+                sparse.append(postings)
+        if sparse:
+            dense |= Bitmap.from_positions((p for positions in sparse for p in positions), self.size).bits
+        return Bitmap(dense)
+
+    def search(self, text):
+        """Leads containing every word of text (each as a word prefix, so 'cyber' finds 'cybersecurity')"""
+        result = self.all
+        for token in tokenize(text):
+            result = result & self._prefix_matches(token)
+            if not result.bits:
+                break
+        return result
+
+    def facet(self, field, value, contains=False):
+        """Leads whose field equals value - or, with contains, includes it case-insensitively"""
+        values = self.facets[field]
+        if not contains:
+            return values.get(value, Bitmap())
+        needle = value.lower()
+        bits = 0
+        for candidate, bitmap in values.items():
+            if needle in str(candidate).lower():
+                bits |= bitmap.bits
+        return Bitmap(bits)
+
+    def query(self, filters=None, search=''):
+        """
+        (matches, facet counts) for {facet field: Bitmap} filters and a search string.
+
+        Each facet's counts ignore that facet's own filter, so they show what
+        choosing a different value would return.
+        """
+        filters = filters or {}
+        text_matches = self.search(search) if search else self.all
+        matches = text_matches
+        for bitmap in filters.values():
+            matches = matches & bitmap
+
+        counts = {}
+        for field, values in self.facets.items():
+            others = text_matches
+            for other_field, bitmap in filters.items():
+                if other_field != field:
+                    others = others & bitmap
+            counts[field] = {}
+            for value, bitmap in values.items():
+                count = (others.bits & bitmap.bits).bit_count()
+                if count:
+                    counts[field][value] = count
+        return matches, counts
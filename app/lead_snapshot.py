@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import json
+import threading
+from types import MappingProxyType
+
+from flask import Response, jsonify
+
+from pagination import LeadPager, paginate
+
+# brotli is optional - without it responses are offered as gzip only
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Query parameters that ask /api/leads for something other than the whole list
+PAGING_PARAMETERS = ('limit', 'cursor', 'sort', 'fields')
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9  # 10-11 compress a little better but take many times longer
+
+# Bodies smaller than this are sent as they are; compressing them saves next to nothing
+MIN_COMPRESS_SIZE = 1024
+
+
+def compress_body(body):
+    """{content coding: compressed body} for every coding available, best first"""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return {}
+    encodings = {}
+    if brotli is not None:
+        encodings['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the gzip bytes identical across workers and restarts
+    encodings['gzip'] = gzip.compress(body, GZIP_LEVEL, mtime=0)
+    return encodings
+
+
+class LeadSnapshot:
+    """
+    One published version of a lead list, never modified after it is built.
+
+    Holds the leads (a tuple), the metadata served alongside them (meta),
+    the complete /api/leads response already serialized to JSON (body) and
+    compressed (encodings), a strong ETag derived from those bytes, and the
+    pager for paged requests. The ETag depends only on the content, so every
+    worker serving the same leads hands out the same one.
+    """
+
+    __slots__ = ('leads', 'version', 'meta', 'body', 'encodings', 'etag', 'pager')
+
+    def __init__(self, leads, version, meta, pager=None):
+        leads = tuple(leads)
+        set_ = object.__setattr__
+        set_(self, 'leads', leads)
+        set_(self, 'version', version)
+        set_(self, 'meta', MappingProxyType(dict(meta)))
+        body = json.dumps({'leads': leads, 'next_cursor': None, **meta},
+                          sort_keys=True, default=str, separators=(',', ':')).encode('utf-8')
+        set_(self, 'body', body)
+        set_(self, 'encodings', MappingProxyType(compress_body(body)))
+        set_(self, 'etag', hashlib.blake2b(body, digest_size=16).hexdigest())
+        set_(self, 'pager', pager if pager is not None and pager.leads is leads else LeadPager(leads))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LeadSnapshot is immutable; publish a new one instead")
+
+    def __len__(self):
+        return len(self.leads)
+
+    def entity_tag(self, encoding=None):
+        """
+        Strong ETag (unquoted) of the body in one content coding. Each coding
+        is different bytes, so each gets its own tag.
+        """
+        return f"{self.etag}-{encoding}" if encoding else self.etag
+
+    def matches(self, if_none_match):
+        """True if an If-None-Match header value names this version in any coding"""
+        return any(if_none_match.contains_weak(self.entity_tag(encoding))
+                   for encoding in (None, *self.encodings))
+
+    def negotiate(self, accept_encodings):
+        """(content coding or None, body) best suited to an Accept-Encoding header value"""
+        for encoding, compressed in self.encodings.items():
+            if accept_encodings[encoding]:
+                return encoding, compressed
+        return None, self.body
+
+
+class SnapshotPublisher:
+    """
+    The current LeadSnapshot, replaced as a whole on every update.
+
+    Readers take `current` once per request and use only that object, so
+    they never lock and never see leads from one update with metadata from
+    another. publish() builds the next snapshot off to the side and swaps
+    the reference in one assignment; its lock only keeps concurrent
+    publishers' versions in order.
+    """
+
+    def __init__(self, **meta):
+        self._lock = threading.Lock()
+        self.current = LeadSnapshot((), 0, meta)
+
+    def publish(self, leads, **meta):
+        """Build and publish a snapshot of leads with the given metadata; returns it"""
+        with self._lock:
+            previous = self.current
+            pager = None
+            if previous.leads is leads or previous.leads == tuple(leads):
+                # An unchanged list keeps its pager and the sort orders already built for it
+                leads, pager = previous.leads, previous.pager
+            snapshot = LeadSnapshot(leads, previous.version + 1, meta, pager)
+            self.current = snapshot
+            return snapshot
+
+
+def leads_response(snapshot, request):
+    """
+    /api/leads response for a snapshot. Raises ValueError for bad paging parameters.
+
+    The whole list is answered from the snapshot's pre-built bytes: 304 Not
+    Modified if the client already has this version (If-None-Match),
+    otherwise the body compressed as the client accepts. Nothing is
+    serialized or compressed per request. Cache-Control: no-cache lets
+    clients keep the body but makes them check the ETag before using it.
+    Paged requests are serialized as before.
+    """
+    if any(parameter in request.args for parameter in PAGING_PARAMETERS):
+        return jsonify({**paginate(snapshot.pager, request.args), **snapshot.meta})
+
+    encoding, body = snapshot.negotiate(request.accept_encodings)
+    if request.if_none_match and snapshot.matches(request.if_none_match):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(snapshot.entity_tag(encoding))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
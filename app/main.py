@@ -1,75 +1,187 @@
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from flask_cors import CORS
-from datetime import datetime
+from datetime import datetime, timezone
+import os
+import sys
 import threading
 import time
 from scraper import CanadianPublicSectorScraper
+from lead_snapshot import SnapshotPublisher, leads_response
+from search import SearchIndex, search_response
+from refresh_jobs import JOB_POLL_INTERVAL, RefreshJobs
+from snapshot_updater import OncePerProcess
+
+# db.py, the lead store and the leader lock live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lead_store import get_shared_store
+from leader import LeaderLock
 
 app = Flask(__name__)
-CORS(app)
+# The dashboard (another origin) reads the ETag to skip re-rendering unchanged leads
+CORS(app, expose_headers=['ETag'])
+
+# The current leads, swapped as a whole on every update - requests read it without locking
+published_leads = SnapshotPublisher(last_update=None, count=0)
+snapshot_run_id = None  # ScrapeRun the current leads came from
+search_index = SearchIndex()
+
+LEAD_COLLECTION = 'public_sector'
+UPDATE_INTERVAL = 3600  # every hour
+FOLLOW_INTERVAL = 15  # how often non-leader workers check for a newer snapshot
+store = get_shared_store()
 
-# Global variables for caching
-leads_cache = []
-last_update = None
-update_lock = threading.Lock()
+# Only one worker (process) scrapes; the others serve the snapshots it saves
+leader = LeaderLock(f"scraper-{LEAD_COLLECTION}")
 
-def update_leads():
-    """Update leads from scraper"""
-    global leads_cache, last_update
+def publish_leads(leads, last_update):
+    """Publish leads for requests to read and bring the search index up to date with them"""
+    snapshot = published_leads.publish(leads, last_update=last_update, count=len(leads))
+    # Index here, on the updating thread, so searches don't pay for it
+    search_index.sync(snapshot.leads)
+
+def update_leads(job=None):
+    """Update leads from scraper (reporting per-source progress to job, if given)"""
+    global snapshot_run_id
     
     print("Updating leads...")
     scraper = CanadianPublicSectorScraper()
-    new_leads = scraper.get_all_leads()
+    new_leads = scraper.get_all_leads(progress=job.report if job else None)
+    
+    last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    publish_leads(new_leads, last_update)
     
-    with update_lock:
-        leads_cache = new_leads
-        last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        snapshot_run_id = store.save_snapshot(LEAD_COLLECTION, new_leads)
+    except Exception as e:
+        print(f"Could not save leads: {e}")
     
     print(f"Updated {len(new_leads)} leads at {last_update}")
+    return {'count': len(new_leads), 'last_update': last_update}
+
+# Scheduled and requested refreshes all go through here, so only one scrape runs at a time;
+# any worker can queue a job, and the leader runs it
+refresh_jobs = RefreshJobs(update_leads, store, LEAD_COLLECTION)
+
+def restore_leads(run_id=None):
+    """Load the last saved leads (or those of run_id); returns False if there is no snapshot yet"""
+    global snapshot_run_id
+    try:
+        latest_run, saved_leads = store.load_snapshot(LEAD_COLLECTION, run_id)
+    except Exception as e:
+        print(f"Could not load saved leads: {e}")
+        return False
+    if latest_run is None:
+        return False
+    
+    last_update = latest_run.finished_at.replace(tzinfo=timezone.utc).astimezone().strftime("%Y-%m-%d %H:%M:%S")
+    publish_leads(saved_leads, last_update)
+    snapshot_run_id = latest_run.id
+    
+    print(f"Restored {len(saved_leads)} leads saved at {last_update}")
+    return True
 
-def background_update():
-    """Background thread to update leads periodically"""
+def background_update(first_wait=UPDATE_INTERVAL):
+    """
+    Background thread to update leads periodically.
+    
+    Only the worker holding the leader lock scrapes, both on schedule and
+    for the refresh jobs any worker queues; the others reload each new
+    snapshot it saves, and take over if it exits.
+    """
+    next_update = time.monotonic() + first_wait
+    leading = False
     while True:
-        time.sleep(3600)  # Update every hour
-        update_leads()
+        try:
+            if leader.acquire():
+                if not leading:
+                    leading = True
+                    # Jobs still running belonged to the previous leader, which has stopped
+                    refresh_jobs.fail_abandoned()
+                if time.monotonic() >= next_update:
+                    next_update = time.monotonic() + UPDATE_INTERVAL
+                    refresh_jobs.submit()
+                if refresh_jobs.run_pending():
+                    next_update = time.monotonic() + UPDATE_INTERVAL
+            else:
+                leading = False
+                latest_run = store.latest_run(LEAD_COLLECTION)
+                if latest_run and latest_run.id != snapshot_run_id:
+                    restore_leads(latest_run.id)
+                    next_update = time.monotonic() + UPDATE_INTERVAL
+        except Exception as e:
+            print(f"Error updating leads: {e}")
+        refresh_jobs.wait(JOB_POLL_INTERVAL if leading else FOLLOW_INTERVAL)
+
+def start_background_updates():
+    """Load the saved leads and start the updater thread (see ensure_background_updates)"""
+    # If nothing was saved yet, the leader scrapes straight away and the other workers wait for its snapshot
+    restored = restore_leads()
+    threading.Thread(target=background_update, args=(UPDATE_INTERVAL if restored else 0,), daemon=True).start()
+
+# Every worker restores, follows snapshots and takes part in the leader election
+# from its first request on - never in a pre-fork master (gunicorn --preload)
+ensure_background_updates = OncePerProcess(start_background_updates)
+app.before_request(ensure_background_updates)
 
 @app.route('/api/leads')
 def get_leads():
-    """Get all leads"""
-    with update_lock:
-        return jsonify({
-            'leads': leads_cache,
-            'last_update': last_update,
-            'count': len(leads_cache)
-        })
-
-@app.route('/api/refresh')
+    """Get all leads, or one page of them with ?limit=&cursor=&sort=&fields="""
+    try:
+        return leads_response(published_leads.current, request)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/search')
+def search_leads():
+    """Relevance-ranked search over title, organization and description (?q=&limit=)"""
+    try:
+        return jsonify(search_response(search_index, published_leads.current.leads, request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/refresh', methods=['GET', 'POST'])
 def refresh_leads():
-    """Force refresh of leads"""
-    update_leads()
+    """
+    Queue a refresh of leads for the leader to run and return its job right away.
+    
+    While a refresh is queued or running, further requests (to any worker)
+    get that same job rather than starting another scrape. Poll
+    /api/refresh/<job_id> for progress.
+    """
+    try:
+        job, started = refresh_jobs.submit()
+    except Exception as e:
+        return jsonify({'error': f"Could not queue a refresh: {e}"}), 503
     return jsonify({
-        'status': 'success',
-        'message': 'Leads refreshed',
-        'count': len(leads_cache),
-        'last_update': last_update
-    })
+        'status': 'accepted',
+        'message': 'Refresh started' if started else 'Refresh already in progress',
+        'job_id': job['id'],
+        'job': job
+    }), 202
+
+@app.route('/api/refresh/<job_id>')
+def refresh_status(job_id):
+    """Status of a refresh job, with progress per source"""
+    try:
+        job = refresh_jobs.get(job_id)
+    except Exception as e:
+        return jsonify({'error': f"Could not read refresh job {job_id!r}: {e}"}), 503
+    if job is None:
+        return jsonify({'error': f"Unknown refresh job {job_id!r}"}), 404
+    return jsonify(job)
 
 @app.route('/health')
 def health():
     """Health check endpoint"""
+    snapshot = published_leads.current
     return jsonify({
         'status': 'healthy',
-        'leads_count': len(leads_cache),
-        'last_update': last_update
+        'leads_count': len(snapshot),
+        'last_update': snapshot.meta['last_update']
     })
 
 if __name__ == '__main__':
-    # Initial load of leads when server starts
-    update_leads()
-    
-    # Start background update thread
-    update_thread = threading.Thread(target=background_update, daemon=True)
-    update_thread.start()
+    ensure_background_updates()
     
     # Run Flask app
     app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
@@ -0,0 +1,186 @@
+import base64
+import json
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+from extraction import budget_value
+from lead_ids import normalize_text
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Filters matching fewer than 1/SPARSE_FRACTION of the leads are sorted rather than scanned for
+SPARSE_FRACTION = 8
+
+
+def _text(*fields):
+    def getter(lead):
+        for field in fields:
+            if lead.get(field):
+                return normalize_text(str(lead[field]))
+        return None
+    return getter
+
+
+# Sortable fields; a getter returns None when the lead has no value for it
+SORT_FIELDS = {
+    'position': lambda lead: None,  # the list's own order
+    'deadline': lambda lead: lead.get('deadline_date'),
+    'budget': lambda lead: budget_value(lead, default=None),
+    'score': lambda lead: lead.get('score'),
+    'title': _text('title', 'opportunity'),
+    'organization': _text('organization'),
+    'tier': _text('tier'),
+    'found_date': lambda lead: lead.get('found_date')
+}
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return tuple(key)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def project(lead, fields):
+    """Copy of the lead with only the requested fields"""
+    return {field: lead[field] for field in fields if field in lead}
+
+
+class LeadPager:
+    """
+    Presorted views of one lead list for paginated /api/leads responses.
+
+    Each sort order (field plus direction) is computed the first time it is
+    asked for and kept for the life of the pager, so a page costs a binary
+    search plus `limit` steps instead of a sort over the whole list.
+
+    A filtered page (`allowed`) walks the sort order skipping non-matching
+    leads; when the filter is sparse, its matches are put in sort order
+    directly instead, so a narrow filter doesn't scan the whole list.
+
+    Pages use keyset cursors: a cursor is the sort key of the last lead
+    returned, so paging keeps its place even if the list is refreshed
+    between requests. Leads without a value for the sort field always come
+    last, in either direction.
+    """
+
+    def __init__(self, leads):
+        self.leads = leads
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def _order(self, field, descending):
+        """(keys, positions, ranks) for a sort order; keys ascend, ranks map list position -> index in keys"""
+        order = self._orders.get((field, descending))
+        if order is not None:
+            return order
+        with self._lock:
+            order = self._orders.get((field, descending))
+            if order is None:
+                getter = SORT_FIELDS[field]
+                # Ascending arrays; a descending order is read from the end, so missing values go first
+                missing_rank = 0 if descending else 1
+                keyed = []
+                for position, lead in enumerate(self.leads):
+                    value = getter(lead)
+                    # Ties are broken by lead ID so every key is unique and cursors are exact
+                    tiebreak = position if field == 'position' else str(lead.get('id', position))
+                    if value is None:
+                        key = (missing_rank, 0, tiebreak)
+                    else:
+                        key = (1 - missing_rank, value, tiebreak)
+                    keyed.append((key, position))
+                keyed.sort(key=lambda item: item[0])
+                positions = [position for _, position in keyed]
+                ranks = array('I', bytes(4 * len(positions)))
+                for rank, position in enumerate(positions):
+                    ranks[position] = rank
+                order = ([key for key, _ in keyed], positions, ranks)
+                self._orders[(field, descending)] = order
+        return order
+
+    def page(self, sort='position', cursor=None, limit=DEFAULT_PAGE_SIZE, allowed=None):
+        """
+        One page of leads as (leads, next_cursor); next_cursor is None on the last page.
+
+        sort is a SORT_FIELDS name, prefixed with '-' for descending. allowed,
+        if given, is a container of list positions to restrict the page to.
+        """
+        descending = sort.startswith('-')
+        field = sort.lstrip('-')
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {field!r}; choose from {', '.join(sorted(SORT_FIELDS))}")
+        keys, positions, ranks = self._order(field, descending)
+
+        if allowed is not None and len(allowed) * SPARSE_FRACTION < len(keys):
+            view = sorted(ranks[position] for position in allowed)
+            allowed = None
+        else:
+            view = range(len(keys))
+
+        try:
+            if cursor is None:
+                index = len(view) - 1 if descending else 0
+            elif descending:
+                index = bisect_left(view, decode_cursor(cursor), key=keys.__getitem__) - 1
+            else:
+                index = bisect_right(view, decode_cursor(cursor), key=keys.__getitem__)
+        except TypeError:
+            raise ValueError(f"Cursor {cursor!r} does not belong to sort {sort!r}")
+        step, stop = (-1, -1) if descending else (1, len(view))
+
+        page = []
+        last_key = None
+        while index != stop and len(page) < limit:
+            rank = view[index]
+            if allowed is None or positions[rank] in allowed:
+                page.append(self.leads[positions[rank]])
+                last_key = keys[rank]
+            index += step
+
+        # Only hand out a cursor if there is something left to read
+        more = False
+        while index != stop:
+            if allowed is None or positions[view[index]] in allowed:
+                more = True
+                break
+            index += step
+        return page, encode_cursor(last_key) if more else None
+
+
+def paginate(pager, args, allowed=None):
+    """
+    Apply the limit/cursor/sort/fields query parameters of a request.
+
+    Returns a dict to merge into the /api/leads response: 'leads' (the page,
+    projected to `fields` if asked) and 'next_cursor'. Without any of those
+    parameters the whole list is returned as before. Raises ValueError for
+    bad parameters.
+    """
+    limit = args.get('limit')
+    cursor = args.get('cursor') or None
+    sort = args.get('sort')
+    fields = [field for field in (args.get('fields') or '').split(',') if field]
+
+    if limit is None and cursor is None and sort is None:
+        leads = pager.leads if allowed is None else [pager.leads[position] for position in sorted(allowed)]
+        next_cursor = None
+    else:
+        try:
+            limit = DEFAULT_PAGE_SIZE if limit is None else int(limit)
+        except ValueError:
+            raise ValueError(f"limit must be a number, not {limit!r}")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        leads, next_cursor = pager.page(sort or 'position', cursor, limit, allowed)
+
+    if fields:
+        leads = [project(lead, fields) for lead in leads]
+    return {'leads': leads, 'next_cursor': next_cursor}
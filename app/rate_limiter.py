@@ -0,0 +1,109 @@
+import asyncio
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_RATE = float(os.getenv('LEADGEN_RATE_LIMIT_RPS', '2'))
+DEFAULT_BURST = int(os.getenv('LEADGEN_RATE_LIMIT_BURST', '2'))
+
+# Per-host (requests per second, burst) overrides for portals that need a gentler touch
+HOST_LIMITS = {
+    'canadabuys.canada.ca': (1.0, 2),
+    'buyandsell.gc.ca': (1.0, 2),
+    'www.merx.com': (0.5, 1),
+    'duckduckgo.com': (1.0, 1),
+    'api.duckduckgo.com': (1.0, 1)
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    reserve() always claims a token, letting the balance go negative, and
+    returns how long the caller must wait before using it. Concurrent callers
+    are therefore spaced 1/rate apart instead of all waking at once.
+
+    clock returns the current time in seconds (time.monotonic unless a test
+    supplies its own).
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = max(int(burst), 1)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    """
+    One token bucket per host, shared by every scraper.
+
+    Requests to different hosts never wait on each other, while each host is
+    held to its configured rate and burst size. clock, sleep and async_sleep
+    default to the real ones; tests pass their own.
+    """
+
+    def __init__(self, default_rate=DEFAULT_RATE, default_burst=DEFAULT_BURST, host_limits=None,
+                 clock=time.monotonic, sleep=time.sleep, async_sleep=asyncio.sleep):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.clock = clock
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url_or_host):
+        if '://' in url_or_host:
+            return urlparse(url_or_host).netloc.lower()
+        return url_or_host.lower()
+
+    def bucket(self, url_or_host):
+        host = self._host(url_or_host)
+        with self._lock:
+            if host not in self._buckets:
+                rate, burst = self.host_limits.get(host, (self.default_rate, self.default_burst))
+                self._buckets[host] = TokenBucket(rate, burst, self.clock)
+            return self._buckets[host]
+
+    def acquire(self, url_or_host):
+        """Block until a request to this host is allowed; returns seconds waited"""
+        wait = self.bucket(url_or_host).reserve()
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url_or_host):
+        """Event-loop friendly acquire()"""
+        wait = self.bucket(url_or_host).reserve()
+        if wait > 0:
+            await self.async_sleep(wait)
+        return wait
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(**kwargs):
+    """Return the process-wide HostRateLimiter, creating it on first use"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = HostRateLimiter(**kwargs)
+        return _shared_limiter
@@ -1,42 +1,41 @@
-from flask import Flask, jsonify, render_template_string
+from flask import Flask, jsonify, render_template_string, request
 from flask_cors import CORS
-from enhanced_real_scraper import EnhancedRealOpportunityScraper
-import threading
-import time
-from datetime import datetime
+from incremental import IncrementalRefresher
+from lead_snapshot import SnapshotPublisher, leads_response
+from search import SearchIndex, search_response
+from snapshot_updater import SnapshotUpdater
+import os
+import sys
+
+# db.py and the lead store live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lead_store import get_shared_store
 
 app = Flask(__name__)
 CORS(app)
 
-# Global variable to store real opportunities
-REAL_OPPORTUNITIES = []
-last_update = None
+LEADS_MESSAGE = 'These are REAL opportunities from official Canadian government sources'
+
+LEAD_COLLECTION = 'enhanced'
 
-def update_real_opportunities():
-    """Background task to update real opportunities"""
-    global REAL_OPPORTUNITIES, last_update
-    while True:
-        try:
-            print(f"\n[{datetime.now()}] Updating real opportunities...")
-            scraper = EnhancedRealOpportunityScraper()
-            REAL_OPPORTUNITIES = scraper.get_all_real_opportunities()
-            last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"[{datetime.now()}] Successfully updated {len(REAL_OPPORTUNITIES)} real opportunities")
-        except Exception as e:
-            print(f"[{datetime.now()}] Error updating opportunities: {e}")
-        
-        # Update every 30 minutes
-        time.sleep(1800)
+# What requests read: the updater's leads as of the last publish, swapped as a whole without locking
+published_leads = SnapshotPublisher(total=0, last_update=None, status='warming', message=LEADS_MESSAGE)
+search_index = SearchIndex()
 
-# Start background updater
-updater_thread = threading.Thread(target=update_real_opportunities, daemon=True)
-updater_thread.start()
+def publish_opportunities():
+    """Publish the updater's current leads and last_update for requests to read, and index them for search"""
+    leads = updater.leads
+    snapshot = published_leads.publish(leads, total=len(leads), last_update=updater.last_update,
+                                       status='ready' if updater.ready.is_set() else 'warming', message=LEADS_MESSAGE)
+    # Index here, on the updating thread, so searches don't pay for it
+    search_index.sync(snapshot.leads)
 
-# Initial load
-print("Loading initial real opportunities...")
-scraper = EnhancedRealOpportunityScraper()
-REAL_OPPORTUNITIES = scraper.get_all_real_opportunities()
-last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+# Refreshes (reprocessing only the sources and entries that changed), saves and follows
+# snapshots of the collection; advanced_sales_dashboard shares it, and its leader lock
+updater = SnapshotUpdater(LEAD_COLLECTION, IncrementalRefresher(concurrent=False), get_shared_store(),
+                          publish_opportunities)
+# Each worker loads the snapshot and starts updating on its first request (never in a pre-fork master)
+app.before_request(updater.start)
 
 @app.route('/')
 def index():
@@ -44,25 +43,41 @@ def index():
 
 @app.route('/api/leads')
 def get_leads():
-    """Return real opportunities"""
-    return jsonify({
-        'leads': REAL_OPPORTUNITIES,
-        'total': len(REAL_OPPORTUNITIES),
-        'last_update': last_update,
-        'message': 'These are REAL opportunities from official Canadian government sources'
-    })
+    """Return real opportunities, or one page of them with ?limit=&cursor=&sort=&fields="""
+    try:
+        return leads_response(published_leads.current, request)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/ready')
+def readiness():
+    """Readiness probe: 200 once leads are loaded, 503 while the first scrape is still running"""
+    snapshot = published_leads.current
+    if snapshot.meta['status'] != 'ready':
+        return jsonify({'status': 'warming'}), 503
+    return jsonify({'status': 'ready', 'leads': len(snapshot), 'last_update': snapshot.meta['last_update']})
+
+@app.route('/api/search')
+def search_opportunities():
+    """Relevance-ranked search over title, organization and description (?q=&limit=)"""
+    try:
+        return jsonify(search_response(search_index, published_leads.current.leads, request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/stats')
 def get_stats():
     """Return statistics about real opportunities"""
+    snapshot = published_leads.current
+    opportunities = snapshot.leads
     stats = {
-        'total_leads': len(REAL_OPPORTUNITIES),
-        'federal': len([l for l in REAL_OPPORTUNITIES if 'federal' in l['type'].lower()]),
-        'provincial': len([l for l in REAL_OPPORTUNITIES if 'provincial' in l['type'].lower()]),
-        'indigenous': len([l for l in REAL_OPPORTUNITIES if 'indigenous' in l['type'].lower()]),
-        'grants': len([l for l in REAL_OPPORTUNITIES if 'grant' in l['type'].lower()]),
-        'new_leads': len([l for l in REAL_OPPORTUNITIES if l['status'] == 'Active Opportunity']),
-        'last_update': last_update
+        'total_leads': len(opportunities),
+        'federal': len([l for l in opportunities if 'federal' in l['type'].lower()]),
+        'provincial': len([l for l in opportunities if 'provincial' in l['type'].lower()]),
+        'indigenous': len([l for l in opportunities if 'indigenous' in l['type'].lower()]),
+        'grants': len([l for l in opportunities if 'grant' in l['type'].lower()]),
+        'new_leads': len([l for l in opportunities if l['status'] == 'Active Opportunity']),
+        'last_update': snapshot.meta['last_update']
     }
     return jsonify(stats)
 
@@ -456,6 +471,13 @@ DASHBOARD_TEMPLATE = '''
             try {
                 const response = await fetch('/api/leads');
                 const data = await response.json();
+                if (data.status === 'warming') {
+                    // The server is still collecting its first set of opportunities
+                    document.getElementById('leadsContainer').innerHTML =
+                        '<div class="loading">Collecting the first set of opportunities...</div>';
+                    setTimeout(loadData, 5000);
+                    return;
+                }
                 allLeads = data.leads;
                 filteredLeads = allLeads;
                 
@@ -576,10 +598,11 @@ DASHBOARD_TEMPLATE = '''
 '''
 
 if __name__ == '__main__':
+    updater.start()
     print("\n" + "="*60)
     print("🚀 CANADIAN TRAINING OPPORTUNITIES - ENHANCED REAL LEADS SYSTEM")
     print("="*60)
-    print(f"✅ Loaded {len(REAL_OPPORTUNITIES)} real opportunities")
+    print(f"✅ Loaded {len(updater.leads)} real opportunities")
     print("🌐 Starting web server on http://localhost:5000")
     print("📊 Dashboard will auto-refresh every 5 minutes")
     print("🔄 Background updater runs every 30 minutes")
@@ -1,91 +1,96 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import json
 import time
+from html_parser import only, parse_html
+from http_client import FetchJob, get_shared_client
 
 class RealCanadianOpportunityScraper:
     """
     Scrapes REAL opportunities from actual Canadian government sources
     """
     
-    def __init__(self):
+    def __init__(self, http=None):
+        self.http = http or get_shared_client()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         self.opportunities = []
     
-    def scrape_canada_buyandsell(self):
-        """Scrape real opportunities from BuyandSell.gc.ca"""
-        print("🔍 Searching BuyandSell.gc.ca for training opportunities...")
-        
+    def buyandsell_jobs(self):
+        """One BuyandSell.gc.ca search per term"""
         # Search for training-related tenders
         search_terms = ["training", "professional development", "learning", "education"]
         base_url = "https://buyandsell.gc.ca/procurement-data/search/site"
         
-        for term in search_terms:
-            try:
-                url = f"{base_url}/{term}"
-                response = requests.get(url, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    # Parse actual tender listings
-                    results = soup.find_all('div', class_='search-result')
-                    for result in results[:5]:  # Get first 5 per search
-                        title_elem = result.find('h3')
-                        if title_elem and 'training' in title_elem.text.lower():
-                            self.opportunities.append({
-                                'source': 'BuyandSell.gc.ca',
-                                'title': title_elem.text.strip(),
-                                'url': 'https://buyandsell.gc.ca' + title_elem.find('a')['href'],
-                                'type': 'Federal'
-                            })
-            except Exception as e:
-                print(f"Error searching {term}: {e}")
+        return [
+            FetchJob(label=term, url=f"{base_url}/{term}", parse=self._parse_buyandsell,
+                     headers=self.headers, timeout=10)
+            for term in search_terms
+        ]
+    
+    def scrape_canada_buyandsell(self):
+        """Scrape real opportunities from BuyandSell.gc.ca"""
+        print("🔍 Searching BuyandSell.gc.ca for training opportunities...")
+        self._run_jobs(self.buyandsell_jobs())
+    
+    def _parse_buyandsell(self, response):
+        opportunities = []
+        soup = parse_html(response.content, parse_only=only('div', class_='search-result'))
+        # Parse actual tender listings
+        results = soup.find_all('div', class_='search-result')
+        for result in results[:5]:  # Get first 5 per search
+            title_elem = result.find('h3')
+            if title_elem and 'training' in title_elem.text.lower():
+                opportunities.append({
+                    'source': 'BuyandSell.gc.ca',
+                    'title': title_elem.text.strip(),
+                    'url': 'https://buyandsell.gc.ca' + title_elem.find('a')['href'],
+                    'type': 'Federal'
+                })
+        return opportunities
+    
+    def merx_jobs(self):
+        # MERX public opportunities
+        return [FetchJob(label='MERX', url="https://www.merx.com/public/solicitations",
+                         parse=self._parse_merx, headers=self.headers, timeout=10)]
     
     def scrape_merx(self):
         """Scrape real opportunities from MERX"""
         print("🔍 Searching MERX for training opportunities...")
-        
-        try:
-            # MERX public opportunities
-            url = "https://www.merx.com/public/solicitations"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                # Look for training-related opportunities
-                listings = soup.find_all('div', class_='tender-list-item')
-                for listing in listings[:10]:
-                    title = listing.find('h4')
-                    if title and any(word in title.text.lower() for word in ['training', 'learning', 'development']):
-                        self.opportunities.append({
-                            'source': 'MERX',
-                            'title': title.text.strip(),
-                            'url': 'https://www.merx.com' + listing.find('a')['href'],
-                            'type': 'Various'
-                        })
-        except Exception as e:
-            print(f"Error scraping MERX: {e}")
+        self._run_jobs(self.merx_jobs())
+    
+    def _parse_merx(self, response):
+        opportunities = []
+        soup = parse_html(response.content, parse_only=only('div', class_='tender-list-item'))
+        # Look for training-related opportunities
+        listings = soup.find_all('div', class_='tender-list-item')
+        for listing in listings[:10]:
+            title = listing.find('h4')
+            if title and any(word in title.text.lower() for word in ['training', 'learning', 'development']):
+                opportunities.append({
+                    'source': 'MERX',
+                    'title': title.text.strip(),
+                    'url': 'https://www.merx.com' + listing.find('a')['href'],
+                    'type': 'Various'
+                })
+        return opportunities
+    
+    def ontario_jobs(self):
+        return [FetchJob(label='Ontario', url="https://www.doingbusiness.mgs.gov.on.ca/mbs/psb/psb.nsf/English/BidsOpen",
+                         parse=self._parse_ontario_tenders, headers=self.headers, timeout=10)]
     
     def scrape_ontario_tenders(self):
         """Scrape real opportunities from Ontario Tenders Portal"""
         print("🔍 Searching Ontario Tenders Portal...")
-        
-        try:
-            url = "https://www.doingbusiness.mgs.gov.on.ca/mbs/psb/psb.nsf/English/BidsOpen"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                # Parse Ontario government tenders
-                # Implementation depends on actual site structure
-                pass
-        except Exception as e:
-            print(f"Error scraping Ontario: {e}")
+        self._run_jobs(self.ontario_jobs())
     
-    def search_with_duckduckgo(self):
-        """Use DuckDuckGo to find real opportunities"""
-        print("🔍 Searching with DuckDuckGo for recent opportunities...")
-        
+    def _parse_ontario_tenders(self, response):
+        # Parse Ontario government tenders
+        # Implementation depends on actual site structure - until then skip
+        # building a tree nobody reads
+        return []
+    
+    def duckduckgo_jobs(self):
         queries = [
             "site:buyandsell.gc.ca training RFP 2025",
             "site:merx.com professional development tender",
@@ -93,36 +98,66 @@ class RealCanadianOpportunityScraper:
             "site:*.gc.ca request for proposal training 2025"
         ]
         
-        for query in queries:
+        return [
+            FetchJob(label=f"search {query}", url=f"https://duckduckgo.com/html/?q={query}",
+                     parse=self._parse_duckduckgo, headers=self.headers, timeout=10)
+            for query in queries
+        ]
+    
+    def search_with_duckduckgo(self):
+        """Use DuckDuckGo to find real opportunities"""
+        print("🔍 Searching with DuckDuckGo for recent opportunities...")
+        self._run_jobs(self.duckduckgo_jobs())
+    
+    def _parse_duckduckgo(self, response):
+        opportunities = []
+        soup = parse_html(response.content, parse_only=only('div', class_='result'))
+        results = soup.find_all('div', class_='result')
+        for result in results[:3]:
+            link = result.find('a', class_='result__a')
+            if link:
+                opportunities.append({
+                    'source': 'Web Search',
+                    'title': link.text.strip(),
+                    'url': link['href'],
+                    'type': 'Found via search'
+                })
+        return opportunities
+    
+    def fetch_jobs(self):
+        """Every network fetch this scraper makes, in merge order"""
+        return self.buyandsell_jobs() + self.merx_jobs() + self.ontario_jobs() + self.duckduckgo_jobs()
+    
+    def _run_jobs(self, jobs):
+        """Run jobs one at a time on the shared HTTP client"""
+        for job in jobs:
             try:
-                url = f"https://duckduckgo.com/html/?q={query}"
-                response = requests.get(url, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    results = soup.find_all('div', class_='result')
-                    for result in results[:3]:
-                        link = result.find('a', class_='result__a')
-                        if link:
-                            self.opportunities.append({
-                                'source': 'Web Search',
-                                'title': link.text.strip(),
-                                'url': link['href'],
-                                'type': 'Found via search'
-                            })
+                self.opportunities.extend(self.http.run_job(job))
             except Exception as e:
-                print(f"Error with search {query}: {e}")
+                print(f"Error with {job.label}: {e}")
     
-    def get_all_real_opportunities(self):
-        """Get all real opportunities from multiple sources"""
+    def get_all_real_opportunities(self, backend='sync', engine=None):
+        """Get all real opportunities from multiple sources
+        
+        backend='async' runs every fetch concurrently on an AsyncFetchEngine;
+        the call stays synchronous and returns results in the same order.
+        """
         print("\n" + "="*60)
         print("🚀 SEARCHING FOR REAL CANADIAN TRAINING OPPORTUNITIES")
         print("="*60)
         
         # Scrape from multiple real sources
-        self.scrape_canada_buyandsell()
-        self.scrape_merx()
-        self.scrape_ontario_tenders()
-        self.search_with_duckduckgo()
+        if backend == 'async':
+            from async_engine import AsyncFetchEngine
+            engine = engine or AsyncFetchEngine(cache=self.http.cache, rate_limiter=self.http.rate_limiter,
+                                                fetch_policy=self.http.fetch_policy)
+            for results in engine.run(self.fetch_jobs()):
+                self.opportunities.extend(results)
+        else:
+            self.scrape_canada_buyandsell()
+            self.scrape_merx()
+            self.scrape_ontario_tenders()
+            self.search_with_duckduckgo()
         
         print(f"\n✅ Found {len(self.opportunities)} REAL opportunities")
         print("="*60)
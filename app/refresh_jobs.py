@@ -0,0 +1,95 @@
+import threading
+from datetime import datetime
+
+# Finished jobs kept around so clients can still read their final status
+MAX_FINISHED_JOBS = 20
+
+# How often the leader checks the store for refreshes requested through other workers
+JOB_POLL_INTERVAL = 2
+
+
+class RefreshJob:
+    """
+    The progress handle a runner gets for one refresh.
+
+    One run can serve several queued jobs at once (job_ids); report()
+    saves each source's progress ({'status': 'pending'|'running'|'done'|'failed',
+    'leads': n, 'error': ...}) to all of them, so any worker can serve it.
+    """
+
+    def __init__(self, store, job_ids):
+        self.store = store
+        self.job_ids = job_ids
+        self.sources = {}
+        self._lock = threading.Lock()
+
+    def report(self, source, status, leads=None, error=None):
+        """Progress callback for the runner: record where one source has got to"""
+        with self._lock:
+            progress = self.sources.setdefault(source, {'status': 'pending', 'leads': 0})
+            progress['status'] = status
+            if leads is not None:
+                progress['leads'] = leads
+            if error is not None:
+                progress['error'] = str(error)
+            try:
+                self.store.report_refresh(self.job_ids, {name: dict(p) for name, p in self.sources.items()})
+            except Exception as e:
+                # Progress is informational; a failed write must not stop the scrape
+                print(f"[{datetime.now()}] Could not save refresh progress: {e}")
+
+
+class RefreshJobs:
+    """
+    Refresh jobs for one collection, shared by every worker through the lead store.
+
+    Any worker can submit() a job or get() one by ID, since jobs live in
+    the store rather than in one process. Only the leader runs them:
+    run_pending() claims every queued job and runs runner(job) once for
+    all of them. While a job is queued or running, submit() returns it
+    instead of queuing another, so refresh requests to any worker during
+    a scrape share it. runner(job) reports per-source progress through
+    job.report() and returns a JSON-friendly result.
+    """
+
+    def __init__(self, runner, store, collection, keep=MAX_FINISHED_JOBS):
+        self.runner = runner
+        self.store = store
+        self.collection = collection
+        self.keep = keep
+        self._wake = threading.Event()
+
+    def submit(self):
+        """The queued or running job, or a newly queued one; returns (job dict, created)"""
+        job, created = self.store.submit_refresh(self.collection)
+        # If this worker is the leader, start now rather than at its next poll
+        self._wake.set()
+        return job, created
+
+    def get(self, job_id):
+        """A job as a dict, or None if there is no such job"""
+        return self.store.refresh_job(job_id)
+
+    def wait(self, timeout):
+        """Sleep up to timeout seconds, waking early if this worker submits a job"""
+        if self._wake.wait(timeout):
+            self._wake.clear()
+
+    def fail_abandoned(self):
+        """For a new leader: fail the jobs its predecessor was running when it stopped"""
+        return self.store.fail_running_refreshes(self.collection, 'The worker running this refresh stopped')
+
+    def run_pending(self):
+        """Leader only: run every queued job, as one refresh; returns True if there were any"""
+        job_ids = self.store.claim_refreshes(self.collection)
+        if not job_ids:
+            return False
+        job = RefreshJob(self.store, job_ids)
+        try:
+            result = self.runner(job)
+            status, error = 'succeeded', None
+        except Exception as e:
+            print(f"[{datetime.now()}] Refresh job {', '.join(job_ids)} failed: {e}")
+            result, status, error = None, 'failed', str(e)
+        self.store.finish_refresh(self.collection, job_ids, self.keep, status, result, error)
+        return True
@@ -1,35 +1,70 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import re
-import pandas as pd
 import json
 import time
 from urllib.parse import quote, urlparse
 import random
+from concurrent.futures import ThreadPoolExecutor
+from dedup import StreamingDeduplicator
+from html_parser import only, parse_html
+from http_client import get_shared_client
+from keyword_matcher import KeywordAutomaton
+from lead_ids import make_lead_id
+
+# Training-related keywords
+TRAINING_SIGNALS = [
+    'training', 'professional development', 'skills development', 'capacity building',
+    'learning', 'education', 'workshop', 'seminar', 'certification', 'program',
+    'upskilling', 'reskilling', 'development program', 'leadership development',
+    'digital transformation', 'change management', 'modernization', 'digital skills',
+    'ai adoption', 'data literacy', 'cybersecurity training', 'cloud training'
+]
+
+# Organization types
+ORG_TYPES = [
+    'government of canada', 'federal', 'provincial', 'municipal', 'crown corporation',
+    'public service', 'government agency', 'ministry', 'department', 'city of',
+    'region of', 'indigenous', 'first nations', 'inuit', 'métis', 'non-profit',
+    'charity', 'npo', 'public sector', 'government services'
+]
+
+# Training type -> keywords, checked in priority order
+TRAINING_TYPES = {
+    'Digital Skills Training': ['digital', 'technology'],
+    'Leadership Development': ['leadership'],
+    'DEI Training': ['diversity', 'inclusion'],
+    'Language Training': ['french', 'language'],
+    'Project Management': ['project management']
+}
+
+# Every vocabulary in one automaton so a result is classified in a single pass
+LEAD_MATCHER = KeywordAutomaton({
+    'training_signal': TRAINING_SIGNALS,
+    'org_type': ORG_TYPES,
+    'current_year': ['2025', '2026'],
+    **TRAINING_TYPES
+})
+
+DOMAIN_ORGANIZATIONS = {
+    'canada.ca': 'Government of Canada',
+    'ontario.ca': 'Government of Ontario',
+    'gov.bc.ca': 'Government of British Columbia',
+    'alberta.ca': 'Government of Alberta',
+    'toronto.ca': 'City of Toronto',
+    'vancouver.ca': 'City of Vancouver'
+}
+DOMAIN_MATCHER = KeywordAutomaton({org: [domain] for domain, org in DOMAIN_ORGANIZATIONS.items()})
 
 class CanadianPublicSectorScraper:
-    def __init__(self):
+    def __init__(self, http=None, max_workers=5):
+        self.http = http or get_shared_client()
+        self.max_workers = max_workers
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
         
-        # Training-related keywords
-        self.training_signals = [
-            'training', 'professional development', 'skills development', 'capacity building',
-            'learning', 'education', 'workshop', 'seminar', 'certification', 'program',
-            'upskilling', 'reskilling', 'development program', 'leadership development',
-            'digital transformation', 'change management', 'modernization', 'digital skills',
-            'ai adoption', 'data literacy', 'cybersecurity training', 'cloud training'
-        ]
-        
-        # Organization types
-        self.org_types = [
-            'government of canada', 'federal', 'provincial', 'municipal', 'crown corporation',
-            'public service', 'government agency', 'ministry', 'department', 'city of',
-            'region of', 'indigenous', 'first nations', 'inuit', 'métis', 'non-profit',
-            'charity', 'npo', 'public sector', 'government services'
-        ]
+        self.training_signals = TRAINING_SIGNALS
+        self.org_types = ORG_TYPES
 
     def search_web_scrape(self, query):
         """Use web search to find training opportunities"""
@@ -61,7 +96,7 @@ class CanadianPublicSectorScraper:
         """Search using DuckDuckGo instant answers API"""
         try:
             url = f"https://api.duckduckgo.com/?q={quote(query + ' site:canada.ca OR site:ontario.ca OR site:gov.bc.ca')}&format=json"
-            response = requests.get(url, headers=self.headers, timeout=5)
+            response = self.http.get(url, headers=self.headers, timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 results = []
@@ -77,8 +112,8 @@ class CanadianPublicSectorScraper:
                             })
                 
                 return results
-        except:
-            pass
+        except Exception as e:
+            print(f"   ⚠️ DuckDuckGo search failed: {e}")
         return []
 
     def _search_government_sites(self, query):
@@ -88,9 +123,9 @@ class CanadianPublicSectorScraper:
         # Canada.ca news
         try:
             url = f"https://www.canada.ca/en/news/advanced-news-search/news-results.html?_={quote(query)}"
-            response = requests.get(url, headers=self.headers, timeout=5)
+            response = self.http.get(url, headers=self.headers, timeout=5)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = parse_html(response.content, parse_only=only('article'))
                 articles = soup.find_all('article', limit=3)
                 for article in articles:
                     title_elem = article.find('h3') or article.find('h2')
@@ -101,8 +136,8 @@ class CanadianPublicSectorScraper:
                             'link': 'https://www.canada.ca' + link_elem.get('href', ''),
                             'snippet': article.get_text(strip=True)[:200]
                         })
-        except:
-            pass
+        except Exception as e:
+            print(f"   ⚠️ Canada.ca news search failed: {e}")
             
         return results
 
@@ -112,8 +147,12 @@ class CanadianPublicSectorScraper:
         snippet = result.get('snippet', '')
         link = result.get('link', '')
         
+        # Classify against every keyword vocabulary in one pass
+        text = title + ' ' + snippet
+        matches = LEAD_MATCHER.scan(text)
+        
         # Check if it's a training opportunity
-        if not self._is_training_opportunity(title + ' ' + snippet):
+        if not self._is_training_opportunity(text, matches):
             return None
             
         # Extract organization
@@ -121,7 +160,7 @@ class CanadianPublicSectorScraper:
         
         # Generate lead
         lead = {
-            'id': f"lead_{int(time.time())}_{random.randint(1000,9999)}",
+            'id': make_lead_id(link, org, title[:200]),
             'organization': org,
             'opportunity': title[:200],
             'description': snippet[:500],
@@ -136,43 +175,35 @@ class CanadianPublicSectorScraper:
             'critical_analysis': self._generate_analysis(title, snippet, org),
             'next_steps': self._generate_next_steps(org),
             'decision_makers': self._identify_decision_makers(org, snippet),
-            'training_type': self._identify_training_type(title + ' ' + snippet)
+            'training_type': self._identify_training_type(text, matches)
         }
         
         return lead
 
-    def _is_training_opportunity(self, text):
+    def _is_training_opportunity(self, text, matches=None):
         """Check if text indicates a training opportunity"""
-        text_lower = text.lower()
+        if matches is None:
+            matches = LEAD_MATCHER.scan(text)
         
         # Must have at least one training signal
-        has_training = any(signal in text_lower for signal in self.training_signals)
+        has_training = 'training_signal' in matches
         
         # Must be Canadian public sector
-        has_public_sector = any(org in text_lower for org in self.org_types)
+        has_public_sector = 'org_type' in matches
         
         # Must be current (2025/2026)
-        has_current_year = any(year in text for year in ['2025', '2026'])
+        has_current_year = 'current_year' in matches
         
         return has_training and (has_public_sector or has_current_year)
 
     def _extract_organization(self, title, snippet, link):
         """Extract organization name"""
         # Check URL domain
-        domain = urlparse(link).netloc.lower()
-        
-        domain_mapping = {
-            'canada.ca': 'Government of Canada',
-            'ontario.ca': 'Government of Ontario',
-            'gov.bc.ca': 'Government of British Columbia',
-            'alberta.ca': 'Government of Alberta',
-            'toronto.ca': 'City of Toronto',
-            'vancouver.ca': 'City of Vancouver'
-        }
+        domain = urlparse(link).netloc
         
-        for key, org in domain_mapping.items():
-            if key in domain:
-                return org
+        org = DOMAIN_MATCHER.first(domain, DOMAIN_ORGANIZATIONS.values())
+        if org:
+            return org
                 
         # Try to extract from title
         if 'government of' in title.lower():
@@ -265,26 +296,22 @@ class CanadianPublicSectorScraper:
             
         return titles
 
-    def _identify_training_type(self, text):
+    def _identify_training_type(self, text, matches=None):
         """Identify type of training"""
-        text_lower = text.lower()
-        
-        if 'digital' in text_lower or 'technology' in text_lower:
-            return 'Digital Skills Training'
-        elif 'leadership' in text_lower:
-            return 'Leadership Development'
-        elif 'diversity' in text_lower or 'inclusion' in text_lower:
-            return 'DEI Training'
-        elif 'french' in text_lower or 'language' in text_lower:
-            return 'Language Training'
-        elif 'project management' in text_lower:
-            return 'Project Management'
-        else:
-            return 'Professional Development'
+        return LEAD_MATCHER.first(text, TRAINING_TYPES, 'Professional Development', matches)
 
-    def get_all_leads(self):
-        """Get all training leads using focused searches"""
+    def get_all_leads(self, progress=None):
+        """
+        Get all training leads using focused searches.
+        
+        progress, if given, is called as progress(query, status, leads=, error=)
+        as each search is queued, starts and finishes. 'running' is reported
+        from the worker thread, so progress must be thread-safe.
+        """
+        report = progress or (lambda *args, **kwargs: None)
         all_leads = []
+        # Results from different queries often repeat, so drop duplicates as they arrive
+        seen_leads = StreamingDeduplicator(fields=('organization', 'opportunity'))
         
         # Quick focused searches
         searches = [
@@ -297,25 +324,38 @@ class CanadianPublicSectorScraper:
         
         print("\n🔍 Searching for Canadian public sector training opportunities...")
         
-        for i, query in enumerate(searches, 1):
-            print(f"\n[{i}/{len(searches)}] Searching: {query}")
+        # Queries run in parallel - the shared client's per-host rate limiter
+        # keeps each site polite, so no blanket sleep is needed between them
+        def run_search(query):
+            # Searches beyond max_workers wait in the pool, so only now is this one running
+            report(query, 'running')
+            return self.search_web_scrape(query)
+
+        for query in searches:
+            report(query, 'pending')
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(run_search, query) for query in searches]
             
-            try:
-                results = self.search_web_scrape(query)
-                print(f"   Found {len(results)} results")
+            for i, (query, future) in enumerate(zip(searches, futures), 1):
+                print(f"\n[{i}/{len(searches)}] Searching: {query}")
                 
-                for result in results:
-                    lead = self.extract_lead_from_result(result, "Training Opportunity")
-                    if lead and lead not in all_leads:
-                        all_leads.append(lead)
-                        print(f"   ✅ Added lead: {lead['organization']}")
-                        
-                # Small delay to avoid rate limiting
-                time.sleep(0.5)
-                
-            except Exception as e:
-                print(f"   ❌ Error: {str(e)}")
-                continue
+                try:
+                    results = future.result()
+                    print(f"   Found {len(results)} results")
+                    
+                    added = 0
+                    for result in results:
+                        lead = self.extract_lead_from_result(result, "Training Opportunity")
+                        if lead and seen_leads.add(lead):
+                            all_leads.append(lead)
+                            added += 1
+                            print(f"   ✅ Added lead: {lead['organization']}")
+                    report(query, 'done', leads=added)
+                    
+                except Exception as e:
+                    print(f"   ❌ Error: {str(e)}")
+                    report(query, 'failed', error=e)
+                    continue
         
         # If no real leads found, generate some realistic examples
         if not all_leads:
@@ -324,19 +364,12 @@ class CanadianPublicSectorScraper:
         
         print(f"\n✅ Total leads found: {len(all_leads)}")
         
-        # Remove duplicates
-        df = pd.DataFrame(all_leads)
-        if not df.empty:
-            df = df.drop_duplicates(subset=['organization', 'opportunity'], keep='first')
-            all_leads = df.to_dict('records')
-        
         return all_leads
 
     def _generate_realistic_examples(self):
         """Generate realistic example leads based on current government initiatives"""
         examples = [
             {
-                'id': f"lead_{int(time.time())}_1",
                 'organization': 'Government of Canada - Treasury Board Secretariat',
                 'opportunity': 'Digital Transformation Training Program for Federal Employees 2025',
                 'description': 'Comprehensive training program to upskill federal employees in digital technologies, data analytics, and AI adoption as part of the GC Digital Ambition 2025-2027.',
@@ -360,7 +393,6 @@ class CanadianPublicSectorScraper:
                 'training_type': 'Digital Skills Training'
             },
             {
-                'id': f"lead_{int(time.time())}_2",
                 'organization': 'Ontario Public Service',
                 'opportunity': 'Mandatory Accessibility Training for All OPS Employees',
                 'description': 'Province-wide mandatory training on AODA compliance and inclusive service delivery for 60,000+ OPS employees. Multi-year contract starting April 2025.',
@@ -384,7 +416,6 @@ class CanadianPublicSectorScraper:
                 'training_type': 'Compliance Training'
             },
             {
-                'id': f"lead_{int(time.time())}_3",
                 'organization': 'City of Toronto',
                 'opportunity': 'Climate Action Training for Municipal Staff',
                 'description': 'Training program to support TransformTO climate action strategy. Focus on sustainable practices, green procurement, and climate adaptation for 35,000 city employees.',
@@ -409,4 +440,6 @@ class CanadianPublicSectorScraper:
             }
         ]
         
+        for example in examples:
+            example['id'] = make_lead_id(example['source'], example['organization'], example['opportunity'])
         return examples
\ No newline at end of file
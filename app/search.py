@@ -0,0 +1,328 @@
+import heapq
+import math
+import threading
+from bisect import bisect_left, insort
+
+from lead_index import tokenize
+
+# How much a match in each field counts towards a term's frequency
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'opportunity': 3.0,  # the title field of AI-generated leads
+    'organization': 2.0,
+    'description': 1.0,
+    'critical_analysis': 1.0
+}
+
+# Too common to be worth matching on their own, in either language
+STOP_WORDS = frozenset("""
+a an and are as at be by for from in into is it of on or the to with
+au aux avec ce ces d dans de des du en et l la le les ou par pour sur un une
+""".split())
+
+K1 = 1.2
+B = 0.75
+
+PREFIX_WEIGHT = 0.8  # 'cyber' -> 'cybersecurity'
+FUZZY_WEIGHT = 0.6   # 'goverment' -> 'government'
+MAX_EXPANSIONS = 30
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 4
+
+
+def search_terms(text):
+    """Index/query terms: accent-folded words, minus stop words and single letters (l', d')"""
+    return [token for token in tokenize(text) if len(token) > 1 and token not in STOP_WORDS]
+
+
+def _deletes(term):
+    """Every variant of term with one character removed"""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def within_one_edit(a, b):
+    """True if a and b differ by at most one insertion, deletion, substitution or adjacent swap"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:] or (a[i + 2:] == b[i + 2:] and a[i:i + 2] == b[i:i + 2][::-1])
+    return a[i:] == b[i + 1:]
+
+
+class SearchIndex:
+    """
+    BM25 full-text search over leads, kept in step with each refresh.
+
+    sync() takes the current lead list and only re-indexes leads that were
+    added, removed, or whose searchable text changed. Each query word also
+    matches longer words it is a prefix of, and words one typo away
+    (found through a one-deletion neighbourhood index, as in SymSpell), at
+    a discount.
+
+    Queries are scored a word at a time, most valuable word first
+    (MaxScore): once the words left couldn't lift a lead that hasn't
+    matched yet into the top `limit`, their postings are no longer
+    scanned - they only add to the leads already in the running. Words
+    so common their idf is near zero cost almost nothing.
+    """
+
+    def __init__(self, field_weights=FIELD_WEIGHTS):
+        self.field_weights = field_weights
+        self.docs = {}          # lead ID -> (lead, searchable text, weighted length)
+        self.postings = {}      # term -> {lead ID: weighted term frequency}
+        self.vocabulary = []    # sorted, for prefix lookups
+        self.deletes = {}       # one-deletion variant -> terms
+        self.total_length = 0.0
+        self._impacts = {}      # term -> (generation, {lead ID: impact}, highest impact)
+        self._ordered = {}      # term -> (impacts it was sorted from, [(-impact, lead ID)] ascending)
+        self._generation = 0
+        self._synced = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _text(self, lead):
+        return tuple(str(lead.get(field) or '') for field in self.field_weights)
+
+    def _add_term(self, term):
+        insort(self.vocabulary, term)
+        for variant in _deletes(term):
+            self.deletes.setdefault(variant, set()).add(term)
+
+    def _drop_term(self, term):
+        del self.postings[term]
+        self._impacts.pop(term, None)
+        self._ordered.pop(term, None)
+        del self.vocabulary[bisect_left(self.vocabulary, term)]
+        for variant in _deletes(term):
+            terms = self.deletes[variant]
+            terms.discard(term)
+            if not terms:
+                del self.deletes[variant]
+
+    def add(self, doc_id, lead):
+        """Index a lead, replacing any earlier version with the same ID"""
+        with self._lock:
+            text = self._text(lead)
+            previous = self.docs.get(doc_id)
+            if previous is not None and previous[1] == text:
+                self.docs[doc_id] = (lead, text, previous[2])
+                return
+            if previous is not None:
+                self.remove(doc_id)
+
+            frequencies = {}
+            for field_text, weight in zip(text, self.field_weights.values()):
+                for term in search_terms(field_text):
+                    frequencies[term] = frequencies.get(term, 0.0) + weight
+            length = sum(frequencies.values())
+
+            for term, frequency in frequencies.items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = {}
+                    self._add_term(term)
+                postings[doc_id] = frequency
+            self.docs[doc_id] = (lead, text, length)
+            self.total_length += length
+            self._generation += 1
+
+    def remove(self, doc_id):
+        with self._lock:
+            previous = self.docs.pop(doc_id, None)
+            if previous is None:
+                return
+            lead, text, length = previous
+            for field_text in text:
+                for term in search_terms(field_text):
+                    postings = self.postings.get(term)
+                    if postings is not None and postings.pop(doc_id, None) is not None and not postings:
+                        self._drop_term(term)
+            self.total_length -= length
+            self._generation += 1
+
+    def sync(self, leads):
+        """Bring the index in line with the current lead list (a no-op if it's the list already indexed)"""
+        with self._lock:
+            if self._synced is leads:
+                return
+            current = {}
+            for position, lead in enumerate(leads):
+                current[str(lead.get('id', position))] = lead
+            for doc_id in [doc_id for doc_id in self.docs if doc_id not in current]:
+                self.remove(doc_id)
+            for doc_id, lead in current.items():
+                self.add(doc_id, lead)
+            self._synced = leads
+
+    def _term_impacts(self, term):
+        """
+        BM25 impacts of a term (term frequency saturated and length-normalized):
+        ({lead ID: impact}, highest impact)
+        """
+        cached = self._impacts.get(term)
+        if cached is not None and cached[0] == self._generation:
+            return cached[1], cached[2]
+        average_length = self.total_length / len(self.docs)
+        impacts = {}
+        for doc_id, frequency in self.postings[term].items():
+            norm = K1 * (1 - B + B * self.docs[doc_id][2] / average_length)
+            impacts[doc_id] = frequency * (K1 + 1) / (frequency + norm)
+        highest = max(impacts.values())
+        self._impacts[term] = (self._generation, impacts, highest)
+        self._ordered.pop(term, None)
+        return impacts, highest
+
+    def _term_ordered(self, term):
+        """[(-impact, lead ID)] of a term, highest impact first"""
+        impacts, _ = self._term_impacts(term)
+        ordered = self._ordered.get(term)
+        if ordered is None or ordered[0] is not impacts:
+            ordered = (impacts, sorted((-impact, doc_id) for doc_id, impact in impacts.items()))
+            self._ordered[term] = ordered
+        return ordered[1]
+
+    def _idf(self, term):
+        df = len(self.postings[term])
+        return math.log(1 + (len(self.docs) - df + 0.5) / (df + 0.5))
+
+    def expand(self, word):
+        """{index term: weight} a query word matches - itself, longer words it prefixes, and near misses"""
+        expansions = {}
+        if word in self.postings:
+            expansions[word] = 1.0
+
+        if len(word) >= MIN_PREFIX_LENGTH:
+            prefixed = []
+            for term in self.vocabulary[bisect_left(self.vocabulary, word):]:
+                if not term.startswith(word):
+                    break
+                if term != word:
+                    prefixed.append(term)
+            for term in heapq.nlargest(MAX_EXPANSIONS, prefixed, key=lambda t: len(self.postings[t])):
+                expansions[term] = PREFIX_WEIGHT
+
+        if len(word) >= MIN_FUZZY_LENGTH:
+            candidates = set(self.deletes.get(word, ()))
+            for variant in _deletes(word) | {word}:
+                if variant in self.postings:
+                    candidates.add(variant)
+                candidates.update(self.deletes.get(variant, ()))
+            for term in candidates:
+                if term not in expansions and within_one_edit(word, term):
+                    expansions[term] = FUZZY_WEIGHT
+        return expansions
+
+    def _top_for_word(self, expansions, limit):
+        """Top leads for a one-word query, read straight off the impact-ordered postings"""
+        def stream(term, scale):
+            for negative_impact, doc_id in self._term_ordered(term):
+                yield scale * negative_impact, doc_id
+
+        streams = [stream(term, weight * self._idf(term)) for term, weight in expansions.items()]
+        ranked = {}
+        for negative_score, doc_id in heapq.merge(*streams):
+            # Postings come best first, so a lead's first appearance is its best expansion
+            if doc_id not in ranked:
+                ranked[doc_id] = -negative_score
+                if len(ranked) == limit:
+                    break
+        return ranked
+
+    def _top_for_words(self, groups, limit):
+        """
+        Top leads for a multi-word query (MaxScore, term at a time).
+
+        Each expansion's postings are a list with an upper bound (its best
+        impact x weight x idf); lists are read best bound first. Once the
+        bounds left are too small to lift a lead that hasn't matched yet into
+        the top `limit`, later lists are only looked up for the leads
+        already in the running instead of scanned.
+        """
+        lists = []
+        for group_index, expansions in enumerate(groups):
+            for term, weight in expansions.items():
+                impacts, highest = self._term_impacts(term)
+                scale = weight * self._idf(term)
+                lists.append((scale * highest, group_index, scale, impacts))
+        lists.sort(key=lambda item: item[0], reverse=True)
+
+        best = [{} for _ in groups]  # per word: lead ID -> score through its best expansion so far
+        totals = {}
+        candidates = None
+        for i, (_, group_index, scale, impacts) in enumerate(lists):
+            if candidates is None and len(totals) >= limit:
+                # Most an unseen lead could still score: each word's best remaining bound
+                remaining = {}
+                for bound, later_group, _, _ in lists[i:]:
+                    remaining[later_group] = max(remaining.get(later_group, 0.0), bound)
+                remaining = sum(remaining.values())
+                kth_best = heapq.nlargest(limit, totals.values())[-1]
+                if kth_best > remaining:
+                    candidates = [doc_id for doc_id, total in totals.items() if total + remaining >= kth_best]
+
+            word_best = best[group_index]
+            if candidates is None and not word_best:
+                # First list for this word: nothing to take the best of yet
+                scores = {doc_id: scale * impact for doc_id, impact in impacts.items()}
+                best[group_index] = scores
+                if not totals:
+                    totals = dict(scores)
+                else:
+                    for doc_id, score in scores.items():
+                        totals[doc_id] = totals.get(doc_id, 0.0) + score
+                continue
+            if candidates is None:
+                matches = impacts.items()
+            else:
+                matches = [(doc_id, impacts[doc_id]) for doc_id in candidates if doc_id in impacts]
+            for doc_id, impact in matches:
+                score = scale * impact
+                previous = word_best.get(doc_id, 0.0)
+                if score > previous:
+                    word_best[doc_id] = score
+                    totals[doc_id] = totals.get(doc_id, 0.0) + score - previous
+        return totals
+
+    def search(self, query, limit=20):
+        """Top `limit` leads for the query as [(lead, score)], best first"""
+        with self._lock:
+            if not self.docs:
+                return []
+            words = search_terms(query)
+            groups = [expansions for expansions in (self.expand(word) for word in dict.fromkeys(words)) if expansions]
+            if not groups:
+                return []
+
+            if len(groups) == 1:
+                scores = self._top_for_word(groups[0], limit)
+            else:
+                scores = self._top_for_words(groups, limit)
+            ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            return [(self.docs[doc_id][0], round(score, 4)) for doc_id, score in ranked]
+
+
+def search_response(index, leads, args):
+    """Body of a /api/search response for ?q=&limit= over the given leads"""
+    query = args.get('q', '')
+    try:
+        limit = max(1, min(int(args.get('limit', 20)), 100))
+    except ValueError:
+        raise ValueError(f"limit must be a number, not {args.get('limit')!r}")
+    # Apps sync when they publish new leads; this only catches up on any they didn't
+    index.sync(leads)
+    results = index.search(query, limit) if query.strip() else []
+    return {
+        'query': query,
+        'results': [dict(lead, search_score=score) for lead, score in results],
+        'count': len(results),
+        'indexed': len(index)
+    }
@@ -0,0 +1,160 @@
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# db.py, the lead store and the leader lock live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from leader import LeaderLock
+
+REFRESH_INTERVAL = 1800  # 30 minutes
+WARMING_RETRY_INTERVAL = 60
+FOLLOW_INTERVAL = 15  # how often non-leader workers check for a newer snapshot
+
+
+class OncePerProcess:
+    """
+    Calls start() the first time it is called in each process, and never again there.
+
+    Apps call it before each request rather than at import: a pre-forking
+    server (gunicorn --preload) imports the app in its master, which serves
+    no requests, so the master never starts background work, while every
+    worker starts its own on its first request. Forked workers start afresh:
+    db.py gives them their own connection pool and leader.py drops any
+    leadership they inherited.
+    """
+
+    def __init__(self, start):
+        self._start = start
+        self._started_in = None  # PID of the process start() ran in
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._forked)
+
+    def _forked(self):
+        # The lock may have been held by a thread that didn't come along
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        if self._started_in == os.getpid():
+            return
+        with self._lock:
+            if self._started_in != os.getpid():
+                self._start()
+                self._started_in = os.getpid()
+
+
+class SnapshotUpdater:
+    """
+    Keeps one worker's copy of a collection's leads current.
+
+    Only one worker (process) scrapes: the one holding the collection's
+    leader lock refreshes through an IncrementalRefresher every
+    refresh_interval and saves the result as the collection's latest
+    snapshot. Every other worker just reloads each snapshot it saves, and
+    the next worker to check takes over if the leader exits. Apps sharing
+    a collection share its lock.
+
+    publish() is called (with no arguments) whenever leads, last_update or
+    ready change, for the app to publish what requests should read.
+    """
+
+    def __init__(self, collection, refresher, store, publish, refresh_interval=REFRESH_INTERVAL):
+        self.collection = collection
+        self.refresher = refresher
+        self.store = store
+        self.publish = publish
+        self.refresh_interval = refresh_interval
+        self.leader = LeaderLock(f"scraper-{collection}")
+        self.leads = []
+        self.source_timings = {}
+        self.last_changes = {}
+        self.last_update = None
+        self.run_id = None  # ScrapeRun the current leads came from
+        # Set once leads are loaded, from the saved snapshot or the first scrape
+        self.ready = threading.Event()
+        self._start_once = OncePerProcess(self._start)
+
+    def refresh(self):
+        """Refresh changed sources and persist the result as the latest snapshot; returns the changes"""
+        changes = self.refresher.refresh()
+        self.source_timings = self.refresher.source_timings
+        self.last_changes = changes._asdict()
+        self.last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if changes.is_empty and self.leads:
+            self.publish()
+            return changes
+
+        self.leads = self.refresher.leads
+        self.ready.set()
+        self.publish()
+        try:
+            self.run_id = self.store.save_snapshot(self.collection, self.leads, self.source_timings)
+        except Exception as e:
+            print(f"[{datetime.now()}] Could not save opportunities: {e}")
+        return changes
+
+    def restore(self, run_id=None):
+        """Serve the last saved snapshot (or run_id's); returns its age in seconds, or None if there isn't one"""
+        try:
+            latest_run, saved = self.store.load_snapshot(self.collection, run_id)
+            if latest_run is None:
+                return None
+            source_timings = self.store.source_status(self.collection)
+        except Exception as e:
+            print(f"[{datetime.now()}] Could not load saved opportunities: {e}")
+            return None
+        self.leads = saved
+        self.source_timings = source_timings
+        self.refresher.seed(saved)
+        self.run_id = latest_run.id
+        self.last_update = latest_run.finished_at.replace(tzinfo=timezone.utc).astimezone().strftime("%Y-%m-%d %H:%M:%S")
+        self.ready.set()
+        self.publish()
+        print(f"Restored {len(saved)} opportunities saved at {self.last_update}")
+        return (datetime.utcnow() - latest_run.finished_at).total_seconds()
+
+    def run(self, first_wait):
+        """The updater loop: refresh while leading, otherwise follow the leader's snapshots"""
+        next_refresh = time.monotonic() + first_wait
+        while True:
+            try:
+                if self.leader.acquire():
+                    if time.monotonic() >= next_refresh:
+                        # Until the first scrape succeeds there is nothing to serve, so retry sooner
+                        next_refresh = time.monotonic() + (self.refresh_interval if self.ready.is_set()
+                                                           else WARMING_RETRY_INTERVAL)
+                        print(f"\n[{datetime.now()}] Updating real opportunities...")
+                        changes = self.refresh()
+                        next_refresh = time.monotonic() + self.refresh_interval
+                        print(f"[{datetime.now()}] Successfully updated {len(self.leads)} real opportunities "
+                              f"({changes.summary()})")
+                else:
+                    latest_run = self.store.latest_run(self.collection)
+                    if latest_run and latest_run.id != self.run_id:
+                        snapshot_age = self.restore(latest_run.id)
+                        if snapshot_age is not None:
+                            next_refresh = time.monotonic() + max(0, self.refresh_interval - snapshot_age)
+            except Exception as e:
+                print(f"[{datetime.now()}] Error updating opportunities: {e}")
+
+            time.sleep(FOLLOW_INTERVAL)
+
+    def start(self):
+        """
+        Load the saved snapshot and start the updater thread, once per
+        process (see OncePerProcess). Never scrapes itself: without a
+        snapshot the app starts empty ("warming") and the leader runs the
+        first scrape straight away.
+        """
+        self._start_once()
+
+    def _start(self):
+        print("Loading initial real opportunities...")
+        snapshot_age = self.restore()
+        if snapshot_age is None:
+            print("No saved opportunities yet - the first scrape runs in the background")
+            snapshot_age = self.refresh_interval
+        # The next refresh is due when the snapshot turns refresh_interval old
+        threading.Thread(target=self.run, args=(max(0, self.refresh_interval - snapshot_age),), daemon=True).start()
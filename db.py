@@ -11,8 +11,25 @@ POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 POSTGRES_DB = os.getenv("POSTGRES_DB")
 
-DATABASE_URL = f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+SQLITE_PATH = os.getenv("LEADGEN_SQLITE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "leadgen.db"))
 
-engine = create_engine(DATABASE_URL)
+if os.getenv("DATABASE_URL"):
+    DATABASE_URL = os.getenv("DATABASE_URL")
+elif POSTGRES_DB:
+    DATABASE_URL = f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+else:
+    # No Postgres configured - fall back to a local SQLite file for local runs
+    DATABASE_URL = f"sqlite:///{SQLITE_PATH}"
+
+if DATABASE_URL.startswith("sqlite"):
+    # The Flask apps write from background threads
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+else:
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if hasattr(os, "register_at_fork"):
+    # A forked worker (e.g. gunicorn --preload) must not share its parent's pooled
+    # connections; close=False leaves them open for the parent that still uses them
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
 Base = declarative_base() 
\ No newline at end of file
@@ -0,0 +1,382 @@
+import json
+import os
+import threading
+import uuid
+from datetime import date, datetime, timezone
+
+from sqlalchemy import delete, inspect, select, update
+
+from db import Base, SessionLocal, engine
+from models import Lead, RefreshJob, ScrapeRun, Source
+
+BATCH_SIZE = int(os.getenv("LEADGEN_DB_BATCH_SIZE", "500"))
+
+# Older SQLite builds allow at most 999 bound parameters per statement
+SQLITE_MAX_VARIABLES = 999
+
+# How often load_snapshot() re-reads when a newer run lands mid-read
+SNAPSHOT_READ_ATTEMPTS = 3
+
+# Successful runs (and their leads) kept per collection; older ones are pruned on save
+KEEP_RUNS = int(os.getenv("LEADGEN_KEEP_RUNS", "10"))
+
+
+def _insert(dialect_name):
+    """Dialect-specific INSERT that supports ON CONFLICT ... DO UPDATE, or None if there isn't one"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        # Other databases fall back to a row-by-row merge (see LeadStore._merge)
+        return None
+    return insert
+
+
+def _as_date(value):
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _as_json(record):
+    """Plain JSON copy of a record (datetimes and other oddities become strings)"""
+    return json.loads(json.dumps(record, default=str))
+
+
+def _timestamp(value):
+    return value.replace(tzinfo=timezone.utc).isoformat(timespec="seconds") if value else None
+
+
+def _refresh_job_dict(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "created_at": _timestamp(job.created_at),
+        "started_at": _timestamp(job.started_at),
+        "finished_at": _timestamp(job.finished_at),
+        "sources": dict(job.sources or {}),
+        "result": job.result,
+        "error": job.error
+    }
+
+
+class LeadStore:
+    """
+    Repository for leads, their sources and scrape runs.
+
+    Each refresh is saved with save_snapshot(): one ScrapeRun row, the
+    per-source timings, and every lead upserted in batches with
+    INSERT ... ON CONFLICT (collection, id) DO UPDATE - never row by row
+    (except on databases without ON CONFLICT, which get a plain merge).
+    Each save also prunes the runs older than the collection's `keep` most
+    recent successful ones, with the leads no newer run has taken over.
+    load_snapshot() returns the collection's latest completed run together
+    with its leads, so an app can restart from the last snapshot instead of
+    re-scraping.
+
+    Nothing touches the database until the store is first used, so an app
+    whose database is unreachable still imports and starts (empty); the
+    tables are created on first use, and retried on the next if that fails.
+    """
+
+    def __init__(self, bind=engine, session_factory=SessionLocal):
+        self.engine = bind
+        self.Session = session_factory
+        self.insert = _insert(bind.dialect.name)
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _ensure_schema(self):
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                Base.metadata.create_all(self.engine)
+                self._schema_ready = True
+
+    def _batches(self, rows, columns):
+        size = BATCH_SIZE
+        if self.engine.dialect.name == "sqlite":
+            size = max(1, min(size, SQLITE_MAX_VARIABLES // columns))
+        for start in range(0, len(rows), size):
+            yield rows[start:start + size]
+
+    def _lead_rows(self, collection, leads, run_id, now):
+        rows = []
+        seen_ids = set()
+        for position, lead in enumerate(leads):
+            # The first record wins if a refresh produced the same ID twice
+            if lead["id"] in seen_ids:
+                continue
+            seen_ids.add(lead["id"])
+            rows.append({
+                "collection": collection,
+                "id": lead["id"],
+                "title": lead.get("title") or lead.get("opportunity") or "",
+                "organization": lead.get("organization"),
+                "type": lead.get("type") or lead.get("organization_type"),
+                "tier": lead.get("tier"),
+                "deadline": lead.get("deadline"),
+                "deadline_date": _as_date(lead.get("deadline_date")),
+                "budget_min": lead.get("budget_min"),
+                "budget_max": lead.get("budget_max"),
+                "url": lead.get("url") or lead.get("source"),
+                "position": position,
+                "data": _as_json(lead),
+                "first_seen": now,
+                "last_seen": now,
+                "last_run_id": run_id
+            })
+        return rows
+
+    def _merge(self, session, model, rows, keep=()):
+        """Upsert one row at a time, leaving the `keep` columns of existing rows as they are"""
+        key_columns = [column.key for column in inspect(model).primary_key]
+        for row in rows:
+            existing = session.get(model, {column: row[column] for column in key_columns})
+            if existing is None:
+                session.add(model(**row))
+                continue
+            for column, value in row.items():
+                if column not in keep:
+                    setattr(existing, column, value)
+
+    def _upsert_leads(self, session, rows):
+        if not rows:
+            return
+        if self.insert is None:
+            self._merge(session, Lead, rows, keep=("first_seen",))
+            return
+        for batch in self._batches(rows, len(rows[0])):
+            stmt = self.insert(Lead).values(batch)
+            # Everything but the key and first_seen is refreshed from the new scrape
+            refreshed = {
+                column: getattr(stmt.excluded, column)
+                for column in batch[0] if column not in ("collection", "id", "first_seen")
+            }
+            session.execute(stmt.on_conflict_do_update(index_elements=["collection", "id"], set_=refreshed))
+
+    def _upsert_sources(self, session, collection, source_timings, run_id, now):
+        rows = [{
+            "collection": collection,
+            "name": name,
+            "last_status": timing.get("status"),
+            "last_count": timing.get("count"),
+            "last_seconds": timing.get("seconds"),
+            "last_run_id": run_id,
+            "updated_at": now
+        } for name, timing in source_timings.items()]
+        if not rows:
+            return
+        if self.insert is None:
+            self._merge(session, Source, rows)
+            return
+        for batch in self._batches(rows, len(rows[0])):
+            stmt = self.insert(Source).values(batch)
+            refreshed = {column: getattr(stmt.excluded, column) for column in batch[0]
+                         if column not in ("collection", "name")}
+            session.execute(stmt.on_conflict_do_update(index_elements=["collection", "name"], set_=refreshed))
+
+    def save_snapshot(self, collection, leads, source_timings=None, keep=KEEP_RUNS):
+        """Persist one refresh of a collection in a single transaction, then prune old runs; returns the run ID"""
+        self._ensure_schema()
+        now = datetime.utcnow()
+        with self.Session() as session:
+            run = ScrapeRun(collection=collection, started_at=now)
+            session.add(run)
+            session.flush()
+
+            rows = self._lead_rows(collection, leads, run.id, now)
+            self._upsert_leads(session, rows)
+            self._upsert_sources(session, collection, source_timings or {}, run.id, now)
+
+            run.status = "ok"
+            # The rows actually stored, so load_snapshot() can tell when it read all of them
+            run.lead_count = len(rows)
+            run.finished_at = datetime.utcnow()
+            self._prune_runs(session, collection, keep)
+            session.commit()
+            return run.id
+
+    def _prune_runs(self, session, collection, keep):
+        """
+        Delete runs (failed ones too) older than the `keep`th most recent
+        successful run, and the leads whose last run was one of them - those
+        no later run produced again.
+        """
+        oldest_kept = session.scalars(
+            select(ScrapeRun.id)
+            .where(ScrapeRun.collection == collection, ScrapeRun.status == "ok")
+            .order_by(ScrapeRun.id.desc())
+            .offset(max(keep, 1) - 1)
+            .limit(1)
+        ).first()
+        if oldest_kept is None:
+            return
+        session.execute(delete(Lead).where(Lead.collection == collection, Lead.last_run_id < oldest_kept))
+        session.execute(delete(ScrapeRun).where(ScrapeRun.collection == collection, ScrapeRun.id < oldest_kept))
+
+    def record_failed_run(self, collection, error):
+        """Note a refresh that produced nothing; the previous snapshot stays current"""
+        self._ensure_schema()
+        now = datetime.utcnow()
+        with self.Session() as session:
+            session.add(ScrapeRun(collection=collection, started_at=now, finished_at=now,
+                                  status="error", error=str(error)))
+            session.commit()
+
+    def _latest_run(self, session, collection):
+        return session.scalars(
+            select(ScrapeRun)
+            .where(ScrapeRun.collection == collection, ScrapeRun.status == "ok")
+            .order_by(ScrapeRun.id.desc())
+            .limit(1)
+        ).first()
+
+    def latest_run(self, collection):
+        """Most recent successful ScrapeRun of a collection, or None"""
+        self._ensure_schema()
+        with self.Session() as session:
+            return self._latest_run(session, collection)
+
+    def load_snapshot(self, collection, run_id=None):
+        """
+        (run, leads) for the run with run_id - or the latest successful run -
+        and its leads in the order they were scraped; (None, []) if there is none.
+
+        A lead belongs to the last run that saved it, so a run committed while
+        its predecessor is being read takes over the leads they share. The
+        leads read are checked against the run's lead_count and, if some were
+        taken over, the newest run is read instead, so the run returned always
+        matches the leads returned.
+        """
+        self._ensure_schema()
+        with self.Session() as session:
+            run = session.get(ScrapeRun, run_id) if run_id is not None else self._latest_run(session, collection)
+            leads = []
+            for _ in range(SNAPSHOT_READ_ATTEMPTS):
+                if run is None:
+                    return None, []
+                leads = list(session.scalars(
+                    select(Lead.data)
+                    .where(Lead.collection == collection, Lead.last_run_id == run.id)
+                    .order_by(Lead.position)
+                ))
+                if len(leads) == run.lead_count:
+                    break
+                session.expire_all()
+                newer = self._latest_run(session, collection)
+                if newer is None or newer.id == run.id:
+                    break  # an older run whose count can't be trusted; take what it has
+                run = newer
+            return run, leads
+
+    def load_leads(self, collection, run_id=None):
+        """Leads of the latest successful run (or of run_id), in the order they were scraped"""
+        return self.load_snapshot(collection, run_id)[1]
+
+    def source_status(self, collection):
+        """{source name: status/count/seconds} as of each source's latest run"""
+        self._ensure_schema()
+        with self.Session() as session:
+            return {
+                source.name: {
+                    "status": source.last_status,
+                    "count": source.last_count,
+                    "seconds": source.last_seconds,
+                    "updated_at": source.updated_at.strftime("%Y-%m-%d %H:%M:%S")
+                }
+                for source in session.scalars(select(Source).where(Source.collection == collection))
+            }
+
+    def submit_refresh(self, collection):
+        """
+        The collection's queued or running refresh job, or a newly queued one;
+        returns (job dict, created).
+        """
+        self._ensure_schema()
+        with self.Session() as session:
+            job = session.scalars(
+                select(RefreshJob)
+                .where(RefreshJob.collection == collection, RefreshJob.status.in_(("queued", "running")))
+                .order_by(RefreshJob.created_at)
+                .limit(1)
+            ).first()
+            created = job is None
+            if created:
+                job = RefreshJob(id=uuid.uuid4().hex, collection=collection, status="queued",
+                                 sources={}, created_at=datetime.utcnow())
+                session.add(job)
+                session.commit()
+            return _refresh_job_dict(job), created
+
+    def claim_refreshes(self, collection):
+        """
+        Mark every queued job of a collection as running and return their IDs.
+        Workers that queued at the same moment each get a job, and one run serves them all.
+        """
+        self._ensure_schema()
+        with self.Session() as session:
+            job_ids = list(session.scalars(
+                select(RefreshJob.id).where(RefreshJob.collection == collection, RefreshJob.status == "queued")
+            ))
+            if job_ids:
+                session.execute(update(RefreshJob).where(RefreshJob.id.in_(job_ids), RefreshJob.status == "queued")
+                                .values(status="running", started_at=datetime.utcnow()))
+                session.commit()
+            return job_ids
+
+    def report_refresh(self, job_ids, sources):
+        """Save the per-source progress of running jobs"""
+        self._ensure_schema()
+        with self.Session() as session:
+            session.execute(update(RefreshJob).where(RefreshJob.id.in_(job_ids)).values(sources=sources))
+            session.commit()
+
+    def finish_refresh(self, collection, job_ids, keep, status, result=None, error=None):
+        """Record how jobs ended, keeping only the collection's `keep` most recent finished jobs"""
+        self._ensure_schema()
+        with self.Session() as session:
+            session.execute(update(RefreshJob).where(RefreshJob.id.in_(job_ids))
+                            .values(status=status, result=result, error=error, finished_at=datetime.utcnow()))
+            expired = select(RefreshJob.id).where(
+                RefreshJob.collection == collection, RefreshJob.status.in_(("succeeded", "failed"))
+            ).order_by(RefreshJob.created_at.desc()).offset(keep)
+            session.execute(delete(RefreshJob).where(RefreshJob.id.in_(list(session.scalars(expired)))))
+            session.commit()
+
+    def fail_running_refreshes(self, collection, error):
+        """Fail jobs left running by a leader that stopped; returns how many there were"""
+        self._ensure_schema()
+        with self.Session() as session:
+            failed = session.execute(
+                update(RefreshJob)
+                .where(RefreshJob.collection == collection, RefreshJob.status == "running")
+                .values(status="failed", error=error, finished_at=datetime.utcnow())
+            ).rowcount
+            session.commit()
+            return failed
+
+    def refresh_job(self, job_id):
+        """A refresh job as a dict, or None if there is no such job"""
+        self._ensure_schema()
+        with self.Session() as session:
+            job = session.get(RefreshJob, job_id)
+            return _refresh_job_dict(job) if job is not None else None
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_shared_store():
+    """Return the process-wide LeadStore (its tables are created when it is first used)"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = LeadStore()
+        return _shared_store
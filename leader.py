@@ -0,0 +1,140 @@
+import hashlib
+import os
+import threading
+import weakref
+
+from sqlalchemy import text
+
+from db import SQLITE_PATH, engine
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Lock files sit next to the SQLite database unless pointed elsewhere
+LOCK_DIR = os.getenv("LEADGEN_LOCK_DIR", os.path.dirname(SQLITE_PATH))
+
+
+# Every LeaderLock in this process, so a forked child can give up what it inherited
+_locks = weakref.WeakSet()
+# Inherited advisory-lock connections: closing them in a child would end the parent's session
+_inherited_connections = []
+
+
+def _forget_inherited_leadership():
+    for lock in list(_locks):
+        lock._forget()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_inherited_leadership)
+
+
+def _advisory_key(name):
+    """Signed 64-bit key for pg_try_advisory_lock derived from the lock name"""
+    return int.from_bytes(hashlib.sha1(name.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+class LeaderLock:
+    """
+    Elects one process, out of every worker sharing the lead store, to scrape.
+
+    On Postgres this is a session-level advisory lock, held on a dedicated
+    connection, so it works across hosts. Otherwise it is an exclusive lock
+    on a file in LEADGEN_LOCK_DIR, which all workers on one host share.
+    Either way the OS or database drops the lock when the leader's process
+    dies, and the next worker to call acquire() takes over. A process
+    forked from the leader does not inherit its leadership.
+    """
+
+    def __init__(self, name, bind=engine):
+        self.name = name
+        self.bind = bind
+        self._connection = None
+        self._file = None
+        self._lock = threading.Lock()
+        _locks.add(self)
+
+    @property
+    def is_leader(self):
+        return self._connection is not None or self._file is not None
+
+    def acquire(self):
+        """Become (or stay) the leader if no other process is; never blocks"""
+        with self._lock:
+            if self.bind.dialect.name == "postgresql":
+                return self._acquire_advisory()
+            return self._acquire_file()
+
+    def _acquire_advisory(self):
+        if self._connection is not None:
+            try:
+                # The lock lives as long as this connection does
+                self._connection.execute(text("SELECT 1"))
+                self._connection.commit()
+                return True
+            except Exception:
+                self._close_connection()
+        connection = self.bind.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"),
+                                          {"key": _advisory_key(self.name)}).scalar()
+            # Session-level advisory locks outlive the transaction; don't sit idle inside one
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if acquired:
+            self._connection = connection
+        else:
+            connection.close()
+        return bool(acquired)
+
+    def _close_connection(self):
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+    def _acquire_file(self):
+        if self._file is not None:
+            return True
+        handle = open(os.path.join(LOCK_DIR, f"leadgen-{self.name}.lock"), "a+")
+        try:
+            if fcntl:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            handle.close()
+            return False
+        self._file = handle
+        return True
+
+    def _forget(self):
+        """In a forked child: leave the parent's lock to the parent and start over as a non-leader"""
+        self._lock = threading.Lock()
+        if self._connection is not None:
+            _inherited_connections.append(self._connection)
+            self._connection = None
+        if self._file is not None:
+            # The parent's copy of the descriptor keeps the lock held
+            self._file.close()
+            self._file = None
+
+    def release(self):
+        with self._lock:
+            if self._connection is not None:
+                try:
+                    self._connection.execute(text("SELECT pg_advisory_unlock(:key)"),
+                                             {"key": _advisory_key(self.name)})
+                finally:
+                    self._close_connection()
+            if self._file is not None:
+                # Closing the file releases the lock
+                self._file.close()
+                self._file = None
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, Date, DateTime, Float, Index, Integer, JSON, String, Text
+
+from db import Base
+
+
+class Lead(Base):
+    """
+    One lead in one collection ('enhanced', 'public_sector', 'ai_generated', ...).
+
+    The full display record is kept in `data`; the columns alongside it are
+    the fields the apps filter and sort on. `last_run_id` points at the most
+    recent ScrapeRun that produced the lead, so the current set of a
+    collection is the leads of its latest run.
+    """
+    __tablename__ = "leads"
+
+    collection = Column(String(50), primary_key=True)
+    id = Column(String(100), primary_key=True)
+    title = Column(Text, nullable=False)
+    organization = Column(String(300))
+    type = Column(String(100))
+    tier = Column(String(100))
+    deadline = Column(String(200))
+    deadline_date = Column(Date)
+    budget_min = Column(BigInteger)
+    budget_max = Column(BigInteger)
+    url = Column(Text)
+    position = Column(Integer, nullable=False, default=0)
+    data = Column(JSON, nullable=False)
+    first_seen = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_seen = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_run_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_leads_collection_run", "collection", "last_run_id"),
+        Index("ix_leads_deadline_date", "deadline_date"),
+        Index("ix_leads_type", "type"),
+        Index("ix_leads_tier", "tier"),
+        Index("ix_leads_organization", "organization"),
+    )
+
+
+class Source(Base):
+    """Health of one scraper source as of its latest run"""
+    __tablename__ = "sources"
+
+    collection = Column(String(50), primary_key=True)
+    name = Column(String(200), primary_key=True)
+    last_status = Column(String(20))
+    last_count = Column(Integer)
+    last_seconds = Column(Float)
+    last_run_id = Column(Integer)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ScrapeRun(Base):
+    """One refresh of a collection"""
+    __tablename__ = "scrape_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    collection = Column(String(50), nullable=False, index=True)
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+    status = Column(String(20), nullable=False, default="running")
+    lead_count = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+
+
+class RefreshJob(Base):
+    """
+    One requested refresh of a collection, shared by every worker.
+
+    Any worker queues jobs; only the leader runs them, moving status from
+    'queued' to 'running' to 'succeeded' or 'failed'. `sources` holds the
+    progress of each source ({'status': ..., 'leads': n, 'error': ...}).
+    """
+    __tablename__ = "refresh_jobs"
+
+    id = Column(String(32), primary_key=True)
+    collection = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")
+    sources = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_refresh_jobs_collection_status", "collection", "status"),
+    )
@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app modules import each other as top-level modules, and db.py, the lead
+# store and the leader lock live at the repository root. app/ goes first so
+# app/main.py is the main module rather than the root FastAPI stub.
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'app'))
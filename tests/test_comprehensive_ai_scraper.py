@@ -0,0 +1,25 @@
+from datetime import date
+
+from comprehensive_ai_scraper import ComprehensiveAILeadGenerator, shift_generated_dates
+
+
+def test_saved_leads_keep_their_distance_from_the_deadline():
+    lead = {'id': 'x', 'deadline': '2026-02-14', 'deadline_date': '2026-02-14', 'date_found': '2026-01-15',
+            'tier': 'Tier 1 - Urgent'}
+    shifted = shift_generated_dates([lead], generated_on=date(2026, 1, 15), today=date(2026, 3, 1))[0]
+
+    assert shifted['deadline'] == shifted['deadline_date'] == '2026-03-31'
+    assert shifted['date_found'] == '2026-03-01'
+    assert shifted['tier'] == lead['tier']
+    assert lead['deadline'] == '2026-02-14'  # the saved record is left alone
+
+
+def test_leads_generated_today_are_unchanged():
+    leads = [{'id': 'x', 'deadline': '2026-02-14'}]
+    assert shift_generated_dates(leads, date(2026, 1, 15), today=date(2026, 1, 15)) is leads
+
+
+def test_generated_deadlines_are_in_the_future():
+    leads = ComprehensiveAILeadGenerator().generate_all_opportunities()
+    today = date.today().isoformat()
+    assert leads and all(lead['deadline_date'] > today for lead in leads)
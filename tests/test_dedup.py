@@ -0,0 +1,100 @@
+import random
+
+from dedup import MinHasher, NearDuplicateClusterer, StreamingDeduplicator, shingles, unique_records
+
+
+def _titles(records, clusters):
+    return sorted(sorted(records[i]['title'] for i in cluster) for cluster in clusters)
+
+
+def test_near_duplicate_titles_merge_and_keep_every_source():
+    records = [
+        {'title': 'Cybersecurity Awareness Training for Public Servants', 'source': 'CanadaBuys', 'url': 'https://a'},
+        {'title': 'Cyber-security awareness training for public servants.', 'source': 'MERX', 'url': 'https://b'},
+        {'title': 'CYBERSECURITY AWARENESS TRAINING FOR PUBLIC SERVANTS', 'source': 'Ontario', 'url': 'https://c'},
+        {'title': 'Leadership Development Program for Managers', 'source': 'MERX', 'url': 'https://d'},
+    ]
+    merged = NearDuplicateClusterer().merge(records)
+
+    assert [record['title'] for record in merged] == [records[0]['title'], records[3]['title']]
+    assert [source['source'] for source in merged[0]['sources']] == ['CanadaBuys', 'MERX', 'Ontario']
+    assert merged[1]['sources'] == [{'source': 'MERX', 'url': 'https://d'}]
+
+
+def test_titles_differing_only_in_amounts_or_years_stay_separate():
+    records = [
+        {'title': 'Professional Development Grant 2024 - Lot 1'},
+        {'title': 'Professional Development Grant 2025 - Lot 1'},
+        {'title': 'Professional Development Grant 2025 - Lot 2'},
+        {'title': 'Training services contract valued at $50,000'},
+        {'title': 'Training services contract valued at $75,000'},
+    ]
+    clusters = NearDuplicateClusterer().clusters(records)
+    assert len(clusters) == len(records)
+
+
+def test_a_title_without_numbers_joins_at_most_one_numbered_variant():
+    records = [
+        {'title': 'Digital Skills Training Initiative 2024'},
+        {'title': 'Digital Skills Training Initiative'},
+        {'title': 'Digital Skills Training Initiative 2025'},
+    ]
+    clusters = NearDuplicateClusterer().clusters(records)
+    assert len(clusters) == 2
+    assert sorted(map(len, clusters)) == [1, 2]
+
+
+def test_clusters_are_the_same_whatever_the_input_order():
+    records = [
+        {'title': 'Digital Skills Training Initiative 2024'},
+        {'title': 'Digital Skills Training Initiative'},
+        {'title': 'Digital Skills Training Initiative 2025'},
+        {'title': 'Cybersecurity Awareness Training for Public Servants'},
+        {'title': 'Cyber security awareness training for public servants'},
+        {'title': 'Leadership Development Program for Managers'},
+        {'title': 'Leadership development programme for managers'},
+        {'title': 'Emergency Management Training - Phase 2'},
+        {'title': 'Emergency Management Training - Phase 3'},
+        {'title': ''},
+    ]
+    clusterer = NearDuplicateClusterer()
+    expected = _titles(records, clusterer.clusters(records))
+    rng = random.Random(11)
+    for _ in range(25):
+        shuffled = records[:]
+        rng.shuffle(shuffled)
+        assert _titles(shuffled, clusterer.clusters(shuffled)) == expected
+
+
+def test_clusters_list_members_in_input_order():
+    records = [{'title': 'Leadership Development Program'}, {'title': 'Other'},
+               {'title': 'Leadership development program.'}]
+    assert sorted(NearDuplicateClusterer().clusters(records)) == [[0, 2], [1]]
+
+
+def test_minhash_signatures_are_dense_and_estimate_jaccard():
+    hasher = MinHasher(num_perm=64)
+    short = shingles('Cloud training')  # far fewer shingles than bins: most bins are borrowed
+    assert len(short) < 64
+    signature = hasher.signature(short)
+    assert len(signature) == 64 and None not in signature
+    assert hasher.signature(set(short)) == signature
+
+    a = shingles('Indigenous capacity building and governance training program for First Nations staff')
+    b = shingles('Indigenous capacity building and governance training programme for First Nation staff')
+    exact = len(a & b) / len(a | b)
+    sig_a, sig_b = MinHasher(num_perm=256).signature(a), MinHasher(num_perm=256).signature(b)
+    estimate = sum(x == y for x, y in zip(sig_a, sig_b)) / 256
+    assert abs(estimate - exact) < 0.15
+
+
+def test_streaming_deduplicator_folds_case_accents_and_spaces():
+    records = [
+        {'organization': 'Ville de Québec', 'opportunity': 'Formation  en gestion'},
+        {'organization': 'VILLE DE QUEBEC', 'opportunity': 'formation en gestion'},
+        {'organization': 'Ville de Québec', 'opportunity': 'Formation en sécurité'},
+    ]
+    assert unique_records(records) == [records[0], records[2]]
+    deduplicator = StreamingDeduplicator()
+    assert [deduplicator.add(record) for record in records] == [True, False, True]
+    assert len(deduplicator) == 2
@@ -0,0 +1,55 @@
+import time
+
+from enhanced_real_scraper import EnhancedRealOpportunityScraper
+
+
+class SleepyScraper(EnhancedRealOpportunityScraper):
+    SOURCES = ['quick_1', 'quick_2', 'quick_3', 'quick_4', 'quick_5', 'stuck']
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, **kwargs):
+        super().__init__(http=object(), **kwargs)
+
+    def _sleep(self, seconds, title):
+        time.sleep(seconds)
+        self.opportunities.append({'title': title})
+
+    def quick_1(self):
+        self._sleep(0.2, 'one')
+
+    def quick_2(self):
+        self._sleep(0.2, 'two')
+
+    def quick_3(self):
+        self._sleep(0.2, 'three')
+
+    def quick_4(self):
+        self._sleep(0.2, 'four')
+
+    def quick_5(self):
+        raise RuntimeError('source is down')
+
+    def stuck(self):
+        self._sleep(1.5, 'too late')
+
+
+def test_timeout_is_counted_from_when_each_source_starts():
+    # Three sources on two workers: the last one starts ~0.2s after submission,
+    # so a timeout counted from submission would cut it off at 0.3s
+    scraper = SleepyScraper(max_workers=2, source_timeout=0.3)
+    results = scraper.collect_sources(concurrent=True)
+
+    for name in ('quick_1', 'quick_2', 'quick_3', 'quick_4'):
+        assert scraper.source_timings[name]['status'] == 'ok'
+        assert len(results[name]) == 1
+    assert scraper.source_timings['quick_5']['status'] == 'error'
+    assert scraper.source_timings['stuck'] == {'seconds': 0.3, 'status': 'timeout', 'count': 0}
+    assert results['stuck'] == []
+
+
+def test_sequential_run_collects_every_source():
+    scraper = SleepyScraper()
+    scraper.SOURCES = ['quick_1', 'quick_5']
+    results = scraper.collect_sources()
+    assert results['quick_1'] == [{'title': 'one'}]
+    assert scraper.source_timings['quick_5']['status'] == 'error'
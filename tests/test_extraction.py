@@ -0,0 +1,41 @@
+import pytest
+
+from extraction import parse_budget
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('$1-5M', (1_000_000, 5_000_000)),
+    ('$1M-5M', (1_000_000, 5_000_000)),
+    ('$1.5-2.5 million', (1_500_000, 2_500_000)),
+    ('$1 - 5 million', (1_000_000, 5_000_000)),
+    ('between $2 and $3 million', (2_000_000, 3_000_000)),
+    ('$100-$500K', (100_000, 500_000)),
+    ('$500K - $1M', (500_000, 1_000_000)),
+    ('$10,000 - $50,000', (10_000, 50_000)),
+])
+def test_ranges_apply_the_trailing_unit_to_a_bare_lower_bound(text, expected):
+    assert parse_budget(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('$28,000', (28_000, 28_000)),
+    ('Up to $1.5 million', (None, 1_500_000)),
+    ('multi-million', (1_000_000, None)),
+    ('TBD', (None, None)),
+    ('', (None, None)),
+    # A year next to an amount is not a range
+    ('FY 2025 - 5 million', (5_000_000, 5_000_000)),
+    ('2025-2026 program $50,000', (50_000, 50_000)),
+    # The upper bound's unit only carries over when it keeps the range in order
+    ('$500-2K', (500, 2_000)),
+    # Joined by a word, a bare number after an amount is a count, not an upper bound
+    ('$50,000 and 200 employees', (50_000, 50_000)),
+    ('$5M to 10 participants', (5_000_000, 5_000_000)),
+    ('$2 to $3 million', (2_000_000, 3_000_000)),
+    ('$1.5 to 2.5 million', (1_500_000, 2_500_000)),
+    # A "range" that runs backwards is two separate figures
+    ('$5M - 10', (5_000_000, 5_000_000)),
+    ('$2M - $500K', (500_000, 2_000_000)),
+])
+def test_single_amounts_and_non_ranges(text, expected):
+    assert parse_budget(text) == expected
@@ -0,0 +1,188 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from fetch_policy import CircuitBreaker, CircuitOpenError, FetchPolicy, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+
+def _responses(*statuses):
+    """A send() returning a response per status in turn (exceptions are raised)"""
+    calls = []
+    pending = list(statuses)
+
+    def send():
+        calls.append(len(calls) + 1)
+        status = pending.pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return SimpleNamespace(status_code=status)
+    send.calls = calls
+    return send
+
+
+def _policy(clock, attempts=3, **kwargs):
+    return FetchPolicy(RetryPolicy(max_attempts=attempts, base_delay=1, max_delay=4),
+                       clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep, **kwargs)
+
+
+def test_breaker_opens_after_threshold_consecutive_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker('MERX', failure_threshold=3, cooldown=60, clock=clock)
+
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.status() == {'state': 'open', 'failures': 3}
+    assert not breaker.allow()
+    clock.now += 59
+    assert not breaker.allow()
+
+
+def test_a_success_resets_the_failure_count():
+    breaker = CircuitBreaker('MERX', failure_threshold=3, clock=FakeClock())
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.allow()
+    assert breaker.status() == {'state': 'closed', 'failures': 2}
+
+
+def test_half_open_lets_exactly_one_trial_through_after_the_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker('MERX', failure_threshold=1, cooldown=60, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 60
+    assert breaker.allow()
+    assert breaker.state == 'half-open'
+    assert not breaker.allow()
+    assert not breaker.allow()
+
+
+def test_half_open_trial_success_closes_and_failure_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker('MERX', failure_threshold=2, cooldown=60, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.allow()
+
+    # A failed trial reopens at once (below the threshold) and restarts the cooldown
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now += 30
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.status() == {'state': 'closed', 'failures': 0}
+    assert breaker.allow() and breaker.allow()
+
+
+def test_retries_retryable_statuses_with_bounded_backoff():
+    clock = FakeClock()
+    send = _responses(503, 429, 200)
+
+    response = _policy(clock).call('MERX', send)
+
+    assert response.status_code == 200
+    assert len(send.calls) == 3
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 1 and 0 <= clock.sleeps[1] <= 2
+
+
+@pytest.mark.parametrize('status', [200, 301, 400, 403, 404, 410])
+def test_non_retryable_statuses_are_returned_without_retrying(status):
+    clock = FakeClock()
+    policy = _policy(clock)
+    send = _responses(status, 200)
+
+    assert policy.call('MERX', send).status_code == status
+    assert len(send.calls) == 1
+    assert clock.sleeps == []
+    assert policy.status() == {'MERX': {'state': 'closed', 'failures': 0}}
+
+
+def test_gives_up_after_max_attempts_and_counts_one_failure():
+    clock = FakeClock()
+    policy = _policy(clock)
+    send = _responses(503, 503, 503)
+
+    assert policy.call('MERX', send).status_code == 503
+    assert len(send.calls) == 3
+    assert len(clock.sleeps) == 2
+    assert policy.status() == {'MERX': {'state': 'closed', 'failures': 1}}
+
+
+def test_errors_should_retry_rejects_are_raised_at_once():
+    clock = FakeClock()
+    policy = _policy(clock)
+    send = _responses(requests.Timeout('slow'), 200)
+
+    with pytest.raises(requests.Timeout):
+        policy.call('MERX', send, should_retry=lambda error: not isinstance(error, requests.Timeout))
+    assert len(send.calls) == 1
+    assert clock.sleeps == []
+
+    send = _responses(requests.ConnectionError('reset'), 200)
+    assert policy.call('MERX', send).status_code == 200
+    assert len(send.calls) == 2
+
+
+def test_open_circuit_refuses_calls_until_the_cooldown_then_recovers():
+    clock = FakeClock()
+    policy = _policy(clock, attempts=1, failure_threshold=2, cooldown=300)
+    for _ in range(2):
+        policy.call('MERX', _responses(500))
+
+    send = _responses(200, 200)
+    with pytest.raises(CircuitOpenError):
+        policy.call('MERX', send)
+    assert send.calls == []
+    # Other sources are unaffected
+    assert policy.call('CanadaBuys', _responses(200)).status_code == 200
+
+    clock.now += 300
+    assert policy.call('MERX', send).status_code == 200
+    assert policy.status()['MERX'] == {'state': 'closed', 'failures': 0}
+
+
+def test_call_async_retries_and_opens_the_same_way():
+    clock = FakeClock()
+    policy = _policy(clock, failure_threshold=1)
+    send = _responses(502, 404, 500, 500, 500)
+
+    async def send_async():
+        return send()
+
+    assert asyncio.run(policy.call_async('MERX', send_async)).status_code == 404
+    assert len(clock.sleeps) == 1
+    assert asyncio.run(policy.call_async('MERX', send_async)).status_code == 500
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(policy.call_async('MERX', send_async))
+    assert len(send.calls) == 5
@@ -0,0 +1,112 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import benchmark_scrapers
+from fetch_recorder import FetchArchive
+from http_client import HTTPClient
+
+PAGES = {
+    '/tenders?page=1&lang=en': (200, 'text/html; charset=utf-8', 'Formation en équité – Québec'.encode('utf-8')),
+    '/feed.xml': (200, 'application/rss+xml', b'<rss><channel><item>Training</item></channel></rss>'),
+    '/report.pdf': (200, 'application/pdf', bytes(range(256)) * 4),
+    '/gone': (404, 'text/plain', b'not here'),
+}
+
+
+class Portal(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, content_type, body = PAGES[self.path]
+        wire_body = body
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('X-Portal', 'test')
+        if self.path == '/feed.xml':
+            # Sent compressed, so the archive must store the decoded bytes
+            wire_body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(wire_body)))
+        self.end_headers()
+        self.wfile.write(wire_body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _record(archive):
+    """Record every page from a local portal, shut it down, and return (base URL, responses)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Portal)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+    client = HTTPClient(mode='record', archive=archive)
+    try:
+        return base, {path: client.get(base + path, timeout=5) for path in PAGES}
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def _stored_headers(response):
+    return {key: value for key, value in response.headers.items()
+            if key.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')}
+
+
+def test_replay_reproduces_a_recorded_session_byte_for_byte(tmp_path):
+    archive = FetchArchive(str(tmp_path))
+    portal, recorded = _record(archive)
+    assert len(archive) == len(PAGES)
+
+    # The portal is gone, so everything below comes from the archive
+    replay = HTTPClient(mode='replay', archive=FetchArchive(str(tmp_path)))
+    for path, original in recorded.items():
+        replayed = replay.get(portal + path)
+        assert replayed.content == original.content == PAGES[path][2], path
+        assert replayed.status_code == original.status_code
+        assert replayed.reason == original.reason
+        assert replayed.text == original.text
+        assert dict(replayed.headers) == _stored_headers(original)
+        assert replayed.url == original.url
+
+
+def test_replaying_an_unrecorded_request_raises(tmp_path):
+    archive = FetchArchive(str(tmp_path))
+    portal, _ = _record(archive)
+    replay = HTTPClient(mode='replay', archive=archive)
+
+    for url in (portal + '/tenders?page=2&lang=en', portal + '/never', 'https://example.com/feed.xml'):
+        with pytest.raises(requests.ConnectionError, match='No recording for GET'):
+            replay.get(url)
+    with pytest.raises(requests.ConnectionError):
+        replay.request('POST', portal + '/feed.xml')
+
+
+class FeedScraper:
+    """Minimal scraper in the benchmark's shape: everything it fetches was recorded"""
+
+    base = None
+
+    def __init__(self, http):
+        self.http = http
+
+    def run(self):
+        response = self.http.get(self.base + '/feed.xml')
+        return response.text.count('<item>') * ['lead']
+
+
+def test_benchmark_replays_the_archive(tmp_path, monkeypatch, capsys):
+    archive = FetchArchive(str(tmp_path))
+    portal, _ = _record(archive)
+    monkeypatch.setattr(FeedScraper, 'base', portal)
+    monkeypatch.setattr(benchmark_scrapers, 'SCRAPERS', {'feed': (FeedScraper, FeedScraper.run)})
+
+    benchmark_scrapers.replay(archive, iterations=2, latency=0)
+
+    assert '1 results' in capsys.readouterr().out
+
+    monkeypatch.setattr(FeedScraper, 'base', portal + '/elsewhere')
+    with pytest.raises(requests.ConnectionError):
+        benchmark_scrapers.replay(archive, iterations=1, latency=0)
@@ -0,0 +1,123 @@
+import requests
+
+import http_cache
+from http_cache import ResponseCache, parser_key
+
+
+def _response(body=b'<rss/>', etag='"v1"'):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['ETag'] = etag
+    response._content = body
+    return response
+
+
+class FirstScraper:
+    def parse(self, response):
+        return ['first']
+
+
+class SecondScraper:
+    def parse(self, response):
+        return ['second']
+
+
+def test_parsed_output_is_kept_per_parser(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    url = 'https://example.com/feed.xml'
+    entry = cache.store(url, _response())
+    first, second = parser_key(FirstScraper().parse), parser_key(SecondScraper().parse)
+
+    cache.store_parsed(url, entry, first, ['first'])
+    cache.store_parsed(url, entry, second, ['second'])
+
+    assert cache.load_parsed(url, entry, first) == ['first']
+    assert cache.load_parsed(url, entry, second) == ['second']
+
+
+def test_parsed_output_from_another_parser_is_not_reused(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    url = 'https://example.com/feed.xml'
+    entry = cache.store(url, _response())
+    cache.store_parsed(url, entry, parser_key(FirstScraper().parse), ['first'])
+
+    assert cache.load_parsed(url, entry, parser_key(SecondScraper().parse)) is None
+
+
+def test_lambdas_in_different_classes_have_different_keys():
+    class A:
+        def parser(self):
+            return lambda response: 'a'
+
+    class B:
+        def parser(self):
+            return lambda response: 'b'
+
+    assert parser_key(A().parser()) != parser_key(B().parser())
+
+
+def test_parser_version_invalidates_parsed_output(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    url = 'https://example.com/feed.xml'
+    entry = cache.store(url, _response())
+    parse = FirstScraper().parse
+    cache.store_parsed(url, entry, parser_key(parse), ['old'])
+
+    monkeypatch.setattr(http_cache, 'PARSER_VERSION', http_cache.PARSER_VERSION + 1)
+    assert cache.load_parsed(url, entry, parser_key(parse)) is None
+
+
+def test_parsed_output_is_dropped_when_the_validator_changes(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    url = 'https://example.com/feed.xml'
+    parser = parser_key(FirstScraper().parse)
+    entry = cache.store(url, _response(etag='"v1"'))
+    cache.store_parsed(url, entry, parser, ['first'])
+
+    entry = cache.store(url, _response(body=b'<rss>new</rss>', etag='"v2"'))
+    assert cache.load_parsed(url, entry, parser) is None
+
+
+def test_responses_without_validators_are_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    response = _response()
+    del response.headers['ETag']
+    assert cache.store('https://example.com/', response) is None
+    assert cache.conditional_headers(None) == {}
+
+
+def test_two_scrapers_on_one_feed_each_get_their_own_output_after_a_304(tmp_path):
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    from http_client import HTTPClient
+
+    class Feed(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = b'<rss/>'
+            self.send_response(200)
+            self.send_header('ETag', '"v1"')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Feed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f'http://127.0.0.1:{server.server_port}/rss'
+        client = HTTPClient(cache=ResponseCache(str(tmp_path)))
+        first, second = FirstScraper(), SecondScraper()
+
+        assert client.get_parsed(url, first.parse) == ['first']
+        assert client.get_parsed(url, second.parse) == ['second']  # 304, but not first's output
+        assert client.get_parsed(url, first.parse) == ['first']
+        assert client.cache_counts['not_modified'] == 2
+    finally:
+        server.shutdown()
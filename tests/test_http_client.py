@@ -0,0 +1,97 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from fetch_recorder import FetchArchive
+from http_cache import ResponseCache
+from http_client import HTTPClient
+
+
+class KeepAlive(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'<rss/>'
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servers():
+    started = [ThreadingHTTPServer(('127.0.0.1', 0), KeepAlive) for _ in range(2)]
+    for server in started:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield [f'http://127.0.0.1:{server.server_port}' for server in started]
+    for server in started:
+        server.shutdown()
+        server.server_close()
+
+
+def test_connection_stats_count_opened_and_reused_connections_per_pool(servers):
+    client = HTTPClient()
+    try:
+        for _ in range(3):
+            client.get(servers[0] + '/feed', timeout=5)
+        client.get(servers[1] + '/feed', timeout=5)
+        stats = client.connection_stats()
+    finally:
+        client.close()
+
+    assert stats['opened'] == 2
+    assert stats['reused'] == 2
+    assert stats['requests'] == 4
+    assert stats['hosts'] == {'127.0.0.1': {'opened': 2, 'reused': 2, 'requests': 4}}
+
+
+def test_connection_stats_leave_the_pool_eviction_order_alone(servers):
+    client = HTTPClient()
+    try:
+        for base in servers:
+            client.get(base + '/feed', timeout=5)
+        pools = client.adapter.poolmanager.pools
+        order = pools.keys()
+
+        client.connection_stats()
+
+        assert pools.keys() == order
+    finally:
+        client.close()
+
+
+def test_connection_stats_without_a_pool_manager(tmp_path):
+    client = HTTPClient(mode='replay', archive=FetchArchive(str(tmp_path)))
+
+    assert client.connection_stats() == {'opened': 0, 'reused': 0, 'requests': 0, 'hosts': {}}
+
+
+def _parse(response):
+    return ['lead']
+
+
+def test_cache_counts_are_exact_under_concurrent_fetches(servers, tmp_path):
+    client = HTTPClient(cache=ResponseCache(str(tmp_path)), pool_maxsize=8)
+    urls = [f'{servers[0]}/feed/{i}' for i in range(20)]
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            # Every URL is downloaded once, then each revalidation is a 304 answered from the parse cache
+            list(executor.map(lambda url: client.get_parsed(url, _parse, timeout=5), urls))
+            results = list(executor.map(lambda url: client.get_parsed(url, _parse, timeout=5), urls * 4))
+    finally:
+        client.close()
+
+    assert results == [['lead']] * 80
+    assert client.cache_counts == {'not_modified': 80, 'parse_skipped': 80, 'fetched': 20}
@@ -0,0 +1,113 @@
+from incremental import MAX_EMPTY_IGNORED, IncrementalRefresher
+
+
+class FakeScraper:
+    """Two sources whose next results (or failures) are set by the test"""
+
+    SOURCES = ['search_rss', 'search_news']
+
+    def __init__(self):
+        self.results = {}
+        self.failing = set()
+        self.source_timings = {}
+
+    def collect_sources(self, concurrent=False):
+        self.source_timings = {
+            name: {'status': 'error' if name in self.failing else 'ok', 'count': len(self.results.get(name, []))}
+            for name in self.SOURCES
+        }
+        return {name: list(entries) for name, entries in self.results.items() if name not in self.failing}
+
+    def merge_sources(self, results):
+        return [entry for name in self.SOURCES for entry in results.get(name, [])]
+
+    def format_opportunity_for_display(self, entry):
+        return {'id': entry['url'], 'title': entry['title']}
+
+
+def _entry(name):
+    return {'url': f"https://example.ca/{name}", 'title': name.title()}
+
+
+def _refresher():
+    scraper = FakeScraper()
+    scraper.results = {'search_rss': [_entry('rss-a'), _entry('rss-b')], 'search_news': [_entry('news-a')]}
+    return IncrementalRefresher(scraper), scraper
+
+
+def _ids(refresher):
+    return [lead['id'] for lead in refresher.leads]
+
+
+def test_a_failing_source_keeps_its_leads():
+    refresher, scraper = _refresher()
+    refresher.refresh()
+    scraper.failing = {'search_news'}
+    scraper.results['search_rss'].append(_entry('rss-c'))
+
+    changes = refresher.refresh()
+    assert changes.failed_sources == ['search_news']
+    assert changes.removed == []
+    assert 'https://example.ca/news-a' in _ids(refresher)
+
+
+def test_a_source_failing_after_seed_keeps_its_saved_leads():
+    saved, scraper = _refresher()
+    saved.refresh()
+
+    # A new leader starts from the saved snapshot; one source then fails and the other changes
+    refresher = IncrementalRefresher(scraper)
+    refresher.seed(saved.leads)
+    scraper.failing = {'search_news'}
+    scraper.results['search_rss'] = [_entry('rss-a'), _entry('rss-c')]
+
+    changes = refresher.refresh()
+    assert changes.inserted == ['https://example.ca/rss-c']
+    # rss-b can't be told apart from news-a's saved leads until search_news answers, so both stay
+    assert changes.removed == []
+    assert set(_ids(refresher)) == {f"https://example.ca/{name}" for name in ('rss-a', 'rss-b', 'rss-c', 'news-a')}
+
+    # Once every source has answered, leads no source returned are removed
+    scraper.failing = set()
+    changes = refresher.refresh()
+    assert changes.removed == ['https://example.ca/rss-b']
+    assert _ids(refresher) == ['https://example.ca/rss-a', 'https://example.ca/rss-c', 'https://example.ca/news-a']
+
+
+def test_an_unchanged_refresh_after_seed_reports_nothing():
+    saved, scraper = _refresher()
+    saved.refresh()
+    refresher = IncrementalRefresher(scraper)
+    refresher.seed(saved.leads)
+    changes = refresher.refresh()
+    assert changes.is_empty
+    assert refresher.leads == saved.leads
+
+
+def test_an_empty_result_is_believed_after_a_few_refreshes():
+    refresher, scraper = _refresher()
+    refresher.refresh()
+    scraper.results['search_news'] = []
+
+    for _ in range(MAX_EMPTY_IGNORED):
+        changes = refresher.refresh()
+        assert changes.failed_sources == ['search_news']
+        assert 'https://example.ca/news-a' in _ids(refresher)
+
+    changes = refresher.refresh()
+    assert changes.removed == ['https://example.ca/news-a']
+    assert changes.changed_sources == ['search_news']
+    # And from then on an empty source is simply unchanged
+    assert refresher.refresh().unchanged_sources == ['search_rss', 'search_news']
+
+
+def test_a_source_that_recovers_resets_the_empty_count():
+    refresher, scraper = _refresher()
+    refresher.refresh()
+    scraper.results['search_news'] = []
+    refresher.refresh()
+    scraper.results['search_news'] = [_entry('news-a')]
+    refresher.refresh()
+    scraper.results['search_news'] = []
+    for _ in range(MAX_EMPTY_IGNORED):
+        assert refresher.refresh().failed_sources == ['search_news']
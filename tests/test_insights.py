@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+from datetime import date
+
+from insights import InsightEngine, calculate_opportunity_score, generate_ai_insights
+from lead_ids import content_hash
+
+TODAY = date(2026, 1, 15)
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+
+
+def _lead(**fields):
+    lead = {'id': 'lead_1', 'title': 'Digital skills program', 'type': 'Federal Grant',
+            'budget': '$250,000', 'deadline': '2026-03-01', 'deadline_date': '2026-03-01'}
+    lead.update(fields)
+    return lead
+
+
+def test_insights_do_not_load_the_scraper_stack():
+    # A fresh interpreter, since other tests import the scrapers themselves
+    loaded = subprocess.run(
+        [sys.executable, '-c', 'import sys, insights; print(" ".join(sys.modules))'],
+        cwd=APP_DIR, capture_output=True, text=True, check=True
+    ).stdout.split()
+    assert 'incremental' not in loaded
+    assert 'enhanced_real_scraper' not in loaded
+    assert 'requests' not in loaded
+
+
+def test_content_hash_ignores_key_order_and_found_date():
+    a = {'title': 'x', 'budget': '$1', 'found_date': '2026-01-01'}
+    b = {'budget': '$1', 'found_date': '2026-02-01', 'title': 'x'}
+    assert content_hash(a) == content_hash(b)
+    assert content_hash(a, ignore=()) != content_hash(b, ignore=())
+
+
+def test_insights_are_deterministic():
+    lead = _lead()
+    assert generate_ai_insights(lead, today=TODAY) == generate_ai_insights(dict(lead), today=TODAY)
+
+
+def test_deadline_within_90_days_scores_higher_than_within_180():
+    soon = calculate_opportunity_score(_lead(deadline_date='2026-03-01'), TODAY)
+    later = calculate_opportunity_score(_lead(deadline_date='2026-06-01'), TODAY)
+    assert soon - later == 5
+
+
+def test_engine_memoizes_unchanged_leads_and_rescores_changed_ones():
+    engine = InsightEngine()
+    lead = _lead()
+    first = engine.enhance_all([lead], TODAY)[0]
+    assert engine.enhance_all([dict(lead)], TODAY)[0] is first
+    changed = engine.enhance_all([_lead(type='Provincial Grant')], TODAY)[0]
+    assert changed is not first
+    assert changed['score'] < first['score']
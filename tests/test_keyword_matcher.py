@@ -0,0 +1,105 @@
+import random
+
+from ai_scraper import TRAINING_CATEGORIES, TRAINING_CATEGORY_MATCHER
+from enhanced_real_scraper import FEED_KEYWORD_MATCHER, FEED_KEYWORDS
+from keyword_matcher import KeywordAutomaton, fold
+from scraper import LEAD_MATCHER, ORG_TYPES, TRAINING_SIGNALS, TRAINING_TYPES
+
+
+def test_overlapping_and_nested_patterns_are_all_reported():
+    matcher = KeywordAutomaton({'a': ['he', 'she', 'hers'], 'b': ['his', 'e']})
+
+    assert matcher.scan('ushers') == {
+        'a': [('she', 1), ('he', 2), ('hers', 2)],
+        'b': [('e', 3)],
+    }
+
+
+def test_a_term_inside_a_longer_term_matches_both():
+    matches = LEAD_MATCHER.scan('Cybersecurity training for staff')
+
+    assert ('cybersecurity training', 0) in matches['training_signal']
+    assert ('training', 14) in matches['training_signal']
+
+
+def test_terms_match_anywhere_like_the_substring_checks_they_replace():
+    matcher = KeywordAutomaton({'keyword': ['train', 'ail']})
+
+    # No word boundaries: 'train' is found in 'retraining', 'ail' in 'mail'
+    assert matcher.scan('Retraining by mail') == {'keyword': [('train', 2), ('ail', 15)]}
+    # ...and terms at either end of the text or next to punctuation are found too
+    assert matcher.scan('train,ail') == {'keyword': [('train', 0), ('ail', 6)]}
+    assert matcher.scan('(AIL)') == {'keyword': [('ail', 1)]}
+    assert matcher.scan('trai n') == {}
+
+
+def test_matching_ignores_case_and_accents():
+    matcher = KeywordAutomaton({'org_type': ['métis', 'quebec']})
+
+    for text in ('Métis Nation', 'METIS NATION', 'metis nation', 'MÉTIS NATION'):
+        assert matcher.scan(text) == {'org_type': [('metis', 0)]}
+    assert matcher.scan('Gouvernement du Québec') == {'org_type': [('quebec', 16)]}
+
+
+def test_positions_are_offsets_into_the_original_text():
+    text = 'Ça dépend: Formation en leadership'
+    assert len(fold(text)) == len(text)
+
+    (term, position), = LEAD_MATCHER.scan(text)['Leadership Development']
+    assert text[position:position + len(term)] == 'leadership'
+
+
+def test_empty_terms_and_text_match_nothing():
+    assert KeywordAutomaton({'keyword': ['', 'x']}).scan('') == {}
+    assert KeywordAutomaton({}).scan('anything') == {}
+
+
+def _random_texts(terms, count=300, seed=7):
+    rng = random.Random(seed)
+    fillers = ['the', 'of', 'a', 'services', 'contract', 'for', 'Ottawa', 'x', '-', '2024']
+    words = [term for term in terms if term.isascii()] + fillers
+    for _ in range(count):
+        picked = rng.sample(words, rng.randint(0, 6))
+        # Vary case and sometimes glue words together or cut them short
+        picked = [word.upper() if rng.random() < 0.2 else word.title() if rng.random() < 0.2 else word
+                  for word in picked]
+        picked = [word[:rng.randint(1, len(word))] if rng.random() < 0.1 else word for word in picked]
+        yield rng.choice([' ', '', ', ']).join(picked)
+
+
+def _old_match(text, terms):
+    return any(term in text.lower() for term in terms)
+
+
+def test_agrees_with_substring_checks_on_the_lead_vocabularies():
+    vocabularies = {'training_signal': TRAINING_SIGNALS, 'org_type': ORG_TYPES,
+                    'current_year': ['2025', '2026'], **TRAINING_TYPES}
+    all_terms = [term for terms in vocabularies.values() for term in terms]
+
+    for text in _random_texts(all_terms):
+        matches = LEAD_MATCHER.scan(text)
+        for category, terms in vocabularies.items():
+            assert (category in matches) == _old_match(text, terms), (text, category)
+        old_type = next((training_type for training_type, keywords in TRAINING_TYPES.items()
+                         if _old_match(text, keywords)), 'Professional Development')
+        assert LEAD_MATCHER.first(text, TRAINING_TYPES, 'Professional Development', matches) == old_type
+
+
+def test_agrees_with_substring_checks_on_training_categories_and_feed_keywords():
+    all_terms = [term for terms in TRAINING_CATEGORIES.values() for term in terms] + FEED_KEYWORDS
+
+    for text in _random_texts(all_terms, seed=11):
+        old_category = next((category for category, keywords in TRAINING_CATEGORIES.items()
+                             if _old_match(text, keywords)), None)
+        assert TRAINING_CATEGORY_MATCHER.first(text, TRAINING_CATEGORIES) == old_category, text
+        assert ('keyword' in FEED_KEYWORD_MATCHER.scan(text)) == _old_match(text, FEED_KEYWORDS), text
+
+
+def test_accented_text_matches_at_least_what_substring_checks_did():
+    for text in ('Métis Nation of Ontario', 'Metis Nation of Ontario', 'Programme de formation à Montréal',
+                 'Développement des compétences', 'Première Nation crie'):
+        matches = LEAD_MATCHER.scan(text)
+        for category, terms in {'training_signal': TRAINING_SIGNALS, 'org_type': ORG_TYPES}.items():
+            if _old_match(text, terms):
+                assert category in matches, (text, category)
+    assert 'org_type' in LEAD_MATCHER.scan('Metis Nation of Ontario')
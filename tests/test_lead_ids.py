@@ -0,0 +1,70 @@
+import re
+
+import pytest
+
+from lead_ids import content_hash, make_lead_id, normalize_url
+
+URL = 'https://canadabuys.canada.ca/en/tender-opportunities/tender-notice/cb-123?lang=en&page=2'
+ORGANIZATION = 'Public Services and Procurement Canada'
+TITLE = 'Cybersecurity Awareness Training'
+LEAD_ID = make_lead_id(URL, ORGANIZATION, TITLE)
+
+
+def test_ids_are_prefixed_fixed_length_hex():
+    assert re.fullmatch(r'lead_[0-9a-f]{16}', LEAD_ID)
+    assert make_lead_id(URL, ORGANIZATION, TITLE, prefix='ai_').startswith('ai_')
+
+
+@pytest.mark.parametrize('url', [
+    URL + '&utm_source=newsletter&utm_medium=email',
+    URL + '&gclid=abc123&fbclid=xyz&_ga=1.2.3',
+    'https://canadabuys.canada.ca/en/tender-opportunities/tender-notice/cb-123?page=2&lang=en',
+    'HTTPS://CanadaBuys.Canada.ca/en/tender-opportunities/tender-notice/cb-123?lang=en&page=2',
+    'https://www.canadabuys.canada.ca:443/en/tender-opportunities/tender-notice/cb-123/?lang=en&page=2#details',
+    '  ' + URL + '\n',
+])
+def test_id_is_stable_across_url_spellings(url):
+    assert make_lead_id(url, ORGANIZATION, TITLE) == LEAD_ID
+
+
+@pytest.mark.parametrize('organization, title', [
+    ('PUBLIC SERVICES AND PROCUREMENT CANADA', 'cybersecurity awareness training'),
+    ('  Public   Services and\tProcurement Canada ', 'Cybersecurity\nAwareness  Training '),
+])
+def test_id_ignores_case_and_whitespace(organization, title):
+    assert make_lead_id(URL, organization, title) == LEAD_ID
+
+
+def test_id_ignores_accents():
+    assert make_lead_id(URL, 'Ville de Montréal', 'Formation en équité') == \
+        make_lead_id(URL, 'VILLE DE MONTREAL', 'formation en equite')
+
+
+@pytest.mark.parametrize('url, organization, title', [
+    (URL, 'Shared Services Canada', TITLE),
+    (URL, ORGANIZATION, 'Cybersecurity Awareness Training - Phase 2'),
+    (URL, ORGANIZATION, 'Leadership Development'),
+    (URL.replace('cb-123', 'cb-124'), ORGANIZATION, TITLE),
+    (URL.replace('page=2', 'page=3'), ORGANIZATION, TITLE),
+    (URL.replace('cb-123', 'CB-123'), ORGANIZATION, TITLE),  # paths are case-sensitive
+    ('', ORGANIZATION, TITLE),
+])
+def test_id_changes_with_the_opportunity(url, organization, title):
+    assert make_lead_id(url, organization, title) != LEAD_ID
+
+
+def test_fields_cannot_run_into_each_other():
+    assert make_lead_id('', 'City of', 'Ottawa Training') != make_lead_id('', 'City of Ottawa', 'Training')
+
+
+def test_normalize_url_keeps_non_default_ports_and_empty_urls():
+    assert normalize_url('http://example.com:8080/a/') == 'http://example.com:8080/a'
+    assert normalize_url('http://example.com:80/') == 'http://example.com/'
+    assert normalize_url('') == normalize_url(None) == ''
+
+
+def test_content_hash_ignores_key_order_and_found_date():
+    record = {'title': TITLE, 'budget': 50000, 'found_date': '2026-01-01'}
+
+    assert content_hash(record) == content_hash({'found_date': '2026-02-02', 'budget': 50000, 'title': TITLE})
+    assert content_hash(record) != content_hash({**record, 'budget': 60000})
@@ -0,0 +1,121 @@
+import random
+from collections import Counter
+
+from lead_index import Bitmap, LeadIndex, tokenize
+
+ORGANIZATION_TYPES = ['Federal Government', 'Provincial Government', 'Municipal', 'Non-Profit', None]
+TRAINING_TYPES = ['Digital Skills Training', 'Leadership Development', 'DEI Training', 'Compliance Training']
+TIERS = ['Tier 1 - Enterprise', 'Tier 2 - Mid-Market', 'Tier 3 - Small']
+WORDS = ['cybersecurity', 'cyber', 'awareness', 'leadership', 'québec', 'Montréal', 'data', 'literacy',
+         'program', 'programme', 'AI', 'coaching', 'Ottawa', 'health', 'équité', 'inclusion']
+
+
+def _random_leads(count, seed=3):
+    rng = random.Random(seed)
+    return [{
+        'organization_type': rng.choice(ORGANIZATION_TYPES),
+        'training_type': rng.choice(TRAINING_TYPES),
+        'tier': rng.choice(TIERS),
+        'organization': ' '.join(rng.sample(WORDS, 2)),
+        'opportunity': ' '.join(rng.sample(WORDS, rng.randint(1, 4))),
+        'description': rng.choice(['', None, ' '.join(rng.sample(WORDS, 3))]),
+    } for _ in range(count)]
+
+
+def _brute_force_search(lead, text):
+    tokens = tokenize(' '.join(str(lead.get(field) or '') for field in ('organization', 'opportunity', 'description')))
+    return all(any(token.startswith(word) for token in tokens) for word in tokenize(text))
+
+
+def _brute_force(leads, wanted, search):
+    """Positions matching every {field: predicate} in wanted and the search text"""
+    return [position for position, lead in enumerate(leads)
+            if all(matches(lead.get(field)) for field, matches in wanted.items())
+            and _brute_force_search(lead, search)]
+
+
+def test_bitmap_set_operations_match_python_sets():
+    rng = random.Random(5)
+    for size in (0, 1, 7, 8, 9, 64, 65, 300):
+        left = {p for p in range(size) if rng.random() < 0.3}
+        right = {p for p in range(size) if rng.random() < 0.6}
+        a, b = Bitmap.from_positions(left, size), Bitmap.from_positions(right, size)
+
+        assert list(a) == sorted(left)
+        assert len(a) == len(left)
+        assert list(a & b) == sorted(left & right)
+        assert list(a | b) == sorted(left | right)
+        assert all((p in a) == (p in left) for p in range(size + 2))
+    assert list(Bitmap()) == [] and len(Bitmap()) == 0
+
+
+def test_search_matches_word_prefixes_of_every_query_word():
+    leads = [
+        {'organization': 'City of Montréal', 'opportunity': 'Cybersecurity awareness'},
+        {'organization': 'Ottawa', 'opportunity': 'Cyber range', 'description': 'Data literacy'},
+        {'organization': 'Québec', 'opportunity': 'Leadership coaching'},
+    ]
+    index = LeadIndex(leads)
+
+    assert list(index.search('cyber')) == [0, 1]
+    assert list(index.search('CYBER data')) == [1]
+    assert list(index.search('montreal')) == [0]
+    assert list(index.search('Quebec lead')) == [2]
+    assert list(index.search('security')) == []
+    assert list(index.search('')) == [0, 1, 2]
+
+
+def test_filters_and_search_agree_with_a_brute_force_filter():
+    leads = _random_leads(500)
+    index = LeadIndex(leads)
+    rng = random.Random(9)
+
+    for _ in range(200):
+        filters, wanted = {}, {}
+        if rng.random() < 0.6:
+            value = rng.choice(ORGANIZATION_TYPES)
+            filters['organization_type'] = index.facet('organization_type', value)
+            wanted['organization_type'] = lambda actual, value=value: actual == value
+        if rng.random() < 0.6:
+            value = rng.choice(TRAINING_TYPES)
+            filters['training_type'] = index.facet('training_type', value)
+            wanted['training_type'] = lambda actual, value=value: actual == value
+        if rng.random() < 0.6:
+            value = rng.choice(['tier 1', 'Tier 2', 'MARKET', 'small', 'Tier 9'])
+            filters['tier'] = index.facet('tier', value, contains=True)
+            wanted['tier'] = lambda actual, value=value: value.lower() in actual.lower()
+        search = ' '.join(word[:rng.randint(2, len(word))] for word in rng.sample(WORDS, rng.randint(0, 2)))
+
+        matches, counts = index.query(filters, search)
+
+        assert list(matches) == _brute_force(leads, wanted, search), (filters.keys(), search)
+        for field in index.facets:
+            # A facet's counts ignore its own filter
+            others = {other: predicate for other, predicate in wanted.items() if other != field}
+            expected = Counter(leads[p][field] for p in _brute_force(leads, others, search))
+            assert counts[field] == dict(expected), (field, search)
+
+
+def test_unknown_facet_values_match_nothing():
+    index = LeadIndex(_random_leads(50))
+
+    matches, counts = index.query({'training_type': index.facet('training_type', 'Underwater Basket Weaving')})
+
+    assert list(matches) == []
+    assert sum(counts['training_type'].values()) == 50
+    assert counts['tier'] == {}
+
+
+def test_sparse_and_dense_postings_give_the_same_answers(monkeypatch):
+    leads = _random_leads(300)
+    monkeypatch.setattr(LeadIndex, 'DENSE_FRACTION', 10 ** 9)
+    dense_index = LeadIndex(leads)
+    monkeypatch.setattr(LeadIndex, 'DENSE_FRACTION', 1)
+    sparse_index = LeadIndex(leads)
+
+    assert all(isinstance(postings, Bitmap) for postings in dense_index.postings.values())
+    assert not any(isinstance(postings, Bitmap) for postings in sparse_index.postings.values())
+    for word in WORDS:
+        for prefix in (word[:2], word):
+            assert list(sparse_index.search(prefix)) == list(dense_index.search(prefix)), prefix
+            assert list(sparse_index.search(prefix)) == _brute_force(leads, {}, prefix), prefix
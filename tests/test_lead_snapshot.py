@@ -0,0 +1,213 @@
+import gzip
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, request
+
+import lead_snapshot
+from lead_snapshot import LeadSnapshot, SnapshotPublisher, leads_response
+
+
+def _leads(count, prefix='Lead'):
+    return [{'id': f'{prefix}-{i}', 'title': f'{prefix} {i}', 'organization': 'City of Ottawa'}
+            for i in range(count)]
+
+
+def test_publish_swaps_in_a_new_snapshot_and_leaves_the_old_one_alone():
+    publisher = SnapshotPublisher(last_update=None, count=0)
+    empty = publisher.current
+    first_leads = _leads(3)
+
+    first = publisher.publish(first_leads, last_update='2026-01-01 09:00:00', count=3)
+
+    assert publisher.current is first
+    assert first.version == empty.version + 1
+    assert first.leads == tuple(first_leads)
+    assert dict(first.meta) == {'last_update': '2026-01-01 09:00:00', 'count': 3}
+    # A reader still holding the old snapshot sees exactly what it saw before
+    assert empty.leads == () and dict(empty.meta) == {'last_update': None, 'count': 0}
+
+    first_leads.append({'id': 'late'})
+    assert len(first) == 3
+
+    second = publisher.publish(_leads(1, 'Other'), last_update='2026-01-01 10:00:00', count=1)
+    assert publisher.current is second and second.version == first.version + 1
+    assert [lead['id'] for lead in first.leads] == ['Lead-0', 'Lead-1', 'Lead-2']
+
+
+def test_snapshots_are_immutable():
+    snapshot = LeadSnapshot(_leads(2), 1, {'count': 2})
+
+    with pytest.raises(AttributeError):
+        snapshot.leads = ()
+    with pytest.raises(AttributeError):
+        snapshot.version = 2
+    with pytest.raises(TypeError):
+        snapshot.meta['count'] = 3
+    with pytest.raises(TypeError):
+        snapshot.encodings['gzip'] = b''
+
+
+def test_unchanged_leads_keep_their_tuple_and_pager():
+    publisher = SnapshotPublisher(count=0)
+    first = publisher.publish(_leads(5), count=5)
+
+    again = publisher.publish(_leads(5), count=5)
+    assert again is not first and again.version == first.version + 1
+    assert again.leads is first.leads
+    assert again.pager is first.pager
+
+    changed = publisher.publish(_leads(6), count=6)
+    assert changed.pager is not first.pager
+    assert changed.pager.leads is changed.leads
+
+
+def test_readers_always_see_leads_and_meta_from_the_same_publish():
+    publisher = SnapshotPublisher(count=0)
+    stop = threading.Event()
+    mismatches = []
+
+    def read():
+        while not stop.is_set():
+            snapshot = publisher.current
+            if snapshot.meta['count'] != len(snapshot.leads):
+                mismatches.append(snapshot.version)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for count in range(200):
+        publisher.publish(_leads(count % 7), count=count % 7)
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert mismatches == []
+    assert publisher.current.version == 200
+
+
+def _client(publisher):
+    app = Flask(__name__)
+
+    @app.route('/api/leads')
+    def leads():
+        return leads_response(publisher.current, request)
+
+    return app.test_client()
+
+
+def _publisher(count=40, **meta):
+    publisher = SnapshotPublisher(count=0)
+    publisher.publish(_leads(count), count=count, **meta)
+    return publisher
+
+
+def test_etag_depends_only_on_the_content():
+    first, second = _publisher(), _publisher()
+    second.publish(_leads(40), count=40)
+
+    assert first.current.version != second.current.version
+    assert first.current.etag == second.current.etag
+    assert _publisher(41).current.etag != first.current.etag
+    assert _publisher(last_update='later').current.etag != first.current.etag
+    assert first.current.entity_tag('gzip') == f'{first.current.etag}-gzip'
+
+
+def test_identity_body_when_no_encoding_is_accepted():
+    publisher = _publisher()
+    client = _client(publisher)
+
+    for headers in ({}, {'Accept-Encoding': 'identity'}, {'Accept-Encoding': 'gzip;q=0, br;q=0'}):
+        response = client.get('/api/leads', headers=headers)
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_data() == publisher.current.body
+        assert response.headers['ETag'] == f'"{publisher.current.etag}"'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert response.headers['Cache-Control'] == 'no-cache'
+    assert json.loads(response.get_data())['count'] == 40
+
+
+def test_gzip_is_sent_to_clients_that_accept_it():
+    publisher = _publisher()
+    response = _client(publisher).get('/api/leads', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'] == f'"{publisher.current.etag}-gzip"'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.get_data()) == publisher.current.body
+    # The bytes were compressed once, when the snapshot was built
+    assert response.get_data() == publisher.current.encodings['gzip']
+
+
+def test_br_is_preferred_when_available_and_accepted(monkeypatch):
+    monkeypatch.setattr(lead_snapshot, 'brotli', SimpleNamespace(compress=lambda body, quality: b'br:' + body))
+    publisher = _publisher()
+    client = _client(publisher)
+
+    response = client.get('/api/leads', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert response.get_data() == b'br:' + publisher.current.body
+    assert response.headers['ETag'] == f'"{publisher.current.etag}-br"'
+
+    response = client.get('/api/leads', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+
+def test_br_round_trips_with_the_real_codec():
+    brotli = pytest.importorskip('brotli')
+    publisher = _publisher()
+
+    response = _client(publisher).get('/api/leads', headers={'Accept-Encoding': 'br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.get_data()) == publisher.current.body
+
+
+def test_without_brotli_only_gzip_is_offered(monkeypatch):
+    monkeypatch.setattr(lead_snapshot, 'brotli', None)
+    publisher = _publisher()
+
+    assert list(publisher.current.encodings) == ['gzip']
+    response = _client(publisher).get('/api/leads', headers={'Accept-Encoding': 'br'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == publisher.current.body
+
+
+def test_small_bodies_are_not_compressed():
+    publisher = _publisher(0)
+    assert len(publisher.current.body) < lead_snapshot.MIN_COMPRESS_SIZE
+
+    response = _client(publisher).get('/api/leads', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == publisher.current.body
+
+
+def test_if_none_match_answers_304_for_the_current_version_in_any_coding():
+    publisher = _publisher()
+    client = _client(publisher)
+    identity_tag = client.get('/api/leads').headers['ETag']
+    gzip_tag = client.get('/api/leads', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+
+    for tag in (identity_tag, gzip_tag, f'"stale", {gzip_tag}', f'W/{identity_tag}'):
+        response = client.get('/api/leads', headers={'Accept-Encoding': 'gzip', 'If-None-Match': tag})
+        assert response.status_code == 304, tag
+        assert response.get_data() == b''
+        assert response.headers['ETag'] == gzip_tag
+        assert 'Accept-Encoding' in response.headers['Vary']
+
+    publisher.publish(_leads(41), count=41)
+    response = client.get('/api/leads', headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzip_tag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != gzip_tag
+
+
+def test_paged_requests_are_still_served():
+    response = _client(_publisher()).get('/api/leads?limit=5')
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert len(data['leads']) == 5 and data['count'] == 40
@@ -0,0 +1,168 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import lead_store
+from lead_store import LeadStore
+from models import Lead, ScrapeRun
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+
+
+@pytest.fixture
+def store(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'leads.db'}")
+    return LeadStore(bind=engine, session_factory=sessionmaker(bind=engine))
+
+
+def _leads(*ids, **fields):
+    return [dict({'id': lead_id, 'title': f"Lead {lead_id}", 'deadline_date': '2026-03-31'}, **fields)
+            for lead_id in ids]
+
+
+def test_snapshot_round_trip_keeps_order_and_drops_repeated_ids(store):
+    leads = _leads('c', 'a', 'b') + _leads('a', title='duplicate')
+    run_id = store.save_snapshot('enhanced', leads, {'rss': {'status': 'ok', 'count': 3, 'seconds': 1.5}})
+
+    run, loaded = store.load_snapshot('enhanced')
+    assert run.id == run_id
+    assert run.lead_count == 3
+    assert [lead['id'] for lead in loaded] == ['c', 'a', 'b']
+    assert loaded[1]['title'] == 'Lead a'
+    assert store.source_status('enhanced')['rss']['count'] == 3
+
+
+def test_collections_are_separate(store):
+    store.save_snapshot('enhanced', _leads('a'))
+    assert store.load_snapshot('public_sector') == (None, [])
+    assert store.load_leads('enhanced') == _leads('a')
+
+
+def test_latest_run_wins_and_dropped_leads_are_not_loaded(store):
+    store.save_snapshot('enhanced', _leads('a', 'b'))
+    second = store.save_snapshot('enhanced', _leads('b', 'c'))
+
+    run, loaded = store.load_snapshot('enhanced')
+    assert run.id == second
+    assert [lead['id'] for lead in loaded] == ['b', 'c']
+
+
+def test_a_superseded_run_is_never_paired_with_part_of_its_leads(store):
+    # A follower saw run 1 as the latest, but run 2 committed before it read the leads;
+    # run 2 took over 'b', so run 1's rows alone would be incomplete
+    first = store.save_snapshot('enhanced', _leads('a', 'b'))
+    second = store.save_snapshot('enhanced', _leads('b', 'c', 'd'))
+
+    run, loaded = store.load_snapshot('enhanced', run_id=first)
+    assert run.id == second
+    assert [lead['id'] for lead in loaded] == ['b', 'c', 'd']
+
+
+def test_an_intact_older_run_can_still_be_loaded_by_id(store):
+    first = store.save_snapshot('enhanced', _leads('a'))
+    store.save_snapshot('enhanced', _leads('b'))
+
+    run, loaded = store.load_snapshot('enhanced', run_id=first)
+    assert run.id == first
+    assert loaded == _leads('a')
+
+
+def _stored(store, model, collection='enhanced'):
+    with store.Session() as session:
+        return session.scalars(select(model).where(model.collection == collection)).all()
+
+
+def test_saving_prunes_old_runs_and_the_leads_only_they_had(store):
+    first = store.save_snapshot('enhanced', _leads('a', 'b'), keep=2)
+    store.record_failed_run('enhanced', 'timeout')
+    second = store.save_snapshot('enhanced', _leads('b', 'c'), keep=2)
+    store.save_snapshot('public_sector', _leads('x'), keep=2)
+
+    assert [run.id for run in _stored(store, ScrapeRun)] == [first, first + 1, second]
+
+    third = store.save_snapshot('enhanced', _leads('c', 'd'), keep=2)
+
+    # Runs before the 2nd newest successful one go, failed ones included
+    assert [run.id for run in _stored(store, ScrapeRun)] == [second, third]
+    # 'a' was last seen in the pruned run; 'b' belongs to a kept one
+    assert sorted(lead.id for lead in _stored(store, Lead)) == ['b', 'c', 'd']
+    assert store.load_snapshot('enhanced', run_id=first) == (None, [])
+    # Other collections are left alone
+    assert store.load_leads('public_sector') == _leads('x')
+
+
+def test_a_lead_every_run_produces_is_never_pruned(store):
+    for _ in range(5):
+        latest = store.save_snapshot('enhanced', _leads('a'), keep=1)
+
+    assert [run.id for run in _stored(store, ScrapeRun)] == [latest]
+    assert store.load_snapshot('enhanced')[1] == _leads('a')
+
+
+def test_upsert_keeps_first_seen_and_refreshes_the_rest(store):
+    store.save_snapshot('enhanced', _leads('a'))
+    with store.Session() as session:
+        first_seen = session.get(Lead, {'collection': 'enhanced', 'id': 'a'}).first_seen
+
+    store.save_snapshot('enhanced', _leads('a', title='Renamed'))
+    with store.Session() as session:
+        lead = session.get(Lead, {'collection': 'enhanced', 'id': 'a'})
+        assert lead.first_seen == first_seen
+        assert lead.title == 'Renamed'
+        assert lead.data['title'] == 'Renamed'
+
+
+def test_unknown_dialects_fall_back_to_a_merge(store):
+    assert lead_store._insert('mssql') is None
+    store.insert = None
+
+    store.save_snapshot('enhanced', _leads('a', 'b'), {'rss': {'status': 'ok', 'count': 2}})
+    with store.Session() as session:
+        first_seen = session.get(Lead, {'collection': 'enhanced', 'id': 'a'}).first_seen
+    store.save_snapshot('enhanced', _leads('a', title='Renamed'), {'rss': {'status': 'error', 'count': 0}})
+
+    run, loaded = store.load_snapshot('enhanced')
+    assert loaded == _leads('a', title='Renamed')
+    assert store.source_status('enhanced')['rss']['status'] == 'error'
+    with store.Session() as session:
+        assert session.get(Lead, {'collection': 'enhanced', 'id': 'a'}).first_seen == first_seen
+
+
+def test_failed_runs_do_not_replace_the_snapshot(store):
+    run_id = store.save_snapshot('enhanced', _leads('a'))
+    store.record_failed_run('enhanced', RuntimeError('all sources down'))
+    assert store.latest_run('enhanced').id == run_id
+
+
+def test_an_unusable_database_fails_on_use_not_on_creation(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'leads.db'}")
+    store = LeadStore(bind=engine, session_factory=sessionmaker(bind=engine))
+
+    with pytest.raises(OperationalError):
+        store.load_snapshot('enhanced')
+
+    # Once the database is reachable the tables are created and the store works
+    (tmp_path / 'missing').mkdir()
+    store.save_snapshot('enhanced', _leads('a'))
+    assert store.load_leads('enhanced') == _leads('a')
+
+
+@pytest.mark.parametrize('module', ['real_app', 'advanced_sales_dashboard'])
+def test_apps_start_empty_when_the_database_is_unreachable(module):
+    # Reported on stderr, which the updater thread's progress messages don't write to
+    script = (f"import sys, {module}\n"
+              f"response = {module}.app.test_client().get('/ready')\n"
+              f"print(response.status_code, len({module}.published_leads.current), file=sys.stderr)\n")
+    env = dict(os.environ, LEADGEN_SQLITE_PATH='/nonexistent/dir/leads.db', PYTHONPATH=APP_DIR)
+    env.pop('DATABASE_URL', None)
+    env.pop('POSTGRES_DB', None)
+    env.pop('LEADGEN_LOCK_DIR', None)
+    result = subprocess.run([sys.executable, '-c', script], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stderr.splitlines()[-1] == '503 0'
@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from lead_store import LeadStore
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+
+# Counts updater threads at import, after requests, and in forked children (on stderr,
+# which the updater threads' progress messages don't write to)
+SCRIPT = """
+import os, sys, threading
+import main, db
+
+def updaters():
+    return sum(thread.name.endswith('(background_update)') for thread in threading.enumerate())
+
+def report(name):
+    print(name, len(main.published_leads.current), updaters(),
+          main.search_index._synced is main.published_leads.current.leads, file=sys.stderr, flush=True)
+
+# A pre-fork master: imports the app, serves nothing, forks a worker
+report('imported')
+pool = db.engine.pool
+pid = os.fork()
+if pid == 0:
+    report('forked')
+    main.app.test_client().get('/health')
+    report('worker')
+    print('own pool', db.engine.pool is not pool, file=sys.stderr, flush=True)
+    os._exit(0)
+os.waitpid(pid, 0)
+report('master')
+
+client = main.app.test_client()
+client.get('/health')
+client.get('/health')
+report('served')
+"""
+
+
+def test_every_process_restores_and_runs_one_updater(tmp_path):
+    database = tmp_path / 'leads.db'
+    engine = create_engine(f"sqlite:///{database}")
+    LeadStore(bind=engine, session_factory=sessionmaker(bind=engine)).save_snapshot(
+        'public_sector', [{'id': 'a', 'title': 'Cyber training'}, {'id': 'b', 'title': 'Leadership'}])
+
+    env = dict(os.environ, LEADGEN_SQLITE_PATH=str(database), LEADGEN_LOCK_DIR=str(tmp_path), PYTHONPATH=APP_DIR)
+    env.pop('DATABASE_URL', None)
+    env.pop('POSTGRES_DB', None)
+    result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    lines = result.stderr.splitlines()
+    # Importing starts nothing, and neither does forking
+    assert 'imported 0 0 False' in lines
+    assert 'forked 0 0 False' in lines
+    assert 'master 0 0 False' in lines
+    # A worker restores, indexes and starts one updater on its first request, with its own connections
+    assert 'worker 2 1 True' in lines
+    assert 'own pool True' in lines
+    # Further requests don't start another
+    assert 'served 2 1 True' in lines
+
+
+def test_a_forked_child_does_not_inherit_leadership(tmp_path, monkeypatch):
+    import leader
+    monkeypatch.setattr(leader, 'LOCK_DIR', str(tmp_path))
+    lock = leader.LeaderLock('fork-test')
+    assert lock.acquire()
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # The parent still holds the lock, so the child can't take it
+        os.write(write, b'%d%d' % (lock.is_leader, lock.acquire()))
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read, 2) == b'00'
+    assert lock.is_leader
+    lock.release()
@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from pagination import SORT_FIELDS, LeadPager, paginate
+
+
+def _leads(size=120, seed=3):
+    rng = random.Random(seed)
+    leads = []
+    for i in range(size):
+        lead = {'id': f"lead-{i:03d}", 'title': rng.choice(['Cloud', 'Leadership', 'Safety', 'Éthique']),
+                'organization': rng.choice(['Ottawa', 'Toronto', 'Québec'])}
+        # Leave some values out, and repeat others, so missing values and ties are covered
+        if rng.random() < 0.8:
+            lead['deadline_date'] = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        if rng.random() < 0.7:
+            lead['budget_min'] = lead['budget_max'] = rng.choice([5000, 25000, 100000])
+        if rng.random() < 0.9:
+            lead['score'] = rng.randint(0, 10)
+        leads.append(lead)
+    return leads
+
+
+def _expected(leads, sort, allowed=None):
+    """The whole ordering, by sorting: values ascending or descending, ties by ID, missing values last"""
+    descending = sort.startswith('-')
+    getter = SORT_FIELDS[sort.lstrip('-')]
+    candidates = [(position, lead) for position, lead in enumerate(leads) if allowed is None or position in allowed]
+    if sort.lstrip('-') == 'position':
+        ordered = sorted(candidates, reverse=descending)
+        return [lead for _, lead in ordered]
+    present = [(getter(lead), lead['id'], lead) for _, lead in candidates if getter(lead) is not None]
+    missing = [(lead['id'], lead) for _, lead in candidates if getter(lead) is None]
+    present.sort(key=lambda item: item[:2], reverse=descending)
+    missing.sort(key=lambda item: item[0], reverse=descending)
+    return [lead for *_, lead in present] + [lead for _, lead in missing]
+
+
+def _read_all(pager, sort, limit, allowed=None):
+    leads, cursor, pages = [], None, 0
+    while True:
+        page, cursor = pager.page(sort, cursor, limit, allowed)
+        leads.extend(page)
+        pages += 1
+        if cursor is None:
+            return leads, pages
+
+
+@pytest.mark.parametrize('sort', [direction + field for field in SORT_FIELDS for direction in ('', '-')])
+@pytest.mark.parametrize('limit', [1, 7, 500])
+def test_paging_reads_every_lead_once_in_order(sort, limit):
+    leads = _leads()
+    read, pages = _read_all(LeadPager(leads), sort, limit)
+    assert read == _expected(leads, sort)
+    assert pages == -(-len(leads) // limit)
+
+
+@pytest.mark.parametrize('allowed', [
+    set(range(0, 120, 2)),   # dense - walked in sort order
+    {3, 50, 51, 119},        # sparse - sorted directly
+    set()
+])
+@pytest.mark.parametrize('sort', ['deadline', '-budget', 'title', '-position'])
+def test_filtered_pages_match_filtering_the_full_order(allowed, sort):
+    leads = _leads()
+    read, _ = _read_all(LeadPager(leads), sort, 5, allowed)
+    assert read == _expected(leads, sort, allowed)
+
+
+def test_a_cursor_keeps_its_place_across_a_refresh():
+    leads = _leads()
+    page, cursor = LeadPager(leads).page('deadline', None, 10)
+
+    # The list is refreshed: a lead that sorts first is added and one already read is dropped
+    refreshed = [{'id': 'early', 'deadline_date': '2025-01-01'}] + [lead for lead in leads if lead is not page[3]]
+    pager, rest = LeadPager(refreshed), []
+    while cursor is not None:
+        page, cursor = pager.page('deadline', cursor, 10)
+        rest.extend(page)
+    assert rest == _expected(refreshed, 'deadline')[10:]
+
+
+def test_paginate_without_parameters_returns_the_whole_list():
+    leads = _leads(10)
+    assert paginate(LeadPager(leads), {}) == {'leads': leads, 'next_cursor': None}
+    assert paginate(LeadPager(leads), {}, allowed={4, 1})['leads'] == [leads[1], leads[4]]
+
+
+def test_paginate_projects_fields_and_clamps_the_limit():
+    leads = _leads(10)
+    body = paginate(LeadPager(leads), {'limit': '0', 'fields': 'id,deadline_date,nope'})
+    assert len(body['leads']) == 1 and body['next_cursor']
+    assert set(body['leads'][0]) <= {'id', 'deadline_date'}
+
+
+@pytest.mark.parametrize('args', [
+    {'sort': 'colour'},
+    {'limit': 'ten'},
+    {'cursor': '!!not-a-cursor'},
+])
+def test_bad_parameters_raise_value_error(args):
+    with pytest.raises(ValueError):
+        paginate(LeadPager(_leads(10)), args)
+
+
+def test_a_cursor_from_another_sort_is_rejected():
+    pager = LeadPager(_leads())
+    _, cursor = pager.page('budget', None, 5)
+    with pytest.raises(ValueError):
+        pager.page('title', cursor, 5)
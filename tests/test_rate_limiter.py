@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from rate_limiter import HostRateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+
+def test_burst_capacity_is_free_then_callers_are_spaced_by_the_rate():
+    bucket = TokenBucket(rate=2, burst=3, clock=FakeClock())
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Each further caller reserves the next slot, 1/rate after the previous one
+    assert [bucket.reserve() for _ in range(3)] == [0.5, 1.0, 1.5]
+
+
+def test_tokens_refill_at_the_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4, burst=2, clock=clock)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.now += 0.25
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.25)
+
+    clock.now += 0.75
+    assert bucket.reserve() == 0.0
+
+
+def test_refill_never_exceeds_the_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock)
+
+    clock.now += 3600
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, pytest.approx(0.1)]
+
+
+def test_burst_is_at_least_one():
+    bucket = TokenBucket(rate=1, burst=0, clock=FakeClock())
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 1.0
+
+
+def test_hosts_have_separate_buckets_and_their_own_limits():
+    clock = FakeClock()
+    limiter = HostRateLimiter(default_rate=1, default_burst=1, host_limits={'www.merx.com': (0.5, 1)},
+                              clock=clock, sleep=clock.sleep)
+
+    assert limiter.acquire('https://www.merx.com/tenders?page=1') == 0.0
+    assert limiter.acquire('https://canadabuys.canada.ca/en') == 0.0
+    assert limiter.acquire('ontario.ca') == 0.0
+    # Only the host that already used its token waits, at its own rate
+    assert limiter.acquire('https://WWW.MERX.COM/tenders?page=2') == 2.0
+    assert clock.sleeps == [2.0]
+    assert limiter.bucket('www.merx.com') is limiter.bucket('https://www.merx.com/')
+    assert limiter.bucket('www.merx.com') is not limiter.bucket('ontario.ca')
+
+
+def test_acquire_async_waits_with_the_async_sleep():
+    clock = FakeClock()
+    limiter = HostRateLimiter(default_rate=4, default_burst=1, host_limits={},
+                              clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep)
+
+    async def acquire_three():
+        return [await limiter.acquire_async('https://example.com/') for _ in range(3)]
+
+    # The sleeps advance the fake clock, so each wait is a fresh 1/rate
+    assert asyncio.run(acquire_three()) == [0.0, 0.25, 0.25]
+    assert clock.sleeps == [0.25, 0.25]
@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from lead_store import LeadStore
+from models import RefreshJob as RefreshJobRow
+from refresh_jobs import RefreshJobs
+
+
+@pytest.fixture
+def database(tmp_path):
+    return f"sqlite:///{tmp_path / 'leads.db'}"
+
+
+def _store(database):
+    # Each worker has its own engine and sessions; they share only the database
+    engine = create_engine(database, connect_args={'check_same_thread': False})
+    return LeadStore(bind=engine, session_factory=sessionmaker(bind=engine))
+
+
+def _runner(calls, seen_by_follower=None, follower=None):
+    def runner(job):
+        calls.append(job.job_ids)
+        job.report('rss', 'running')
+        job.report('rss', 'done', leads=3)
+        if follower is not None:
+            seen_by_follower.append(follower.get(job.job_ids[0]))
+        return {'count': 3}
+    return runner
+
+
+def test_workers_share_one_job_and_only_the_leader_runs_it(database):
+    calls, seen = [], []
+    follower = RefreshJobs(lambda job: pytest.fail('followers never run jobs'), _store(database), 'public_sector')
+    leader = RefreshJobs(_runner(calls, seen, follower), _store(database), 'public_sector')
+
+    job, created = follower.submit()
+    assert created and job['status'] == 'queued'
+    again, created = leader.submit()
+    assert again['id'] == job['id'] and not created
+
+    assert leader.run_pending()
+    assert calls == [[job['id']]]
+    # Progress was visible to the other worker while the job ran
+    assert seen[0]['status'] == 'running'
+    assert seen[0]['sources'] == {'rss': {'status': 'done', 'leads': 3}}
+
+    finished = follower.get(job['id'])
+    assert finished['status'] == 'succeeded'
+    assert finished['result'] == {'count': 3}
+    assert finished['started_at'] and finished['finished_at']
+    assert not leader.run_pending()
+
+
+def test_jobs_queued_at_the_same_moment_share_one_run(database):
+    calls = []
+    store = _store(database)
+    leader = RefreshJobs(_runner(calls), store, 'public_sector')
+    first, _ = leader.submit()
+    # Another worker that checked before the first job was committed queues its own
+    with store.Session() as session:
+        session.add(RefreshJobRow(id='second', collection='public_sector', status='queued', sources={}))
+        session.commit()
+
+    assert leader.run_pending()
+    assert sorted(calls[0]) == sorted([first['id'], 'second'])
+    assert leader.get('second')['status'] == 'succeeded'
+
+
+def test_a_new_job_is_queued_once_the_last_one_finished(database):
+    leader = RefreshJobs(_runner([]), _store(database), 'public_sector')
+    first, _ = leader.submit()
+    leader.run_pending()
+    second, created = leader.submit()
+    assert created and second['id'] != first['id']
+
+
+def test_collections_have_separate_jobs(database):
+    store = _store(database)
+    public, _ = RefreshJobs(_runner([]), store, 'public_sector').submit()
+    enhanced, created = RefreshJobs(_runner([]), store, 'enhanced').submit()
+    assert created and enhanced['id'] != public['id']
+
+
+def test_failed_runs_are_reported(database):
+    def runner(job):
+        raise RuntimeError('search engine down')
+
+    leader = RefreshJobs(runner, _store(database), 'public_sector')
+    job, _ = leader.submit()
+    leader.run_pending()
+    failed = leader.get(job['id'])
+    assert failed['status'] == 'failed'
+    assert failed['error'] == 'search engine down'
+
+
+def test_a_new_leader_fails_jobs_its_predecessor_left_running(database):
+    old_leader = RefreshJobs(_runner([]), _store(database), 'public_sector')
+    job, _ = old_leader.submit()
+    old_leader.store.claim_refreshes('public_sector')  # then the process died
+
+    new_leader = RefreshJobs(_runner([]), _store(database), 'public_sector')
+    assert new_leader.submit()[0]['id'] == job['id']  # still blocks new requests
+    assert new_leader.fail_abandoned() == 1
+    assert new_leader.get(job['id'])['status'] == 'failed'
+    assert new_leader.submit()[1]
+
+
+def test_only_the_most_recent_finished_jobs_are_kept(database):
+    leader = RefreshJobs(_runner([]), _store(database), 'public_sector', keep=2)
+    job_ids = []
+    for _ in range(4):
+        job_ids.append(leader.submit()[0]['id'])
+        leader.run_pending()
+    assert [leader.get(job_id) is not None for job_id in job_ids] == [False, False, True, True]
+
+
+def test_unknown_jobs_are_none(database):
+    assert RefreshJobs(_runner([]), _store(database), 'public_sector').get('nope') is None
+
+
+def test_submitting_wakes_the_local_worker(database):
+    jobs = RefreshJobs(_runner([]), _store(database), 'public_sector')
+    woke = threading.Event()
+    waiter = threading.Thread(target=lambda: (jobs.wait(30), woke.set()))
+    waiter.start()
+    jobs.submit()
+    assert woke.wait(5)
+    waiter.join()
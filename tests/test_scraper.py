@@ -0,0 +1,40 @@
+import threading
+
+from scraper import CanadianPublicSectorScraper
+
+
+class RecordingScraper(CanadianPublicSectorScraper):
+    """Searches return nothing; records which queries were reported running when each search began"""
+
+    def __init__(self, max_workers):
+        super().__init__(http=object(), max_workers=max_workers)
+        self.lock = threading.Lock()
+        self.events = []
+        self.running_at_start = {}
+
+    def progress(self, query, status, leads=None, error=None):
+        with self.lock:
+            self.events.append((query, status))
+
+    def search_web_scrape(self, query):
+        with self.lock:
+            self.running_at_start[query] = {q for q, status in self.events if status == 'running'}
+        if 'indigenous' in query:
+            raise RuntimeError('search failed')
+        return []
+
+
+def test_searches_are_reported_running_only_once_a_worker_starts_them():
+    scraper = RecordingScraper(max_workers=1)
+
+    scraper.get_all_leads(progress=scraper.progress)
+
+    queries = [query for query, status in scraper.events if status == 'pending']
+    assert len(queries) == 5
+    assert scraper.events[:5] == [(query, 'pending') for query in queries]
+    # With one worker, each search starts after the previous ones and before the next
+    for i, query in enumerate(queries):
+        assert scraper.running_at_start[query] == set(queries[:i + 1])
+    for query in queries:
+        statuses = [status for q, status in scraper.events if q == query]
+        assert statuses == ['pending', 'running', 'failed' if 'indigenous' in query else 'done']
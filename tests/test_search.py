@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from search import SearchIndex, search_response, search_terms, within_one_edit
+
+WORDS = """cybersecurity training government digital transformation leadership indigenous
+capacity building municipal health safety compliance procurement modernization
+francophone formation gestion projet analytics cloud certification workforce""".split()
+
+
+def _corpus(size, seed=7):
+    rng = random.Random(seed)
+    return [{
+        'id': f"lead-{i}",
+        'title': ' '.join(rng.choices(WORDS, k=rng.randint(2, 5))),
+        'organization': ' '.join(rng.choices(WORDS, k=2)),
+        'description': ' '.join(rng.choices(WORDS, k=rng.randint(0, 12)))
+    } for i in range(size)]
+
+
+def _exhaustive(index, query, limit):
+    """Score every lead in full: per query word, its best expansion's weight x idf x impact"""
+    totals = {}
+    for word in dict.fromkeys(search_terms(query)):
+        best = {}
+        for term, weight in index.expand(word).items():
+            impacts, _ = index._term_impacts(term)
+            for doc_id, impact in impacts.items():
+                best[doc_id] = max(best.get(doc_id, 0.0), weight * index._idf(term) * impact)
+        for doc_id, score in best.items():
+            totals[doc_id] = totals.get(doc_id, 0.0) + score
+    ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [(doc_id, round(score, 4)) for doc_id, score in ranked]
+
+
+@pytest.mark.parametrize('query', [
+    'cybersecurity', 'training', 'cyber', 'goverment', 'digital transformation',
+    'indigenous capacity building', 'health safety compliance training', 'formation gestion projet cloud'
+])
+@pytest.mark.parametrize('limit', [1, 5, 20])
+def test_ranking_matches_scoring_every_lead(query, limit):
+    index = SearchIndex()
+    index.sync(_corpus(300))
+    results = [(lead['id'], score) for lead, score in index.search(query, limit)]
+    assert results == _exhaustive(index, query, limit)
+
+
+def test_prefixes_typos_and_accents_match():
+    index = SearchIndex()
+    index.sync([
+        {'id': 'a', 'title': 'Cybersecurity awareness for government staff'},
+        {'id': 'b', 'title': 'Formation en gestion de projet', 'organization': 'Ville de Québec'},
+        {'id': 'c', 'title': 'Leadership development'}
+    ])
+    assert [lead['id'] for lead, _ in index.search('cyber')] == ['a']
+    assert [lead['id'] for lead, _ in index.search('goverment')] == ['a']
+    assert [lead['id'] for lead, _ in index.search('quebec')] == ['b']
+    assert index.search('the and of') == []
+
+
+def test_exact_matches_outrank_prefix_and_typo_matches():
+    index = SearchIndex()
+    index.sync([
+        {'id': 'exact', 'title': 'Training plan'},
+        {'id': 'prefix', 'title': 'Trainings plan'},
+        {'id': 'typo', 'title': 'Trainng plan'}
+    ])
+    assert [lead['id'] for lead, _ in index.search('training')] == ['exact', 'prefix', 'typo']
+
+
+def test_within_one_edit():
+    assert within_one_edit('government', 'goverment')
+    assert within_one_edit('training', 'trainign')
+    assert within_one_edit('cloud', 'clout')
+    assert not within_one_edit('cloud', 'could')  # two substitutions
+    assert not within_one_edit('training', 'train')
+
+
+def test_sync_applies_only_what_changed():
+    leads = _corpus(50)
+    index = SearchIndex()
+    index.sync(leads)
+    postings = index.postings
+
+    updated = leads[1:] + [{'id': 'new', 'title': 'Zeppelin maintenance certification'}]
+    updated[0] = dict(updated[0], title='Quantum computing briefing')
+    index.sync(updated)
+
+    assert len(index) == 50
+    assert 'lead-0' not in index.docs
+    assert [lead['id'] for lead, _ in index.search('zeppelin')] == ['new']
+    assert [lead['id'] for lead, _ in index.search('quantum')] == ['lead-1']
+
+    fresh = SearchIndex()
+    fresh.sync(updated)
+    assert index.postings is postings
+    assert index.postings == fresh.postings
+    assert index.vocabulary == fresh.vocabulary
+    assert index.total_length == pytest.approx(fresh.total_length)
+    for query in ('cyber', 'digital transformation', 'quantum'):
+        assert index.search(query, 10) == fresh.search(query, 10)
+
+
+def test_search_response():
+    index = SearchIndex()
+    leads = [{'id': 'a', 'title': 'Cloud certification'}, {'id': 'b', 'title': 'Leadership'}]
+    body = search_response(index, leads, {'q': 'cloud', 'limit': '5'})
+    assert body['count'] == 1 and body['indexed'] == 2
+    assert body['results'][0]['id'] == 'a' and body['results'][0]['search_score'] > 0
+    assert search_response(index, leads, {'q': '  '})['results'] == []
+    with pytest.raises(ValueError):
+        search_response(index, leads, {'q': 'cloud', 'limit': 'many'})
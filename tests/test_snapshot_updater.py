@@ -0,0 +1,101 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from incremental import Changeset
+from lead_store import LeadStore
+from snapshot_updater import OncePerProcess, SnapshotUpdater
+
+
+class FakeRefresher:
+    """Stands in for IncrementalRefresher: each refresh() hands out the next lead list"""
+
+    def __init__(self, *lists):
+        self.lists = list(lists)
+        self.leads = []
+        self.seeded = None
+        self.source_timings = {}
+
+    def refresh(self):
+        leads = self.lists.pop(0)
+        self.source_timings = {'rss': {'status': 'ok', 'count': len(leads), 'seconds': 0.1}}
+        if leads == self.leads:
+            return Changeset([], [], [], [], ['rss'], [])
+        self.leads = leads
+        return Changeset([lead['id'] for lead in leads], [], [], ['rss'], [], [])
+
+    def seed(self, leads):
+        self.seeded = list(leads)
+
+
+@pytest.fixture
+def store(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'leads.db'}")
+    return LeadStore(bind=engine, session_factory=sessionmaker(bind=engine))
+
+
+LEADS = [{'id': 'a', 'title': 'Cloud training'}, {'id': 'b', 'title': 'Leadership'}]
+
+
+def test_a_refresh_publishes_and_saves_the_leads(store):
+    published = []
+    updater = SnapshotUpdater('enhanced', FakeRefresher(LEADS, LEADS), store, lambda: published.append(updater.leads))
+    assert not updater.ready.is_set()
+
+    updater.refresh()
+    assert updater.ready.is_set()
+    assert published == [LEADS]
+    assert updater.last_changes['inserted'] == ['a', 'b']
+    run = store.latest_run('enhanced')
+    assert updater.run_id == run.id and store.load_leads('enhanced') == LEADS
+
+    # Nothing changed: republished with the new last_update, but no new run saved
+    updater.refresh()
+    assert len(published) == 2
+    assert store.latest_run('enhanced').id == run.id
+
+
+def test_followers_restore_the_leaders_snapshot(store):
+    leader = SnapshotUpdater('enhanced', FakeRefresher(LEADS), store, lambda: None)
+    leader.refresh()
+
+    published = []
+    refresher = FakeRefresher()
+    follower = SnapshotUpdater('enhanced', refresher, store, lambda: published.append(follower.leads))
+    age = follower.restore(leader.run_id)
+
+    assert 0 <= age < 60
+    assert follower.leads == LEADS and published == [LEADS]
+    assert follower.run_id == leader.run_id
+    assert follower.source_timings['rss']['count'] == 2
+    assert follower.ready.is_set()
+    # The follower's refresher starts from the snapshot if this worker becomes the leader
+    assert refresher.seeded == LEADS
+
+
+def test_nothing_to_restore_leaves_the_app_warming(store):
+    published = []
+    updater = SnapshotUpdater('enhanced', FakeRefresher(), store, lambda: published.append(True))
+    assert updater.restore() is None
+    assert not updater.ready.is_set() and published == []
+
+
+def test_start_runs_once_per_process_including_forked_children():
+    calls = []
+    start = OncePerProcess(lambda: calls.append(os.getpid()))
+    start()
+    start()
+    assert calls == [os.getpid()]
+
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        start()
+        start()
+        os.write(write, b'%d' % len(calls))
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read, 1) == b'2'
+    assert calls == [os.getpid()]